@@ -0,0 +1,108 @@
+"""Synthetic Sublime Text data directories and probe executables for benchmarks.
+"""
+
+import io
+import json
+import os
+import random
+import shutil
+import stat
+import sys
+import zipfile
+
+
+# Loose packages get one file per entry, zipped packages contain them all.
+PACKAGE_FILES = (
+    ('{name}.sublime-settings', '{{\n    // Settings for {name}\n    "enabled": true,\n}}\n'),
+    ('{name}.sublime-commands', '[\n    {{"caption": "{name}: Run", "command": "run"}}\n]\n'),
+    ('Default.sublime-keymap', '[\n    {{"keys": ["ctrl+k", "ctrl+{key}"], "command": "run"}}\n]\n'),
+    ('{name}.py', 'import sublime_plugin\n\n\nclass {name}Command(sublime_plugin.TextCommand):\n'
+                  '    def run(self, edit):\n        pass\n'),
+    ('syntax/{name}.sublime-syntax', '%YAML 1.2\n---\nname: {name}\nscope: source.{lower}\n'
+                                     'contexts:\n  main: []\n'),
+    ('messages/install.txt', '{name}\n' + 'Thanks for installing.\n' * 40),
+)
+
+
+def _package_files(name, rng):
+    files = [(path.format(name=name), body.format(name=name, lower=name.lower(),
+                                                  key=rng.choice('abcdefghij')))
+             for path, body in PACKAGE_FILES]
+    files.append(('package-metadata.json',
+                  json.dumps({'version': '1.{}.{}'.format(rng.randint(0, 9), rng.randint(0, 99))})))
+    return files
+
+
+def make_data_dir(root, packages, zipped_ratio=0.7, overriding_ratio=0.05, seed=0):
+    """Creates a data directory under `root` with `packages` packages and returns its path.
+
+    Roughly `zipped_ratio` of them are .sublime-package files in `Installed Packages/`, the rest
+    are loose in `Packages/`, and a few loose packages override zipped ones. A fake default
+    packages directory sits next to a fake executable, as in a real installation.
+    """
+    rng = random.Random(seed)
+    data_dir = os.path.join(root, 'data-{}'.format(packages))
+    if os.path.exists(data_dir):
+        shutil.rmtree(data_dir)
+    packages_path = os.path.join(data_dir, 'Packages')
+    installed_path = os.path.join(data_dir, 'Installed Packages')
+    default_path = os.path.join(data_dir, 'sublime_text', 'Packages')
+    for path in (packages_path, installed_path, default_path, os.path.join(data_dir, 'Cache')):
+        os.makedirs(path)
+    open(os.path.join(data_dir, 'sublime_text', 'sublime_text'), 'w').close()
+
+    names = ['Package{:04d}'.format(i) for i in range(packages)]
+    zipped = set(rng.sample(names, int(packages * zipped_ratio)))
+    overriding = set(rng.sample(sorted(zipped), int(packages * overriding_ratio)))
+
+    for name in names:
+        files = _package_files(name, rng)
+        if name in zipped:
+            with zipfile.ZipFile(os.path.join(installed_path, name + '.sublime-package'), 'w',
+                                 zipfile.ZIP_DEFLATED) as zf:
+                for path, body in files:
+                    zf.writestr(path, body)
+        if name not in zipped or name in overriding:
+            for path, body in (files if name not in zipped else files[:1]):
+                full = os.path.join(packages_path, name, path)
+                os.makedirs(os.path.dirname(full), exist_ok=True)
+                with io.open(full, 'w', encoding='utf-8') as f:
+                    f.write(body)
+
+    for name in ('Default', 'Python', 'Markdown', 'Text'):
+        with zipfile.ZipFile(os.path.join(default_path, name + '.sublime-package'), 'w') as zf:
+            zf.writestr('{}.sublime-settings'.format(name), '{}')
+
+    user = os.path.join(packages_path, 'User')
+    os.makedirs(user)
+    with open(os.path.join(user, 'Preferences.sublime-settings'), 'w') as f:
+        json.dump({'ignored_packages': ['Vintage'] + sorted(names)[:2], 'font_size': 11}, f)
+    with open(os.path.join(user, 'Package Control.sublime-settings'), 'w') as f:
+        json.dump({'installed_packages': sorted(zipped)}, f)
+    return data_dir
+
+
+PROBES = ('uname', 'wmic', 'sw_vers', 'system_profiler')
+
+
+def make_fake_probes(bin_dir, latency=0.0):
+    """Writes executables named like the commands the platform providers run into `bin_dir`.
+
+    Each one sleeps for `latency` seconds and then runs the real command if there is one, or
+    prints something plausible. Prepend `bin_dir` to PATH to use them. Returns `bin_dir`, or
+    `None` where there's no POSIX shell to run them.
+    """
+    if sys.platform == 'win32':
+        return None
+    os.makedirs(bin_dir, exist_ok=True)
+    for name in PROBES:
+        real = shutil.which(name)
+        if real and os.path.dirname(real) != bin_dir:
+            action = 'exec {} "$@"'.format(real)
+        else:
+            action = 'echo {}-output'.format(name)
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\nsleep {}\n{}\n'.format(latency, action))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bin_dir
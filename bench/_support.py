@@ -0,0 +1,148 @@
+import contextlib
+import importlib
+import os
+import subprocess
+import sys
+import time
+import types
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+PACKAGE_NAME = 'Troubleshooting'
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stubs')
+
+
+def install_stubs():
+    """Makes the stand-ins for the editor's modules importable, unless the real ones are.
+
+    Returns the `sublime` module.
+    """
+    try:
+        import sublime
+    except ImportError:
+        sys.path.insert(0, STUBS_PATH)
+        import sublime
+    return sublime
+
+
+def load_package(name=PACKAGE_NAME):
+    """Makes the package importable as `name` regardless of the directory it lives in.
+
+    Sublime Text packages have no `__init__.py`, so we register a bare package module pointing at
+    the package root instead.
+    """
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [PACKAGE_ROOT]
+        sys.modules[name] = package
+    return sys.modules[name]
+
+
+def import_module(dotted, package=PACKAGE_NAME):
+    load_package(package)
+    return importlib.import_module(package + '.' + dotted)
+
+
+def timeit(fn, repeat=10):
+    """Returns the best and mean wall time of `repeat` calls to `fn`, in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times), sum(times) / len(times)
+
+
+class _PopenCounter(object):
+
+    def __init__(self):
+        self.count = 0
+        self.original = None
+
+    def __enter__(self):
+        # Patch the method every Popen goes through, since modules keep their own reference to
+        # the class.
+        self.original = subprocess.Popen._execute_child
+        original = self.original
+
+        def execute_child(popen, *args, **kwargs):
+            self.count += 1
+            return original(popen, *args, **kwargs)
+
+        subprocess.Popen._execute_child = execute_child
+        return self
+
+    def __exit__(self, *exc_info):
+        subprocess.Popen._execute_child = self.original
+
+
+def count_subprocesses():
+    """Returns a context manager whose `count` is the number of processes started inside it.
+    """
+    return _PopenCounter()
+
+
+def measure(fn, repeat=5, setup=None):
+    """Runs `fn` `repeat` times, calling `setup` before each run, and returns a dict with the best
+    and mean wall time in seconds, the peak of memory allocated during a run in bytes, and the
+    number of processes started per run.
+
+    Memory is measured in one extra run, since tracing allocations slows everything down. The
+    peak is `None` without tracemalloc.
+    """
+    times = []
+    with count_subprocesses() as counter:
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+    peak = None
+    if tracemalloc is not None:
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'wall_best': min(times),
+        'wall_mean': sum(times) / len(times),
+        'peak_bytes': peak,
+        'subprocesses': counter.count / float(repeat),
+        }
+
+
+@contextlib.contextmanager
+def prepended_path(directory):
+    """Puts `directory` first in PATH for the duration of the block.
+    """
+    old = os.environ.get('PATH', '')
+    os.environ['PATH'] = directory + os.pathsep + old
+    try:
+        yield
+    finally:
+        os.environ['PATH'] = old
+
+
+def fresh_stub(name):
+    """Returns a new copy of the stub module `name`, not registered in `sys.modules`, so tests
+    can fill in and patch its registries without touching the module everything else uses.
+    """
+    path = os.path.join(STUBS_PATH, name + '.py')
+    module = types.ModuleType('ts_stub_' + name)
+    module.__file__ = path
+    with open(path, encoding='utf-8') as f:
+        exec(compile(f.read(), path, 'exec'), module.__dict__)
+    return module
@@ -0,0 +1,211 @@
+"""Measures report collection and generation against synthetic data directories.
+
+Runs headless with the stub `sublime` module in `bench/stubs`. Run from the package's parent
+directory:
+
+    python -m Troubleshooting.bench.bench_report run --packages 10 100 1000 --output new.json
+    python -m Troubleshooting.bench.bench_report compare old.json new.json
+
+Every stage records its best and mean wall time, the peak memory allocated during a run and the
+number of processes it started. Results are written as JSON so runs on different commits can be
+compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from concurrent.futures import wait
+
+try:
+    from . import _support
+    from . import _fixtures
+except (ImportError, SystemError):
+    import _support
+    import _fixtures
+
+
+RESULTS_VERSION = 1
+
+DEFAULT_PACKAGES = (10, 100, 1000)
+
+
+class Stages(object):
+    """The measured stages, bound to the package's modules once the stubs are in place.
+    """
+
+    def __init__(self, probes_dir):
+        self.probes_dir = probes_dir
+        self.report = _support.import_module('plugin.report')
+        self.editor_info = _support.import_module('plugin.editor_info')
+        self.platform_info = _support.import_module('plugin.platform_info')
+        self.package_index = _support.import_module('plugin.package_index')
+        self.package_integrity = _support.import_module('plugin.package_integrity')
+        self.collected = None
+
+    def forget_packages(self):
+        self.package_index.shutdown()
+        # There's no public way to drop the scanner's in-memory digests.
+        self.package_integrity._scanner = None
+
+    def platform_probe(self):
+        self.platform_info.PlatformInfo.from_current().collect()
+
+    def platform_commands(self):
+        with _support.prepended_path(self.probes_dir):
+            self.platform_info.UnixInfo().collect_command_system_data()
+
+    def package_data(self):
+        self.editor_info.SublimeTextInfo().collect_package_data()
+
+    def collect(self, refresh):
+        report = self.report.Report(refresh=refresh)
+        wait(report.collect())
+        self.collected = report
+
+    def generate(self):
+        self.collected.generate()
+
+    def all(self):
+        """Returns `(name, fn, setup)` for every stage, in the order they must run.
+        """
+        stages = [
+            ('platform probe', self.platform_probe, None),
+            ('package data (cold)', self.package_data, self.forget_packages),
+            ('package data (warm)', self.package_data, None),
+            ('report collect (cold)', lambda: self.collect(refresh=True), self.forget_packages),
+            ('report collect (cached)', lambda: self.collect(refresh=False), None),
+            ('report generate', self.generate, None),
+            ]
+        if self.probes_dir is not None:
+            stages.insert(1, ('platform commands', self.platform_commands, None))
+        return stages
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=_support.PACKAGE_ROOT, stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    sublime = _support.install_stubs()
+    # Data directories in a temporary work directory are only good for this run.
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='ts-bench-')
+    try:
+        results = run_stages(args, sublime, work_dir)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    data = {
+        'version': RESULTS_VERSION,
+        'created': time.time(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': sys.platform,
+        'probe_latency': args.probe_latency,
+        'repeat': args.repeat,
+        'results': results,
+        }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+    return data
+
+
+def run_stages(args, sublime, work_dir):
+    probes_dir = _fixtures.make_fake_probes(os.path.join(work_dir, 'bin'), args.probe_latency)
+    if probes_dir is None:
+        print('skipping platform commands: fake probes need a POSIX shell')
+    stages = Stages(probes_dir)
+
+    results = []
+    try:
+        for count in args.packages:
+            data_dir = _fixtures.make_data_dir(work_dir, count)
+            sublime.configure(data_dir=data_dir)
+            stages.forget_packages()
+            for name, fn, setup in stages.all():
+                result = _support.measure(fn, repeat=args.repeat, setup=setup)
+                result.update(stage=name, packages=count)
+                results.append(result)
+                print_result(result)
+    finally:
+        # Stops watching the data directories before they're removed.
+        stages.forget_packages()
+    return results
+
+
+def _format_bytes(value):
+    return 'n/a' if value is None else '{:.1f} KB'.format(value / 1024.0)
+
+
+def print_result(result):
+    print('{packages:>6} {stage:<26} best {best:9.2f} ms  mean {mean:9.2f} ms  '
+          'peak {peak:>11}  procs {procs:g}'.format(
+              packages=result['packages'], stage=result['stage'],
+              best=result['wall_best'] * 1000, mean=result['wall_mean'] * 1000,
+              peak=_format_bytes(result['peak_bytes']), procs=result['subprocesses']))
+
+
+def compare(args):
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    old_results = {(r['packages'], r['stage']): r for r in old['results']}
+    print('{:>6} {:<26} {:>12} {:>12} {:>8} {:>12}'.format(
+        'pkgs', 'stage', 'old best', 'new best', 'ratio', 'peak delta'))
+    for result in new['results']:
+        before = old_results.get((result['packages'], result['stage']))
+        if before is None:
+            continue
+        ratio = result['wall_best'] / before['wall_best'] if before['wall_best'] else float('inf')
+        if result['peak_bytes'] is None or before['peak_bytes'] is None:
+            peak = 'n/a'
+        else:
+            peak = '{:+.1f} KB'.format((result['peak_bytes'] - before['peak_bytes']) / 1024.0)
+        print('{:>6} {:<26} {:>9.2f} ms {:>9.2f} ms {:>7.2f}x {:>12}'.format(
+            result['packages'], result['stage'], before['wall_best'] * 1000,
+            result['wall_best'] * 1000, ratio, peak))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command')
+
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--packages', type=int, nargs='+', default=list(DEFAULT_PACKAGES),
+                            help='number of packages in each synthetic data directory')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--probe-latency', type=float, default=0.0,
+                            help='seconds each fake probe executable sleeps')
+    run_parser.add_argument('--work-dir', help='where to create data directories')
+    run_parser.add_argument('--output', help='file to write the results to, as JSON')
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+
+    args = parser.parse_args()
+    if args.command == 'compare':
+        compare(args)
+    elif args.command == 'run':
+        run(args)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Compares the in-process system probe with the `uname` subprocesses it replaces.
+
+Run from the package's parent directory:
+
+    python -m Troubleshooting.bench.bench_system_probe
+"""
+
+import argparse
+
+try:
+    from . import _support
+except (ImportError, SystemError):
+    import _support
+
+
+UNAME_COMMANDS = ('uname -s', 'uname -m', 'uname -r', 'uname -p')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    sysprobe = _support.import_module('lib.sysprobe')
+    subprocess = _support.import_module('lib.subprocess')
+
+    def run_commands():
+        for cmd in UNAME_COMMANDS:
+            subprocess.check_output(cmd.split(), universal_newlines=True, timeout=10)
+
+    for name, fn in (('native probe', sysprobe.collect), ('uname subprocesses', run_commands)):
+        best, mean = _support.timeit(fn, args.repeat)
+        print('{:<20} best {:8.3f} ms  mean {:8.3f} ms'.format(name, best * 1000, mean * 1000))
+
+
+if __name__ == '__main__':
+    main()
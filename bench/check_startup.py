@@ -0,0 +1,112 @@
+"""Fails if loading the package's plugin gets slower than a budget or loads modules that should
+only be loaded on first use.
+
+Each measurement runs in a fresh interpreter, with the stub editor modules already imported as
+they would be in the plugin host. tests/test_startup.py runs the check with the other tests; to
+run it alone, from the package's parent directory:
+
+    python -m Troubleshooting.bench.check_startup --budget 150
+
+Exits with status 1 if the check fails.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+try:
+    from . import _support
+except (ImportError, SystemError):
+    import _support
+
+
+# Modules the plugin must not load at startup: the report machinery and what it depends on.
+DEFERRED = (
+    'concurrent.futures',
+    'ctypes',
+    '{package}.plugin.report',
+    '{package}.plugin.editor_info',
+    '{package}.plugin.platform_info',
+    '{package}.plugin.export',
+    '{package}.lib.subprocess',
+    )
+
+# The median is around 20-30 ms on a development machine. The budget leaves room for slow and
+# busy CI machines, so only real regressions, like importing the report machinery at startup
+# again, fail the check.
+DEFAULT_BUDGET_MS = 150.0
+
+_CHILD = '''
+import json, sys, time
+sys.path.insert(0, {bench_dir!r})
+import _support
+_support.install_stubs()
+import sublime, sublime_plugin
+_support.load_package()
+before = set(sys.modules)
+start = time.perf_counter()
+_support.import_module('main')
+seconds = time.perf_counter() - start
+sys.__stdout__.write(json.dumps({{'seconds': seconds,
+                                 'modules': sorted(set(sys.modules) - before)}}))
+'''
+
+
+def measure_once():
+    code = _CHILD.format(bench_dir=os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+    return json.loads(output)
+
+
+class StartupCheck(object):
+    """Result of `check()`: startup times in milliseconds, the modules loaded at startup and
+    which of them should have been deferred.
+    """
+
+    def __init__(self, times, modules, budget):
+        self.times = sorted(times)
+        self.median = self.times[len(self.times) // 2]
+        self.best = self.times[0]
+        self.modules = modules
+        self.budget = budget
+        deferred = [name.format(package=_support.PACKAGE_NAME) for name in DEFERRED]
+        self.deferred_loaded = [name for name in deferred if name in modules]
+
+    @property
+    def over_budget(self):
+        return self.median > self.budget
+
+    @property
+    def failed(self):
+        return self.over_budget or bool(self.deferred_loaded)
+
+
+def check(repeat=7, budget=DEFAULT_BUDGET_MS):
+    """Measures startup `repeat` times and returns a `StartupCheck`.
+    """
+    runs = [measure_once() for _ in range(repeat)]
+    return StartupCheck([run['seconds'] * 1000 for run in runs], runs[0]['modules'], budget)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS,
+                        help='milliseconds the median startup may take')
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+
+    result = check(args.repeat, args.budget)
+    print('startup: median {:.2f} ms, best {:.2f} ms, budget {:.2f} ms'.format(
+        result.median, result.best, result.budget))
+    print('modules loaded: {}'.format(len(result.modules)))
+    if result.over_budget:
+        print('FAIL: startup is over budget')
+    if result.deferred_loaded:
+        print('FAIL: loaded at startup: {}'.format(', '.join(result.deferred_loaded)))
+    sys.exit(1 if result.failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""Stand-in for `Default/profile.py`, which reports plugin timings in Sublime Text.
+"""
+
+
+def profile_text():
+    return 'Loaded plugins: (benchmark stub, no timings)\n'
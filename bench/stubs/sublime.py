@@ -0,0 +1,512 @@
+"""Stand-in for the `sublime` module of Sublime Text 3, for running the package headless.
+
+Only the parts of the API the package uses are provided, but those behave like the real thing:
+paths point at a data directory set with `configure()` (or the `TS_BENCH_DATA` environment
+variable), resources are found in loose and zipped packages, settings are read from the
+`Packages/User` directory, and `set_timeout()` callbacks run one at a time on a separate thread
+that plays the role of the UI thread.
+"""
+
+import fnmatch
+import heapq
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+
+
+_data_dir = os.environ.get('TS_BENCH_DATA', os.path.join(os.getcwd(), 'bench-data'))
+_version = '3211'
+_channel = 'stable'
+_executable_path = os.path.join(_data_dir, 'sublime_text', 'sublime_text')
+
+
+def configure(data_dir=None, version=None, channel=None, executable_path=None):
+    """Points the stub at another data directory or changes what it reports about itself.
+    """
+    global _data_dir, _version, _channel, _executable_path
+    if data_dir is not None:
+        _data_dir = data_dir
+        _executable_path = os.path.join(data_dir, 'sublime_text', 'sublime_text')
+    if version is not None:
+        _version = version
+    if channel is not None:
+        _channel = channel
+    if executable_path is not None:
+        _executable_path = executable_path
+    _settings.clear()
+
+
+def version():
+    return _version
+
+
+def channel():
+    return _channel
+
+
+def arch():
+    return 'x64' if sys.maxsize > 2 ** 32 else 'x32'
+
+
+def platform():
+    if sys.platform == 'win32':
+        return 'windows'
+    if sys.platform == 'darwin':
+        return 'osx'
+    return 'linux'
+
+
+def executable_path():
+    return _executable_path
+
+
+def packages_path():
+    return os.path.join(_data_dir, 'Packages')
+
+
+def installed_packages_path():
+    return os.path.join(_data_dir, 'Installed Packages')
+
+
+def cache_path():
+    return os.path.join(_data_dir, 'Cache')
+
+
+# Timeouts ////////////////////////////////////////////////////////////////////
+
+class _Loop(object):
+    """Runs callbacks one at a time, in due order, on its own thread.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.queue = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def schedule(self, callback, delay):
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name=self.name)
+                self.thread.daemon = True
+                self.thread.start()
+            due = time.time() + delay / 1000.0
+            heapq.heappush(self.queue, (due, next(self.counter), callback))
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.queue or self.queue[0][0] > time.time():
+                    self.condition.wait(self.queue[0][0] - time.time() if self.queue else None)
+                _, _, callback = heapq.heappop(self.queue)
+            try:
+                callback()
+            except Exception:
+                import traceback
+                traceback.print_exc()
+
+    def idle(self):
+        with self.condition:
+            return not self.queue
+
+
+_main_loop = _Loop('sublime main')
+_async_loop = _Loop('sublime async')
+
+
+def set_timeout(callback, delay=0):
+    _main_loop.schedule(callback, delay)
+
+
+def set_timeout_async(callback, delay=0):
+    _async_loop.schedule(callback, delay)
+
+
+# Resources ///////////////////////////////////////////////////////////////////
+
+def _package_archives():
+    archives = {}
+    default_packages = os.path.join(os.path.dirname(executable_path()), 'Packages')
+    for directory in (default_packages, installed_packages_path()):
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith('.sublime-package'):
+                archives[name[:-len('.sublime-package')]] = os.path.join(directory, name)
+    return archives
+
+
+def _iter_resources():
+    """Yields `(resource name, loader)` for every resource, loose files overriding zipped ones.
+
+    The editor keeps an index of resources in memory, so the list is built once per state of the
+    package directories rather than on every call.
+    """
+    key = [_data_dir]
+    for path in (packages_path(), installed_packages_path()):
+        try:
+            key.append(os.stat(path).st_mtime)
+        except OSError:
+            key.append(None)
+    if _resources[0] != key:
+        _resources[:] = [key, list(_scan_resources())]
+    return iter(_resources[1])
+
+
+_resources = [None, []]
+
+
+def _scan_resources():
+    seen = set()
+    root = packages_path()
+    for dirpath, _, files in os.walk(root):
+        for f in files:
+            path = os.path.join(dirpath, f)
+            name = 'Packages/' + os.path.relpath(path, root).replace(os.sep, '/')
+            seen.add(name)
+            yield name, lambda path=path: open(path, 'rb').read()
+    for package, path in sorted(_package_archives().items()):
+        try:
+            with zipfile.ZipFile(path) as zf:
+                members = [m for m in zf.namelist() if not m.endswith('/')]
+        except (OSError, zipfile.BadZipfile):
+            continue
+        for member in members:
+            name = 'Packages/{}/{}'.format(package, member)
+            if name not in seen:
+                yield name, lambda path=path, member=member: zipfile.ZipFile(path).read(member)
+
+
+def find_resources(pattern):
+    return [name for name, _ in _iter_resources()
+            if fnmatch.fnmatch(name.rsplit('/', 1)[-1], pattern)]
+
+
+def load_binary_resource(name):
+    for resource, load in _iter_resources():
+        if resource == name:
+            return load()
+    raise IOError('resource not found')
+
+
+def load_resource(name):
+    return load_binary_resource(name).decode('utf-8').replace('\r\n', '\n')
+
+
+_comment = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+_trailing_comma = re.compile(r',(\s*[\]}])')
+
+
+def decode_value(data):
+    """Decodes JSON the way Sublime Text does: comments and trailing commas are allowed.
+    """
+    data = _comment.sub(lambda m: m.group(0) if m.group(0).startswith('"') else '', data)
+    return json.loads(_trailing_comma.sub(r'\1', data))
+
+
+def encode_value(value, pretty=False):
+    return json.dumps(value, indent=4 if pretty else None)
+
+
+# Settings ////////////////////////////////////////////////////////////////////
+
+class Settings(object):
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+        self.callbacks = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def has(self, key):
+        return key in self.values
+
+    def set(self, key, value):
+        self.values[key] = value
+        for callback in list(self.callbacks.values()):
+            callback()
+
+    def erase(self, key):
+        self.values.pop(key, None)
+
+    def add_on_change(self, tag, callback):
+        self.callbacks[tag] = callback
+
+    def clear_on_change(self, tag):
+        self.callbacks.pop(tag, None)
+
+
+_settings = {}
+
+
+def load_settings(base_name):
+    """Returns the settings in every `base_name` resource merged in package order, with the user's
+    own file last.
+    """
+    settings = _settings.get(base_name)
+    if settings is None:
+        values = {}
+        names = sorted(find_resources(base_name),
+                       key=lambda name: (name.startswith('Packages/User/'), name))
+        for name in names:
+            try:
+                values.update(decode_value(load_resource(name)))
+            except (IOError, ValueError):
+                pass
+        settings = _settings[base_name] = Settings(values)
+    return settings
+
+
+def save_settings(base_name):
+    path = os.path.join(packages_path(), 'User', base_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(encode_value(load_settings(base_name).values, pretty=True))
+
+
+# Windows and views ///////////////////////////////////////////////////////////
+
+class Region(object):
+
+    def __init__(self, a, b=None):
+        self.a = a
+        self.b = a if b is None else b
+
+    def begin(self):
+        return min(self.a, self.b)
+
+    def end(self):
+        return max(self.a, self.b)
+
+    def size(self):
+        return abs(self.b - self.a)
+
+    def empty(self):
+        return self.a == self.b
+
+    def __len__(self):
+        return self.size()
+
+    def __eq__(self, other):
+        return isinstance(other, Region) and (self.a, self.b) == (other.a, other.b)
+
+    def __repr__(self):
+        return '({}, {})'.format(self.a, self.b)
+
+
+class Selection(object):
+
+    def __init__(self):
+        self.regions = [Region(0)]
+
+    def __len__(self):
+        return len(self.regions)
+
+    def __iter__(self):
+        return iter(self.regions)
+
+    def __getitem__(self, index):
+        return self.regions[index]
+
+    def clear(self):
+        self.regions = []
+
+    def add(self, region):
+        self.regions.append(region)
+
+
+_ids = itertools.count(1)
+
+
+class View(object):
+
+    def __init__(self, window=None, file_name=None, text=''):
+        self.view_id = next(_ids)
+        self._window = window
+        self._file_name = file_name
+        self._name = ''
+        self._text = text
+        self._settings = Settings({
+            'syntax': 'Packages/Text/Plain text.tmLanguage',
+            'tab_size': 4,
+            'translate_tabs_to_spaces': False,
+            })
+        self._sel = Selection()
+        self._status = {}
+        self._regions = {}
+        self._scratch = False
+        self._read_only = False
+        self._dirty = False
+
+    def id(self):
+        return self.view_id
+
+    def window(self):
+        return self._window
+
+    def file_name(self):
+        return self._file_name
+
+    def name(self):
+        return self._name
+
+    def set_name(self, name):
+        self._name = name
+
+    def settings(self):
+        return self._settings
+
+    def size(self):
+        return len(self._text)
+
+    def substr(self, region):
+        if isinstance(region, int):
+            return self._text[region:region + 1]
+        return self._text[region.begin():region.end()]
+
+    def rowcol(self, point):
+        row = self._text.count('\n', 0, point)
+        return row, point - (self._text.rfind('\n', 0, point) + 1)
+
+    def line(self, point):
+        begin = self._text.rfind('\n', 0, point) + 1
+        end = self._text.find('\n', point)
+        return Region(begin, len(self._text) if end == -1 else end)
+
+    def lines(self, region):
+        regions = []
+        point = region.begin()
+        while True:
+            line = self.line(point)
+            regions.append(line)
+            if line.end() >= region.end():
+                return regions
+            point = line.end() + 1
+
+    def is_dirty(self):
+        return self._dirty
+
+    def is_loading(self):
+        return False
+
+    def is_read_only(self):
+        return self._read_only
+
+    def set_read_only(self, value):
+        self._read_only = value
+
+    def is_scratch(self):
+        return self._scratch
+
+    def set_scratch(self, value):
+        self._scratch = value
+
+    def encoding(self):
+        return 'UTF-8'
+
+    def line_endings(self):
+        return 'Unix'
+
+    def em_width(self):
+        return 8.0
+
+    def sel(self):
+        return self._sel
+
+    def has_non_empty_selection_region(self):
+        return any(not r.empty() for r in self._sel)
+
+    def set_status(self, key, value):
+        self._status[key] = value
+
+    def get_status(self, key):
+        return self._status.get(key, '')
+
+    def erase_status(self, key):
+        self._status.pop(key, None)
+
+    def add_regions(self, key, regions, *args, **kwargs):
+        self._regions[key] = list(regions)
+
+    def get_regions(self, key):
+        return list(self._regions.get(key, []))
+
+    def erase_regions(self, key):
+        self._regions.pop(key, None)
+
+    def set_syntax_file(self, syntax):
+        self._settings.set('syntax', syntax)
+
+    def run_command(self, cmd, args=None):
+        pass
+
+
+class Window(object):
+
+    def __init__(self):
+        self.window_id = next(_ids)
+        self._views = [View(self)]
+        self._active = 0
+
+    def id(self):
+        return self.window_id
+
+    def views(self):
+        return list(self._views)
+
+    def active_view(self):
+        return self._views[self._active] if self._views else None
+
+    def new_file(self):
+        view = View(self)
+        self._views.append(view)
+        self._active = len(self._views) - 1
+        return view
+
+    def show_quick_panel(self, items, on_select, *args, **kwargs):
+        pass
+
+    def show_input_panel(self, caption, initial_text, on_done, on_change, on_cancel):
+        return View(self)
+
+    def run_command(self, cmd, args=None):
+        pass
+
+
+_windows = [Window()]
+
+
+def windows():
+    return list(_windows)
+
+
+def active_window():
+    return _windows[0]
+
+
+def status_message(message):
+    pass
+
+
+def error_message(message):
+    print('error:', message, file=sys.stderr)
+
+
+def message_dialog(message):
+    pass
+
+
+for _name in ('log_commands', 'log_input', 'log_result_regex', 'log_indexing',
+              'log_build_systems'):
+    globals()[_name] = lambda flag=True: None
+del _name
@@ -0,0 +1,89 @@
+"""Stand-in for the `sublime_plugin` module of Sublime Text 3.
+
+Holds the same registries as the real module so code that inspects or patches them can be
+exercised headless; nothing ever dispatches events to the listeners.
+"""
+
+import importlib
+import sys
+
+
+api_ready = True
+
+application_command_classes = []
+window_command_classes = []
+text_command_classes = []
+
+view_event_listener_classes = []
+view_event_listeners = {}
+
+all_callbacks = {
+    'on_new': [], 'on_clone': [], 'on_load': [], 'on_pre_close': [], 'on_close': [],
+    'on_pre_save': [], 'on_post_save': [], 'on_modified': [], 'on_selection_modified': [],
+    'on_activated': [], 'on_deactivated': [], 'on_query_context': [], 'on_text_command': [],
+    'on_window_command': [], 'on_post_text_command': [], 'on_post_window_command': [],
+    'on_modified_async': [], 'on_selection_modified_async': [],
+    }
+
+
+def reload_plugin(modulename):
+    if modulename in sys.modules:
+        return importlib.reload(sys.modules[modulename])
+    return importlib.import_module(modulename)
+
+
+class Command(object):
+
+    def name(self):
+        clsname = self.__class__.__name__
+        name = clsname[0].lower()
+        last_upper = False
+        for c in clsname[1:]:
+            if c.isupper() and not last_upper:
+                name += '_'
+                name += c.lower()
+            else:
+                name += c
+            last_upper = c.isupper()
+        if name.endswith('_command'):
+            name = name[0:-8]
+        return name
+
+    def is_enabled(self):
+        return True
+
+    def is_visible(self):
+        return True
+
+    def description(self):
+        return ''
+
+
+class ApplicationCommand(Command):
+    pass
+
+
+class WindowCommand(Command):
+
+    def __init__(self, window):
+        self.window = window
+
+
+class TextCommand(Command):
+
+    def __init__(self, view):
+        self.view = view
+
+
+class EventListener(object):
+    pass
+
+
+class ViewEventListener(object):
+
+    @classmethod
+    def is_applicable(cls, settings):
+        return True
+
+    def __init__(self, view):
+        self.view = view
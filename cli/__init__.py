@@ -0,0 +1,10 @@
+"""Collects reports from the command line, without the editor.
+
+Run from the directory that contains the package:
+
+    python -m Troubleshooting.cli --help
+    python -m Troubleshooting.cli.aggregate --help
+
+Sublime Text only loads plugins from the package's top level, so nothing in here is ever loaded
+by the editor.
+"""
@@ -0,0 +1,123 @@
+"""Summarizes many saved reports: package popularity, editor builds and platforms.
+
+Run from the directory that contains the package:
+
+    python -m Troubleshooting.cli.aggregate reports/ --jobs 8 > summary.md
+
+Files are read one at a time by a pool of worker processes, each of which summarizes a chunk of
+files; the summaries are merged as they come in, so memory use doesn't grow with the number of
+files.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+
+
+REPORT_EXTENSIONS = ('.json', '.tsr')
+
+# Files per task. Large enough to amortize sending the summary back, small enough to keep every
+# worker busy until the end.
+CHUNK_SIZE = 200
+
+
+def iter_report_paths(paths):
+    """Yields report files in `paths`, walking directories lazily.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(REPORT_EXTENSIONS):
+                    yield os.path.join(root, name)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def summarize_files(paths):
+    """Returns the `FleetSummary` of the reports in `paths`; runs in a worker process.
+    """
+    from ..plugin.aggregate import FleetSummary
+    from ..plugin.export import load
+
+    summary = FleetSummary()
+    for path in paths:
+        try:
+            _, sections = load(path)
+        except (OSError, ValueError, KeyError, UnicodeDecodeError):
+            summary.unreadable += 1
+            continue
+        summary.add(sections)
+    return summary
+
+
+def summarize(paths, jobs=None):
+    """Returns the `FleetSummary` of every report in `paths`.
+    """
+    from concurrent.futures import FIRST_COMPLETED
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures import wait
+    from ..plugin.aggregate import FleetSummary
+
+    total = FleetSummary()
+    if jobs == 1:
+        for chunk in _chunks(iter_report_paths(paths), CHUNK_SIZE):
+            total.merge(summarize_files(chunk))
+        return total
+
+    from multiprocessing import cpu_count
+    jobs = jobs or cpu_count()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Bound the number of chunks in flight so paths are listed only as fast as they're read.
+        max_pending = 2 * jobs
+        pending = set()
+        for chunk in _chunks(iter_report_paths(paths), CHUNK_SIZE):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+            pending.add(executor.submit(summarize_files, chunk))
+        for future in pending:
+            total.merge(future.result())
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m Troubleshooting.cli.aggregate',
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', metavar='PATH',
+                        help='report files, or directories to search for them')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='number of worker processes (default: one per CPU)')
+    parser.add_argument('--top', type=int, default=20, help='rows per table')
+    parser.add_argument('--format', choices=('markdown', 'json'), default='markdown')
+    parser.add_argument('--output', help='file to write the summary to instead of stdout')
+    args = parser.parse_args(argv)
+
+    summary = summarize(args.paths, args.jobs)
+    if args.format == 'json':
+        text = json.dumps(summary.to_data(args.top), indent=2)
+    else:
+        text = summary.to_markdown(args.top)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == '__main__':
+    main()
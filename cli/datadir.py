@@ -0,0 +1,141 @@
+import os
+import sys
+
+from ..lib.logging import Logger
+from ..lib.sublime_json import load_file
+from ..plugin.data import DataBlock
+from ..plugin.data import DataItem
+from ..plugin.data import DataProvider
+from ..plugin.data import DataSection
+from ..plugin.package_data import package_data_block
+from ..plugin.package_data import package_integrity_block
+from ..plugin.package_data import package_inventory_block
+from ..plugin.package_index import PackageIndex
+
+
+__all__ = (
+    'DataDirectoryInfo',
+    'default_data_dirs',
+    'default_install_dir',
+    'user_data_dirs',
+    )
+
+
+_l = Logger.from_module(__name__)
+
+
+# Data directory names relative to a home directory, newest editor first.
+if sys.platform == 'win32':
+    DATA_DIRS = (os.path.join('AppData', 'Roaming', 'Sublime Text'),
+                 os.path.join('AppData', 'Roaming', 'Sublime Text 3'))
+    INSTALL_DIRS = (r'C:\Program Files\Sublime Text', r'C:\Program Files\Sublime Text 3')
+    HOME_ROOTS = (r'C:\Users',)
+elif sys.platform == 'darwin':
+    DATA_DIRS = (os.path.join('Library', 'Application Support', 'Sublime Text'),
+                 os.path.join('Library', 'Application Support', 'Sublime Text 3'))
+    INSTALL_DIRS = ('/Applications/Sublime Text.app/Contents/MacOS',)
+    HOME_ROOTS = ('/Users',)
+else:
+    DATA_DIRS = (os.path.join('.config', 'sublime-text'),
+                 os.path.join('.config', 'sublime-text-3'))
+    INSTALL_DIRS = ('/opt/sublime_text', '/opt/sublime_text_3')
+    HOME_ROOTS = ('/home',)
+
+
+def _existing(paths):
+    return [path for path in paths if os.path.isdir(os.path.join(path, 'Packages'))]
+
+
+def default_data_dirs():
+    """Returns the current user's data directories that exist.
+    """
+    return _existing([os.path.join(os.path.expanduser('~'), d) for d in DATA_DIRS])
+
+
+def user_data_dirs(home_roots=HOME_ROOTS):
+    """Returns the data directories of every user with a home under `home_roots`.
+    """
+    dirs = []
+    for root in home_roots:
+        try:
+            homes = sorted(os.listdir(root))
+        except OSError:
+            continue
+        for home in homes:
+            dirs.extend(_existing([os.path.join(root, home, d) for d in DATA_DIRS]))
+    return dirs
+
+
+def default_install_dir():
+    for path in INSTALL_DIRS:
+        if os.path.isdir(os.path.join(path, 'Packages')):
+            return path
+    return None
+
+
+class DataDirectoryInfo(DataProvider, DataSection):
+    """Editor data read from a data directory on disk rather than through the editor's API.
+
+    `install_dir` is where the editor is installed; without it, default packages are left out.
+    """
+
+    def __init__(self, data_dir, install_dir=None):
+        super().__init__('Editor info', description='Details read from a data directory')
+        self.data_dir = data_dir
+        self.install_dir = install_dir
+
+    @classmethod
+    def from_current(cls):
+        """Returns the provider for the running editor's data directory if the editor's API is
+        available, or else for the current user's.
+        """
+        try:
+            import sublime
+        except ImportError:
+            dirs = default_data_dirs()
+            if not dirs:
+                raise ValueError('no data directory found')
+            return cls(dirs[0], default_install_dir())
+        return cls(os.path.dirname(sublime.packages_path()),
+                   os.path.dirname(sublime.executable_path()))
+
+    @property
+    def provider(self):
+        return 'data directory ' + self.data_dir
+
+    def collect(self):
+        self.elements.clear()
+
+        packages_path = os.path.join(self.data_dir, 'Packages')
+        installed_packages_path = os.path.join(self.data_dir, 'Installed Packages')
+        default_packages_path = (os.path.join(self.install_dir, 'Packages')
+                                 if self.install_dir else None)
+
+        block = DataBlock('Locations')
+        block.items.append(DataItem('data directory', self.data_dir))
+        block.items.append(DataItem('installation directory', self.install_dir or 'unknown'))
+        self.elements.append(block)
+
+        index = PackageIndex(packages_path, installed_packages_path, default_packages_path,
+                             watch=False)
+        try:
+            entries = index.refresh()
+        finally:
+            index.close()
+
+        user_path = os.path.join(packages_path, 'User')
+        preferences = load_file(os.path.join(user_path, 'Preferences.sublime-settings'))
+        if not isinstance(preferences, dict):
+            preferences = {}
+        pc_settings = load_file(os.path.join(user_path, 'Package Control.sublime-settings'))
+        pc_packages = None
+        if isinstance(pc_settings, dict):
+            pc_packages = pc_settings.get('installed_packages', [])
+
+        self.elements.append(package_data_block(entries, installed_packages_path,
+                                                preferences.get('ignored_packages', []),
+                                                pc_packages))
+        self.elements.append(package_inventory_block(entries))
+        block = package_integrity_block(entries, self.cache)
+        if block is not None:
+            self.elements.append(block)
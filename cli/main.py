@@ -0,0 +1,152 @@
+"""Collects reports about Sublime Text data directories without running the editor.
+
+Many data directories are collected in parallel, one process each. Platform data is collected once
+and shared by all reports.
+"""
+
+import argparse
+import os
+import sys
+
+
+# Keep imports at module level to the standard library: the package's own modules are imported
+# when they're needed so `--help` and argument errors are instant.
+
+EXTENSIONS = {
+    'markdown': '.md',
+    'json': '.json',
+    'binary': '.tsr',
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m Troubleshooting.cli',
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument('data_dirs', nargs='*', metavar='DATA_DIR',
+                        help="data directories to collect; defaults to the current user's")
+    parser.add_argument('--all-users', action='store_true',
+                        help='also collect the data directories of every user on this machine')
+    parser.add_argument('--install-dir',
+                        help='where the editor is installed, for its default packages')
+    parser.add_argument('--format', choices=sorted(EXTENSIONS), default='markdown')
+    parser.add_argument('--output-dir',
+                        help='write one file per data directory here instead of to stdout')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='number of worker processes (default: one per CPU)')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='seconds to wait for the data of each directory')
+    parser.add_argument('--no-platform', action='store_true',
+                        help='leave platform data out of the reports')
+    args = parser.parse_args(argv)
+
+    if not args.output_dir and (args.format == 'binary' or
+                                len(args.data_dirs) > 1 or args.all_users):
+        parser.error('--output-dir is required for binary output and for several directories')
+    return args
+
+
+def output_name(data_dir, extension):
+    """Returns a file name for the report of `data_dir` that's unique among data directories.
+    """
+    path = os.path.abspath(data_dir).strip(os.sep).replace(':', '')
+    return path.replace(os.sep, '_').replace(' ', '-') + extension
+
+
+def collect_platform_section():
+    """Returns the platform data as a section that can be sent to other processes.
+    """
+    from ..plugin.data import LoadedSection
+    from ..plugin.platform_info import PlatformInfo
+    info = PlatformInfo.from_current()
+    info.collect()
+    return LoadedSection(info.title, info.description, list(info.elements), info.provider)
+
+
+def collect_report(data_dir, install_dir, sections, timeout):
+    """Collects the report of one data directory and returns its sections.
+    """
+    from concurrent.futures import wait
+    from .datadir import DataDirectoryInfo
+    from ..plugin.report import Report
+
+    report = Report(infos=[DataDirectoryInfo(data_dir, install_dir)])
+    wait(report.collect(timeout=timeout))
+    return report.infos + sections
+
+
+def write_report(sections, fmt, fp):
+    if fmt == 'markdown':
+        from ..plugin.report import Report
+        fp.write(Report(infos=sections).generate().encode('utf-8'))
+    elif fmt == 'json':
+        from io import TextIOWrapper
+        from ..plugin.export import dump_json
+        text = TextIOWrapper(fp, encoding='utf-8')
+        dump_json(sections, text)
+        text.detach()
+    else:
+        from ..plugin.export import dump_binary
+        dump_binary(sections, fp)
+
+
+def run_job(job):
+    """Collects and writes the report of one data directory; runs in a worker process.
+
+    Returns `(data_dir, output path or None, error message or None)`.
+    """
+    data_dir, install_dir, sections, args = job
+    try:
+        sections = collect_report(data_dir, install_dir, sections, args.timeout)
+        if not args.output_dir:
+            write_report(sections, args.format, sys.stdout.buffer)
+            sys.stdout.flush()
+            return data_dir, None, None
+        path = os.path.join(args.output_dir, output_name(data_dir, EXTENSIONS[args.format]))
+        with open(path, 'wb') as f:
+            write_report(sections, args.format, f)
+        return data_dir, path, None
+    except Exception as e:
+        return data_dir, None, '{}: {}'.format(type(e).__name__, e)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from .datadir import default_data_dirs
+    from .datadir import default_install_dir
+    from .datadir import user_data_dirs
+
+    data_dirs = list(args.data_dirs)
+    if args.all_users:
+        data_dirs.extend(d for d in user_data_dirs() if d not in data_dirs)
+    elif not data_dirs:
+        data_dirs = default_data_dirs()[:1]
+    if not data_dirs:
+        sys.exit('no data directory found')
+
+    failed = 0
+    for data_dir in [d for d in data_dirs if not os.path.isdir(os.path.join(d, 'Packages'))]:
+        failed += 1
+        data_dirs.remove(data_dir)
+        print('{}: not a data directory'.format(data_dir), file=sys.stderr)
+
+    install_dir = args.install_dir or default_install_dir()
+    sections = [] if args.no_platform else [collect_platform_section()]
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    jobs = [(data_dir, install_dir, sections, args) for data_dir in data_dirs]
+    if len(jobs) == 1 or args.jobs == 1:
+        results = map(run_job, jobs)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+        results = executor.map(run_job, jobs)
+
+    for data_dir, path, error in results:
+        if error:
+            failed += 1
+            print('{}: failed: {}'.format(data_dir, error), file=sys.stderr)
+        elif path:
+            print('{}: {}'.format(data_dir, path), file=sys.stderr)
+    sys.exit(1 if failed else 0)
@@ -1,2 +1,8 @@
 from .generate_bug_report_template import *
 from .toggle_logging import *
+from .export_report_data import *
+from .diff_reports import *
+from .command_recorder import *
+from .show_import_times import *
+from .memory_profiler import *
+from .keymap_conflicts import *
@@ -0,0 +1,113 @@
+import json
+import os
+
+import sublime
+import sublime_plugin
+
+from ..lib import recorder
+
+from ..lib.logging import Logger
+
+
+_l = Logger.from_module(__name__)
+
+
+__all__ = (
+    'CommandRecorderListener',
+    'InputRecorderListener',
+    'SummarizeCommandRecordingCommand',
+    )
+
+
+_recorder = None
+
+
+def recording_path():
+    return os.path.join(sublime.cache_path(), 'Troubleshooting', 'recordings', 'commands.tscr')
+
+
+def set_recording(enabled):
+    """Starts or stops recording commands and input events to a binary log.
+    """
+    global _recorder
+    if enabled and _recorder is None:
+        _recorder = recorder.Recorder(recording_path())
+    elif not enabled and _recorder is not None:
+        _recorder.close()
+        _recorder = None
+    else:
+        return
+    _check_input_listeners()
+
+
+def _check_input_listeners():
+    # The editor only attaches or detaches view listeners when it checks whether they apply, which
+    # it does as views are opened or activated; ask it to check the views already open now.
+    check = getattr(sublime_plugin, 'check_view_event_listeners', None)
+    if check is None:
+        return
+    for window in sublime.windows():
+        for view in window.views():
+            check(view)
+
+
+def _encode_args(args):
+    if not args:
+        return b''
+    try:
+        return json.dumps(args, separators=(',', ':')).encode('utf-8')
+    except (TypeError, ValueError):
+        return b''
+
+
+class CommandRecorderListener(sublime_plugin.EventListener):
+    """Feeds commands to the recorder while recording is on.
+    """
+
+    def on_text_command(self, view, command_name, args):
+        if _recorder is not None:
+            _recorder.record(recorder.TEXT_COMMAND, command_name, _encode_args(args))
+
+    def on_window_command(self, window, command_name, args):
+        if _recorder is not None:
+            _recorder.record(recorder.WINDOW_COMMAND, command_name, _encode_args(args))
+
+
+
+class InputRecorderListener(sublime_plugin.ViewEventListener):
+    """Feeds input events to the recorder.
+
+    Input events fire on every keystroke, so this listener is only attached to views while
+    recording is on.
+    """
+
+    @classmethod
+    def is_applicable(cls, settings):
+        return _recorder is not None
+
+    def on_modified(self):
+        if _recorder is not None:
+            _recorder.record(recorder.MODIFIED, 'view {}'.format(self.view.id()))
+
+    def on_selection_modified(self):
+        if _recorder is not None:
+            _recorder.record(recorder.SELECTION_MODIFIED, 'view {}'.format(self.view.id()))
+
+
+class SummarizeCommandRecordingCommand(sublime_plugin.WindowCommand):
+    """Shows how often each command ran and how much time passed between events in the
+    recording.
+    """
+
+    def run(self):
+        if _recorder is not None:
+            _recorder.flush()
+            paths = _recorder.files()
+        else:
+            paths = recorder.Recorder.files_for(recording_path())
+
+        v = self.window.new_file()
+        v.set_name('Command Recording Summary')
+        v.set_scratch(True)
+        v.run_command('ts_replace_report_section', {'text': recorder.summarize(paths)})
+        v.set_syntax_file('Packages/Markdown/Markdown.tmLanguage')
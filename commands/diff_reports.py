@@ -0,0 +1,63 @@
+import os
+import time
+
+import sublime
+import sublime_plugin
+
+from ..lib.logging import Logger
+
+
+_l = Logger.from_module(__name__)
+
+
+__all__ = (
+    'DiffReportsCommand',
+    )
+
+
+class DiffReportsCommand(sublime_plugin.WindowCommand):
+    """Compares two reports saved with `export_report_data` and shows what changed.
+
+    Prompts for the paths not given as arguments.
+    """
+
+    def run(self, old=None, new=None):
+        if old is None:
+            self.prompt('Old report:', lambda path: self.run(path, new))
+            return
+        if new is None:
+            self.prompt('New report:', lambda path: self.run(old, path))
+            return
+
+        from ..plugin import export
+        from ..plugin.report_diff import diff_reports
+        from ..plugin.report_diff import render_markdown
+
+        try:
+            old_created, old_sections = export.load(old)
+            new_created, new_sections = export.load(new)
+        except (OSError, ValueError, KeyError) as e:
+            _l.error('could not load reports: %s', e)
+            sublime.error_message('Troubleshooting: Could not load reports:\n\n{}'.format(e))
+            return
+
+        changes = diff_reports(old_sections, new_sections)
+        text = render_markdown(changes, self.describe(old, old_created),
+                               self.describe(new, new_created))
+
+        v = self.window.new_file()
+        v.set_name('Report Diff')
+        v.set_scratch(True)
+        v.run_command('ts_replace_report_section', {'text': text})
+        v.set_syntax_file('Packages/Markdown/Markdown.tmLanguage')
+
+    def prompt(self, caption, on_done):
+        self.window.show_input_panel(caption, os.path.expanduser('~') + os.sep, on_done,
+                                     None, None)
+
+    @staticmethod
+    def describe(path, created):
+        name = os.path.basename(path)
+        if not created:
+            return name
+        return '{} ({})'.format(name, time.strftime('%Y-%m-%d %H:%M', time.localtime(created)))
@@ -0,0 +1,69 @@
+import os
+import time
+
+import sublime
+import sublime_plugin
+
+from .toggle_logging import show_status
+
+from ..lib.logging import Logger
+
+
+_l = Logger.from_module(__name__)
+
+
+__all__ = (
+    'ExportReportDataCommand',
+    )
+
+
+EXTENSIONS = {
+    'json': '.json',
+    'binary': '.tsr',
+    }
+
+
+class ExportReportDataCommand(sublime_plugin.WindowCommand):
+    """Collects the report data and saves it in a machine-readable format instead of markdown.
+
+    `format` is either "json" or "binary".
+    """
+
+    def run(self, format='json', path=None):
+        if format not in EXTENSIONS:
+            _l.error('unknown report format: %s', format)
+            return
+        if path:
+            self.export(format, path)
+            return
+
+        default = os.path.join(os.path.expanduser('~'), 'sublime-report-{}{}'.format(
+            time.strftime('%Y%m%d-%H%M%S'), EXTENSIONS[format]))
+        self.window.show_input_panel('Save report data to:', default,
+                                     lambda path: self.export(format, path), None, None)
+
+    def export(self, format, path):
+        from ..plugin.report import Report
+        from ..plugin.report import collect_with_progress
+
+        active_view = self.window.active_view()
+        report = Report(view=active_view)
+        collect_with_progress(report, 'Troubleshooting: Collecting report data', active_view,
+                              on_all_done=lambda: self.save(report, format, path))
+
+    def save(self, report, format, path):
+        from ..plugin import export
+        try:
+            if format == 'binary':
+                with open(path, 'wb') as f:
+                    export.dump_binary(report.infos, f)
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    export.dump_json(report.infos, f)
+        except OSError as e:
+            _l.error('could not save report data to %s: %s', path, e)
+            message = 'Troubleshooting: Could not save report data: {}'.format(e)
+        else:
+            message = 'Troubleshooting: Report data saved to {}'.format(path)
+        sublime.set_timeout(lambda: show_status(self.window.active_view(), 'ts.status', message,
+                                                duration=4000), 0)
@@ -1,12 +1,6 @@
-import traceback
-
-from threading import Lock
-
+import sublime
 import sublime_plugin
 
-from ..plugin.report import Report
-from ..plugin.report import show_progress
-
 from ..lib.logging import Logger
 
 
@@ -15,38 +9,53 @@ _l = Logger.from_module(__name__)
 
 __all__ = (
     'GenerateBugReportTemplateCommand',
+    'TsReplaceReportSectionCommand',
     )
 
 
+# Sections larger than this are inserted in several steps so the editor stays responsive.
+MAX_CHUNK_SIZE = 16 * 1024
+
+
+def split_chunks(text, size=MAX_CHUNK_SIZE):
+    """Splits `text` into pieces of about `size` characters, breaking at line ends if possible.
+    """
+    chunks = []
+    while len(text) > size:
+        cut = text.rfind('\n', 0, size) + 1 or size
+        chunks.append(text[:cut])
+        text = text[cut:]
+    chunks.append(text)
+    return chunks
+
+
 class GenerateBugReportTemplateCommand(sublime_plugin.WindowCommand):
     """Generates a template for reporting a bug about Sublime Text. The template
     containes pre-filled system and editor data to help diagnose the issue.
-    """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.lock = Lock()
+    The template is shown right away with placeholders for the collected data, so users can start
+    describing the problem. Each placeholder is replaced as soon as its data is ready.
+    """
 
-    def run(self):
-        def on_each_done(f):
-            nonlocal countdown
-            e = f.exception()
-            if e:
-                _l.debug(e)
-                traceback.print_exception(type(e), e, e.__traceback__)
-            with self.lock:
-                countdown -= 1
-                if countdown == 0:
-                    dispose_progress()
-                    self.show(report)
+    def run(self, refresh=False):
+        """Collects the report data and shows the template in a new view.
 
-        report = Report()
+        Cached data is ignored if `refresh` is true.
+        """
+        # The report machinery is only loaded when it's first needed, to keep startup fast.
+        from ..plugin.report import Report
+        from ..plugin.report import collect_with_progress
 
-        dispose_progress = show_progress("Troubleshooting: Generating report",
-                                         'ts.progress', self.window.active_view())
-        countdown = len(report.infos)
+        def on_each_done(f):
+            index = report.infos.index(f.provider)
+            sublime.set_timeout(lambda: self.show_section(view, report, index), 0)
 
-        report.collect(on_each_done)
+        # Taken before the report's own view becomes the active one.
+        active_view = self.window.active_view()
+        report = Report(refresh=refresh, view=active_view)
+        view = self.show(report)
+        collect_with_progress(report, 'Troubleshooting: Generating report', active_view,
+                              on_each_done=on_each_done)
 
     def show(self, report):
         v = self.window.new_file()
@@ -54,14 +63,67 @@ class GenerateBugReportTemplateCommand(sublime_plugin.WindowCommand):
 
         # insert_snippet bypasses auto indentation and $payload supresses snippet features.
         # Effecitvely, we insert without indentation.
-        v.run_command('insert_snippet', { 'contents': '$payload', 'payload': report.generate() })
+        v.run_command('insert_snippet', { 'contents': '$payload', 'payload': report.generate_header() })
+
+        for i, info in enumerate(report.infos):
+            v.run_command('ts_replace_report_section', {
+                'key': self.region_key(i), 'text': report.generate_placeholder(info), 'append': True})
+
+        v.run_command('ts_replace_report_section', {'text': report.generate_footer(), 'append': True})
 
         v.set_syntax_file('Packages/Markdown/Markdown.tmLanguage')  # also works for .sublime-syntax
 
         self._select_first_input_line(v)
         v.show(v.sel()[0])
+        return v
+
+    def show_section(self, view, report, index):
+        key = self.region_key(index)
+        chunks = split_chunks(report.generate_section(report.infos[index]))
+
+        def insert(i):
+            if not view.is_valid():
+                return
+            view.run_command('ts_replace_report_section', {
+                'key': key, 'text': chunks[i], 'append': i > 0})
+            if i + 1 < len(chunks):
+                sublime.set_timeout(lambda: insert(i + 1), 0)
+            else:
+                view.erase_regions(key)
+
+        insert(0)
+
+    @staticmethod
+    def region_key(index):
+        return 'ts.section.{}'.format(index)
 
     def _select_first_input_line(self, view):
         view.sel().clear()
         second_line = view.line(view.text_point(2, 0))
         view.sel().add(second_line)
+
+
+class TsReplaceReportSectionCommand(sublime_plugin.TextCommand):
+    """Replaces (or appends to) the text in the region stored under `key`.
+
+    Without a `key`, appends `text` to the end of the view. Used internally to fill in the
+    report template while its data is being collected.
+    """
+
+    def run(self, edit, text, key=None, append=False):
+        if key is None:
+            self.view.insert(edit, self.view.size(), text)
+            return
+
+        regions = self.view.get_regions(key)
+        if not regions:
+            region = sublime.Region(self.view.size(), self.view.size())
+        elif append:
+            region = sublime.Region(regions[0].end(), regions[0].end())
+        else:
+            region = regions[0]
+
+        self.view.replace(edit, region, text)
+        start = regions[0].begin() if regions and append else region.begin()
+        self.view.add_regions(key, [sublime.Region(start, region.begin() + len(text))], '', '',
+                              sublime.HIDDEN)
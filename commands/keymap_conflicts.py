@@ -0,0 +1,41 @@
+import sublime
+import sublime_plugin
+
+from ..lib.logging import Logger
+
+
+_l = Logger.from_module(__name__)
+
+
+__all__ = (
+    'DetectKeyBindingConflictsCommand',
+    )
+
+
+class DetectKeyBindingConflictsCommand(sublime_plugin.WindowCommand):
+    """Lists key bindings that conflict with, hide or shadow one another in the keymaps for the
+    current platform. A summary of the last run is also included in reports.
+    """
+
+    def run(self):
+        sublime.status_message('Troubleshooting: Detecting key binding conflicts...')
+        sublime.set_timeout_async(self.detect, 0)
+
+    def detect(self):
+        from ..plugin import keymap_conflicts
+        from ..plugin.data import LoadedSection
+        from ..plugin.report import Report
+
+        report = keymap_conflicts.detect()
+        _l.debug('parsed %d keymaps in %.1f ms', report.files, report.elapsed * 1000)
+        section = LoadedSection('Key bindings', elements=[report.summary_block(limit=None)],
+                                provider='keymaps')
+        text = Report(infos=[]).generate_section(section)
+        sublime.set_timeout(lambda: self.show(text), 0)
+
+    def show(self, text):
+        v = self.window.new_file()
+        v.set_name('Key Binding Conflicts')
+        v.set_scratch(True)
+        v.run_command('ts_replace_report_section', {'text': text})
+        v.set_syntax_file('Packages/Markdown/Markdown.tmLanguage')
@@ -0,0 +1,67 @@
+import sublime
+import sublime_plugin
+
+from ..lib.logging import Logger
+
+
+_l = Logger.from_module(__name__)
+
+
+__all__ = (
+    'MemoryProfilerCommand',
+    )
+
+
+class MemoryProfilerCommand(sublime_plugin.WindowCommand):
+    """Traces memory allocations in the plugin host and attributes them to packages.
+
+    `action` is "start", "snapshot" or "stop". Every snapshot after the first shows how memory
+    changed since the one before; the last two snapshots are also included in reports.
+    """
+
+    def run(self, action='snapshot'):
+        from ..plugin import memory_profile
+
+        if not memory_profile.is_supported():
+            sublime.error_message('Troubleshooting: Memory profiling needs tracemalloc, which '
+                                  'is not available in this version of Python.')
+            return
+
+        if action == 'start':
+            memory_profile.start()
+            sublime.status_message('Troubleshooting: Tracing memory allocations')
+        elif action == 'stop':
+            memory_profile.stop()
+            sublime.status_message('Troubleshooting: Stopped tracing memory allocations')
+        elif action == 'snapshot':
+            if not memory_profile.is_tracing():
+                sublime.status_message('Troubleshooting: Start the memory profiler first')
+                return
+            sublime.status_message('Troubleshooting: Taking memory snapshot...')
+            sublime.set_timeout_async(self.snapshot, 0)
+        else:
+            _l.error('unknown memory profiler action: %s', action)
+
+    def snapshot(self):
+        from ..plugin import memory_profile
+        from ..plugin.data import LoadedSection
+        from ..plugin.report import Report
+
+        memory_profile.take_snapshot()
+        section = LoadedSection('Memory profile', elements=memory_profile.summary_blocks(),
+                                provider='tracemalloc')
+        text = Report(infos=[]).generate_section(section)
+        sublime.set_timeout(lambda: self.show(text), 0)
+
+    def show(self, text):
+        v = self.window.new_file()
+        v.set_name('Memory Profile')
+        v.set_scratch(True)
+        v.run_command('ts_replace_report_section', {'text': text})
+        v.set_syntax_file('Packages/Markdown/Markdown.tmLanguage')
+
+    def is_enabled(self, action='snapshot'):
+        from ..plugin import memory_profile
+        if action == 'start':
+            return not memory_profile.is_tracing()
+        return memory_profile.is_tracing()
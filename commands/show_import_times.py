@@ -0,0 +1,58 @@
+import sublime_plugin
+
+from ..lib import import_times
+
+
+__all__ = (
+    'TsShowImportTimesCommand',
+    )
+
+
+# Modules that commands import when they first run.
+LAZY_MODULES = (
+    'plugin.report',
+    'plugin.export',
+    'plugin.report_diff',
+    )
+
+
+class TsShowImportTimesCommand(sublime_plugin.WindowCommand):
+    """Shows how long the package took to load and what loading the rest of it costs.
+
+    Not in the command palette; run it from the console:
+
+        window.run_command('ts_show_import_times')
+    """
+
+    def run(self):
+        package = __name__.split('.', 1)[0]
+        buf = ['### Import times\n\n']
+
+        startup = import_times.startup()
+        if startup is None:
+            buf.append('> **startup:** not recorded  \n')
+        else:
+            seconds, modules = startup
+            own = [m for m in modules if m == package or m.startswith(package + '.')]
+            buf.append('> **startup:** {:.1f} ms  \n'.format(seconds * 1000))
+            buf.append('> **modules loaded:** {} of this package, {} others  \n'.format(
+                len(own), len(modules) - len(own)))
+            others = [m for m in modules if m not in own]
+            if others:
+                buf.append('> **other modules:** {}  \n'.format(', '.join(others)))
+
+        buf.append('\n##### Loaded on first use\n\n')
+        buf.append('| module | time | modules loaded |\n|---|---:|---:|\n')
+        for name in LAZY_MODULES:
+            seconds, modules = import_times.time_import(package + '.' + name)
+            if not modules:
+                buf.append('| {} | already loaded | |\n'.format(name))
+            else:
+                buf.append('| {} | {:.1f} ms | {} |\n'.format(name, seconds * 1000,
+                                                             len(modules)))
+
+        v = self.window.new_file()
+        v.set_name('Import Times')
+        v.set_scratch(True)
+        v.run_command('ts_replace_report_section', {'text': ''.join(buf)})
+        v.set_syntax_file('Packages/Markdown/Markdown.tmLanguage')
@@ -5,6 +5,8 @@ import sublime_plugin
 
 
 from ..lib.logging import Logger
+from ..plugin import handler_stats
+from .command_recorder import set_recording
 
 
 _l = Logger.from_module(__name__)
@@ -29,11 +31,29 @@ def show_status(view, key, message, duration=0):
     return dispose
 
 
+def set_resource_sampling(enabled):
+    """Starts or stops sampling resource usage; returns `False` if sampling can't start.
+    """
+    from ..lib import procstat
+    if not enabled:
+        procstat.stop()
+        return
+    settings = sublime.load_settings('Troubleshooting.sublime-settings')
+    sampler = procstat.start(interval=settings.get('resource_sample_interval', 1.0),
+                             capacity=settings.get('resource_sample_capacity', 600))
+    if sampler is None:
+        _l.warn('resource usage sampling needs /proc')
+        sublime.status_message('Troubleshooting: Resource usage can only be sampled on Linux')
+        return False
+
+
 logging_states = defaultdict(lambda: False)
 
 
 class ToggleLoggingCommand(sublime_plugin.WindowCommand):
     """Toggles logging of different kinds.
+
+    Toggles return `False` if they can't change the state, after telling the user why.
     """
 
     def __init__(self, *args, **kwargs):
@@ -46,6 +66,9 @@ class ToggleLoggingCommand(sublime_plugin.WindowCommand):
             'result regex',
             'build systems+result regex',
             'indexing',
+            'event handler latency',
+            'command recorder',
+            'resource usage',
             ]
         self.toggles = {
             'commands': lambda x: sublime.log_commands(x),
@@ -53,6 +76,10 @@ class ToggleLoggingCommand(sublime_plugin.WindowCommand):
             'build systems': lambda x: sublime.log_build_systems(x),
             'result regex': lambda x: sublime.log_result_regex(x),
             'indexing': lambda x: sublime.log_indexing(x),
+            'event handler latency': lambda x: (handler_stats.enable() if x
+                                                else handler_stats.disable()),
+            'command recorder': set_recording,
+            'resource usage': set_resource_sampling,
             }
 
     def run(self):
@@ -67,7 +94,8 @@ class ToggleLoggingCommand(sublime_plugin.WindowCommand):
         for kind in kinds.split('+'):
             try:
                 state = logging_states[kind]
-                self.toggles[kind](not state)
+                if self.toggles[kind](not state) is False:
+                    return
                 logging_states[kind] = not state
             except KeyError:
                 _l.debug('unknownw kind of logging: %s', kind)
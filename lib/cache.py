@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from .logging import Logger
+
+
+__all__ = (
+    'DiskCache',
+)
+
+
+_l = Logger.from_module(__name__)
+
+
+class DiskCache(object):
+    """Stores JSON-serializable values on disk, one file per namespace.
+
+    Every value is saved along with an invalidation key chosen by the caller. A value is only
+    returned while the key it was saved with still matches, it's younger than `ttl` seconds and
+    it was written with the same `version`. After each write, the oldest files are evicted
+    until the cache takes up at most `max_bytes`.
+
+    If `refresh` is true, lookups always miss, but new values are still written.
+    """
+
+    def __init__(self, directory, version, ttl=7 * 24 * 3600, max_bytes=4 * 1024 * 1024,
+                 refresh=False):
+        self.directory = directory
+        self.version = version
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.lock = threading.Lock()
+
+    def subcache(self, name, max_bytes=None):
+        """Returns a cache in the subdirectory `name` with its own size limit, so that large
+        values stored there never evict the values stored here, and the other way around.
+        """
+        return DiskCache(os.path.join(self.directory, name), self.version, ttl=self.ttl,
+                         max_bytes=self.max_bytes if max_bytes is None else max_bytes,
+                         refresh=self.refresh)
+
+    def _path(self, namespace):
+        name = hashlib.sha1(namespace.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + '.json')
+
+    @staticmethod
+    def _normalize(key):
+        # Tuples and lists are the same thing once they have been through JSON.
+        return json.loads(json.dumps(key, sort_keys=True))
+
+    def get(self, namespace, key):
+        """Returns the value stored for `namespace`, or `None` if there's no valid value.
+        """
+        if self.refresh:
+            return None
+        try:
+            with open(self._path(namespace), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (entry.get('version') != self.version or
+                entry.get('namespace') != namespace or
+                entry.get('key') != self._normalize(key) or
+                time.time() - entry.get('created', 0) > self.ttl):
+            _l.debug('cache miss for %s', namespace)
+            return None
+        _l.debug('cache hit for %s', namespace)
+        return entry.get('value')
+
+    def put(self, namespace, key, value):
+        entry = {
+            'version': self.version,
+            'namespace': namespace,
+            'key': self._normalize(key),
+            'created': time.time(),
+            'value': value,
+            }
+        path = self._path(namespace)
+        with self.lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp = path + '.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f)
+                os.replace(tmp, path)
+            except (OSError, TypeError, ValueError) as e:
+                _l.debug('could not write cache entry for %s: %s', namespace, e)
+                return
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
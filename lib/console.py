@@ -0,0 +1,138 @@
+import sys
+import time
+
+from array import array
+
+
+__all__ = (
+    'ConsoleBuffer',
+    'install',
+    'uninstall',
+    'shared_buffer',
+    'STDOUT',
+    'STDERR',
+)
+
+
+STDOUT = 0
+STDERR = 1
+
+
+class ConsoleBuffer(object):
+    """Ring buffer of the most recent writes to the console.
+
+    All storage is allocated up front: a write stores a reference to the string it was given
+    plus a timestamp and a stream id in preallocated slots, overwriting the oldest write once the
+    buffer is full. Splitting writes into lines is left to readers.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.texts = [None] * capacity
+        self.times = array('d', [0.0]) * capacity
+        self.streams = bytearray(capacity)
+        self.count = 0
+
+    def write(self, stream, text):
+        i = self.count % self.capacity
+        self.texts[i] = text
+        self.times[i] = time.time()
+        self.streams[i] = stream
+        self.count += 1
+
+    def entries(self):
+        """Returns `(timestamp, stream, text)` for every write still in the buffer, oldest first.
+        """
+        count = self.count
+        start = max(0, count - self.capacity)
+        entries = []
+        for n in range(start, count):
+            i = n % self.capacity
+            text = self.texts[i]
+            if text is not None:
+                entries.append((self.times[i], self.streams[i], text))
+        return entries
+
+    def tail(self, max_lines=200, max_chars=20000):
+        """Returns the last complete lines written, as `(timestamp, stream, line)` tuples.
+
+        Each line gets the timestamp of the write that started it. At most `max_lines` lines and
+        `max_chars` characters are returned; the oldest line that doesn't fit is cut down to the
+        characters at its end that do.
+        """
+        lines = []
+        pending = {}
+        for timestamp, stream, text in self.entries():
+            started, partial = pending.pop(stream, (timestamp, ''))
+            parts = (partial + text).split('\n')
+            for part in parts[:-1]:
+                lines.append((started, stream, part))
+                started = timestamp
+            if parts[-1]:
+                pending[stream] = (started, parts[-1])
+        for stream, (started, partial) in pending.items():
+            lines.append((started, stream, partial))
+        lines.sort(key=lambda line: line[0])
+
+        lines = lines[-max_lines:]
+        total = 0
+        for i in range(len(lines) - 1, -1, -1):
+            total += len(lines[i][2]) + 1
+            if total > max_chars:
+                room = max_chars - (total - len(lines[i][2]))
+                if room <= 0:
+                    return lines[i + 1:]
+                timestamp, stream, line = lines[i]
+                return [(timestamp, stream, line[-room:])] + lines[i + 1:]
+        return lines
+
+
+class _Tee(object):
+    """Forwards writes to the stream it wraps and records them in a ConsoleBuffer.
+    """
+
+    def __init__(self, stream, buffer, stream_id):
+        self._stream = stream
+        self._buffer = buffer
+        self._stream_id = stream_id
+        self._enabled = True
+
+    def write(self, text):
+        if self._enabled:
+            self._buffer.write(self._stream_id, text)
+        return self._stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_buffer = None
+
+
+def shared_buffer():
+    return _buffer
+
+
+def install(capacity=4096):
+    """Starts recording writes to `sys.stdout` and `sys.stderr`, which in Sublime Text are the
+    writers that print to the console.
+    """
+    global _buffer
+    if isinstance(sys.stdout, _Tee) and sys.stdout._enabled:
+        return _buffer
+    _buffer = ConsoleBuffer(capacity)
+    sys.stdout = _Tee(sys.stdout, _buffer, STDOUT)
+    sys.stderr = _Tee(sys.stderr, _buffer, STDERR)
+    return _buffer
+
+
+def uninstall():
+    for name in ('stdout', 'stderr'):
+        stream = getattr(sys, name)
+        if isinstance(stream, _Tee):
+            setattr(sys, name, stream._stream)
+            continue
+        # Somebody wrapped our writer after we did; just stop recording.
+        inner = getattr(stream, '_stream', None)
+        if isinstance(inner, _Tee):
+            inner._enabled = False
@@ -0,0 +1,15 @@
+__all__ = (
+    'format_size',
+)
+
+
+def format_size(size):
+    """Formats a number of bytes for humans, e.g. `1.5 MB`.
+    """
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            break
+        size /= 1024
+    if unit == 'B':
+        return '{} B'.format(int(size))
+    return '{:.1f} {}'.format(size, unit)
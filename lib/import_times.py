@@ -0,0 +1,40 @@
+import importlib
+import sys
+import time
+
+
+__all__ = (
+    'record_startup',
+    'startup',
+    'time_import',
+    )
+
+
+_startup = None
+
+
+def record_startup(seconds, modules):
+    """Remembers how long the package took to load and which modules that loaded.
+    """
+    global _startup
+    _startup = (seconds, sorted(modules))
+
+
+def startup():
+    """Returns `(seconds, module names)` as recorded at startup, or `None`.
+    """
+    return _startup
+
+
+def time_import(name):
+    """Imports the module `name` and returns `(seconds, names of the modules the import loaded)`.
+
+    Returns `(0.0, [])` if the module was already loaded.
+    """
+    if name in sys.modules:
+        return 0.0, []
+    before = set(sys.modules)
+    start = time.perf_counter()
+    importlib.import_module(name)
+    seconds = time.perf_counter() - start
+    return seconds, sorted(set(sys.modules) - before)
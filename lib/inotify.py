@@ -0,0 +1,159 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+
+from .logging import Logger
+
+
+__all__ = (
+    'Watcher',
+    'is_supported',
+)
+
+
+_l = Logger.from_module(__name__)
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# Anything that changes the contents of a directory or the files in it.
+CHANGE_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+               IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+
+def is_supported():
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        _load_libc()
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+class Watcher(object):
+    """Watches directories with inotify and reports changes through a callback.
+
+    `callback` is called from a background thread with the tag passed to `watch()` for the
+    directory that changed. If the kernel drops events because its queue overflowed, the callback
+    is called for every watched tag, since any of them may have changed. Watches are not
+    recursive; callers must watch each directory they care about.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        libc = _load_libc()
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+        self.tags = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._loop, name='ts-inotify')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def watch(self, path, tag):
+        """Starts watching the directory `path`.
+
+        Returns `False` if the watch could not be added, for example because the user has run
+        out of inotify watches.
+        """
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), CHANGE_MASK | IN_ONLYDIR)
+        if wd < 0:
+            e = ctypes.get_errno()
+            if e != errno.ENOENT:
+                _l.debug('cannot watch %s: %s', path, os.strerror(e))
+            return False
+        with self.lock:
+            self.tags[wd] = tag
+        return True
+
+    def unwatch_tag(self, tag):
+        with self.lock:
+            wds = [wd for wd, t in self.tags.items() if t == tag]
+            for wd in wds:
+                del self.tags[wd]
+        for wd in wds:
+            _libc.inotify_rm_watch(self.fd, wd)
+
+    def _loop(self):
+        while not self.stopped.is_set():
+            try:
+                ready, _, _ = select.select([self.fd], [], [], 1.0)
+            except (OSError, ValueError):
+                break
+            if not ready:
+                continue
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+            self._dispatch(data)
+
+    def _dispatch(self, data):
+        changed = set()
+        offset = 0
+        with self.lock:
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    _l.debug('inotify queue overflowed; treating every watch as changed')
+                    changed.update(self.tags.values())
+                    continue
+                tag = self.tags.get(wd)
+                if mask & IN_IGNORED:
+                    self.tags.pop(wd, None)
+                if tag is not None:
+                    changed.add(tag)
+        for tag in changed:
+            try:
+                self.callback(tag)
+            except Exception:
+                _l.exception('error in inotify callback')
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join(2)
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
@@ -1,29 +1,105 @@
+import collections
 import logging
+import queue
+
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
 
 
 class Logger(object):
 
     def __init__(self, logger):
         self.logger = logger
+        # Bind the logger's methods directly so calls don't go through an extra frame.
+        self.info = logger.info
+        self.warn = logger.warning
+        self.error = logger.error
+        self.critical = logger.critical
+        self.exception = logger.exception
+        self.debug = logger.debug
+        self.is_enabled_for = logger.isEnabledFor
 
     @staticmethod
     def from_module(module_name):
         return Logger(logging.getLogger(module_name))
 
-    def info(self, msg, *args):
-        self.logger.info(msg, *args)
 
-    def warn(self, msg, *args):
-        self.logger.warn(msg, *args)
+class truncated(object):
+    """Wraps a value so that it's formatted as a shortened repr, but only if a log record that
+    contains it is actually formatted.
+    """
+
+    __slots__ = ('value', 'limit')
+
+    def __init__(self, value, limit=200):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        text = repr(self.value)
+        if len(text) <= self.limit:
+            return text
+        return '{}... ({} chars)'.format(text[:self.limit], len(text))
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the most recent `capacity` records in memory without formatting them.
+    """
+
+    def __init__(self, capacity):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class LazyQueueHandler(QueueHandler):
+    """Puts records on a queue as they are, leaving all formatting to the listener's thread.
+
+    The stock QueueHandler formats the message before enqueueing it so it can be pickled; we
+    never leave the process, so we don't need to.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+_queue_handler = None
+_listener = None
+_ring_buffer = None
+
+
+def start_queue_logging(logger, handlers, capacity=500):
+    """Makes `logger` hand records to a background thread that passes them on to `handlers`,
+    and keeps the last `capacity` records in a ring buffer. Returns the ring buffer handler.
+    """
+    global _queue_handler, _listener, _ring_buffer
+    stop_queue_logging(logger)
+    records = queue.Queue()
+    _ring_buffer = RingBufferHandler(capacity)
+    _listener = QueueListener(records, *(list(handlers) + [_ring_buffer]))
+    _queue_handler = LazyQueueHandler(records)
+    logger.addHandler(_queue_handler)
+    _listener.start()
+    return _ring_buffer
 
-    def error(self, msg, *args):
-        self.logger.error(msg, *args)
 
-    def critical(self, msg, *args):
-        self.logger.critical(msg, *args)
+def stop_queue_logging(logger):
+    """Undoes `start_queue_logging()`, flushing any records still in the queue.
+    """
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        logger.removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
-    def exception(self, msg, *args):
-        self.logger.exception(msg, *args)
 
-    def debug(self, msg, *args):
-        self.logger.debug(msg, *args)
+def recent_records():
+    """Returns the records in the ring buffer, oldest first.
+    """
+    if _ring_buffer is None:
+        return []
+    return list(_ring_buffer.records)
@@ -0,0 +1,262 @@
+import os
+import threading
+import time
+
+from array import array
+
+from .logging import Logger
+
+
+__all__ = (
+    'ProcessSample',
+    'TimeSeries',
+    'Sampler',
+    'is_supported',
+    'read_sample',
+    'sparkline',
+    'start',
+    'stop',
+    'shared_sampler',
+    'METRICS',
+)
+
+
+_l = Logger.from_module(__name__)
+
+
+try:
+    CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+except (AttributeError, ValueError, OSError):
+    CLOCK_TICKS = 100
+
+
+# Columns of a TimeSeries besides the timestamps, with a description and a unit to append to
+# values.
+METRICS = (
+    ('cpu', 'CPU', '%'),
+    ('rss', 'resident memory', ' MB'),
+    ('threads', 'threads', ''),
+    ('switches', 'context switches', '/s'),
+    ('io', 'I/O', ' KB/s'),
+)
+
+NAN = float('nan')
+
+
+def is_supported():
+    return os.path.exists('/proc/self/stat')
+
+
+class ProcessSample(object):
+    """Raw counters of one process at one point in time. Rates need two samples.
+    """
+
+    __slots__ = ('time', 'cpu_ticks', 'rss', 'threads', 'switches', 'io')
+
+    def __init__(self, time, cpu_ticks, rss, threads, switches, io):
+        self.time = time
+        self.cpu_ticks = cpu_ticks
+        self.rss = rss
+        self.threads = threads
+        self.switches = switches
+        self.io = io
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def read_sample(pid):
+    """Reads the counters of process `pid` from /proc.
+
+    Raises `OSError` if the process is gone. I/O counters of other users' processes can't be
+    read; they are `None` then.
+    """
+    now = time.time()
+    stat = _read('/proc/{}/stat'.format(pid))
+    # The command name is in parentheses and may contain spaces; fields follow the last one.
+    fields = stat[stat.rindex(')') + 2:].split()
+    # utime and stime are fields 14 and 15 of the whole line.
+    cpu_ticks = int(fields[11]) + int(fields[12])
+
+    rss = 0
+    switches = 0
+    for line in _read('/proc/{}/status'.format(pid)).splitlines():
+        key, _, value = line.partition(':')
+        if key == 'VmRSS':
+            rss = int(value.split()[0]) * 1024
+        elif key in ('voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches'):
+            switches += int(value)
+
+    threads = len(os.listdir('/proc/{}/task'.format(pid)))
+
+    io = None
+    try:
+        for line in _read('/proc/{}/io'.format(pid)).splitlines():
+            key, _, value = line.partition(':')
+            if key in ('rchar', 'wchar'):
+                io = (io or 0) + int(value)
+    except OSError:
+        pass
+
+    return ProcessSample(now, cpu_ticks, rss, threads, switches, io)
+
+
+class TimeSeries(object):
+    """Fixed number of samples of every metric in `METRICS`, overwriting the oldest when full.
+
+    Storage is allocated up front, one array of doubles per metric. Missing values are NaN.
+    """
+
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.times = array('d', [0.0]) * capacity
+        self.columns = {name: array('d', [0.0]) * capacity for name, _, _ in METRICS}
+        self.count = 0
+
+    def append(self, timestamp, values):
+        i = self.count % self.capacity
+        self.times[i] = timestamp
+        for name, column in self.columns.items():
+            value = values.get(name)
+            column[i] = NAN if value is None else value
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _indexes(self):
+        start = max(0, self.count - self.capacity)
+        return [n % self.capacity for n in range(start, self.count)]
+
+    def timestamps(self):
+        times = self.times
+        return [times[i] for i in self._indexes()]
+
+    def values(self, name):
+        """Returns the samples of the metric `name`, oldest first, leaving out missing ones.
+        """
+        column = self.columns[name]
+        values = (column[i] for i in self._indexes())
+        return [v for v in values if v == v]
+
+
+class _Process(object):
+
+    __slots__ = ('pid', 'label', 'series', 'last')
+
+    def __init__(self, pid, label, capacity):
+        self.pid = pid
+        self.label = label
+        self.series = TimeSeries(capacity)
+        self.last = None
+
+
+def _rate(current, last, elapsed):
+    if current is None or last is None or elapsed <= 0:
+        return None
+    return (current - last) / elapsed
+
+
+class Sampler(object):
+    """Samples processes every `interval` seconds on a background thread.
+
+    `processes` is a list of `(pid, label)` tuples.
+    """
+
+    def __init__(self, processes, interval=1.0, capacity=600):
+        self.interval = interval
+        self.processes = [_Process(pid, label, capacity) for pid, label in processes]
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.run, name='Troubleshooting sampler')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while True:
+            self.sample()
+            if self.stopped.wait(self.interval):
+                return
+
+    def sample(self):
+        for process in self.processes:
+            try:
+                current = read_sample(process.pid)
+            except (OSError, ValueError, IndexError) as e:
+                _l.debug('cannot sample %s (%s): %s', process.label, process.pid, e)
+                continue
+            last, process.last = process.last, current
+            if last is None:
+                # Rates need a previous sample.
+                continue
+            elapsed = current.time - last.time
+            cpu = _rate(current.cpu_ticks, last.cpu_ticks, elapsed)
+            io = _rate(current.io, last.io, elapsed)
+            process.series.append(current.time, {
+                'cpu': None if cpu is None else cpu / CLOCK_TICKS * 100,
+                'rss': current.rss / (1024.0 * 1024.0),
+                'threads': current.threads,
+                'switches': _rate(current.switches, last.switches, elapsed),
+                'io': None if io is None else io / 1024.0,
+                })
+
+    def series(self):
+        """Returns `(label, TimeSeries)` for every process sampled.
+        """
+        return [(process.label, process.series) for process in self.processes]
+
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+def sparkline(values, width=40):
+    """Returns `values` drawn as a line of block characters, averaging them down to `width`.
+    """
+    if not values:
+        return ''
+    if len(values) > width:
+        step = len(values) / float(width)
+        buckets = [values[int(i * step):int((i + 1) * step)] for i in range(width)]
+        values = [sum(b) / len(b) for b in buckets if b]
+    low, high = min(values), max(values)
+    span = (high - low) or 1.0
+    top = len(SPARK_CHARS) - 1
+    return ''.join(SPARK_CHARS[int(round((v - low) / span * top))] for v in values)
+
+
+_sampler = None
+
+
+def shared_sampler():
+    return _sampler
+
+
+def start(interval=1.0, capacity=600):
+    """Starts sampling the plugin host and its parent, the editor.
+
+    Returns `None` if /proc isn't available.
+    """
+    global _sampler
+    if not is_supported():
+        return None
+    stop()
+    _sampler = Sampler([(os.getpid(), 'plugin host'), (os.getppid(), 'editor')],
+                       interval, capacity)
+    _sampler.start()
+    return _sampler
+
+
+def stop():
+    """Stops sampling. Samples taken so far are kept until sampling starts again.
+    """
+    if _sampler is not None:
+        _sampler.stop()
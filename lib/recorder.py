@@ -0,0 +1,207 @@
+import collections
+import os
+import struct
+import threading
+import time
+
+from .logging import Logger
+
+
+__all__ = (
+    'Recorder',
+    'read_events',
+    'summarize',
+    'TEXT_COMMAND',
+    'WINDOW_COMMAND',
+    'MODIFIED',
+    'SELECTION_MODIFIED',
+)
+
+
+_l = Logger.from_module(__name__)
+
+
+# File layout: MAGIC, a version byte, then records. Each record starts with a kind byte.
+#
+# NAME records (kind 0) intern a name for the rest of the file: `<HH` id and length, then the
+# UTF-8 name. Every other kind is an event: `<dHI` timestamp, name id and payload length,
+# followed by the payload (JSON-encoded command arguments, or an empty string).
+MAGIC = b'TSCR'
+VERSION = 1
+
+NAME = 0
+TEXT_COMMAND = 1
+WINDOW_COMMAND = 2
+MODIFIED = 3
+SELECTION_MODIFIED = 4
+
+KIND_NAMES = {
+    TEXT_COMMAND: 'text command',
+    WINDOW_COMMAND: 'window command',
+    MODIFIED: 'modified',
+    SELECTION_MODIFIED: 'selection modified',
+}
+
+_KIND = struct.Struct('<B')
+_NAME = struct.Struct('<HH')
+_EVENT = struct.Struct('<dHI')
+
+
+class Recorder(object):
+    """Appends events to a compact binary log that rotates once it reaches `max_bytes`.
+
+    Up to `backups` rotated files are kept next to `path`, named `path.1` (the newest) to
+    `path.<backups>`.
+    """
+
+    def __init__(self, path, max_bytes=8 * 1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.lock = threading.Lock()
+        self.file = None
+        self.names = {}
+        self.size = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Names are interned per file and we don't know which ones an existing file defined, so
+        # always start a fresh one.
+        self._start_file(rotate=os.path.exists(path) and os.path.getsize(path) > 0)
+
+    def _start_file(self, rotate):
+        if rotate:
+            self._rotate_files()
+        self.file = open(self.path, 'wb')
+        self.size = 0
+        self.names = {}
+        self._write(MAGIC + bytes((VERSION,)))
+
+    def _rotate_files(self):
+        for i in range(self.backups, 0, -1):
+            src = self.path if i == 1 else '{}.{}'.format(self.path, i - 1)
+            dst = '{}.{}'.format(self.path, i)
+            if os.path.exists(src):
+                os.replace(src, dst)
+
+    def _write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+
+    def _name_id(self, name):
+        name_id = self.names.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names[name] = name_id
+            data = name.encode('utf-8')
+            self._write(_KIND.pack(NAME) + _NAME.pack(name_id, len(data)) + data)
+        return name_id
+
+    def record(self, kind, name, payload=b''):
+        with self.lock:
+            if self.file is None:
+                return
+            # Name ids are 16 bits wide.
+            if self.size >= self.max_bytes or len(self.names) >= 0xffff:
+                self.file.close()
+                self._start_file(rotate=True)
+            name_id = self._name_id(name)
+            self._write(_KIND.pack(kind) + _EVENT.pack(time.time(), name_id, len(payload)) +
+                        payload)
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def files(self):
+        """Returns the log files that exist, oldest first.
+        """
+        return self.files_for(self.path, self.backups)
+
+    @staticmethod
+    def files_for(path, backups=3):
+        paths = ['{}.{}'.format(path, i) for i in range(backups, 0, -1)] + [path]
+        return [p for p in paths if os.path.exists(p)]
+
+
+def read_events(path):
+    """Yields `(kind, timestamp, name, payload)` for every event in the log at `path`.
+
+    A truncated last record, as left behind by a crash, is ignored.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('not a command recording: {}'.format(path))
+    pos = len(MAGIC) + 1
+    names = {}
+    while pos < len(data):
+        kind, = _KIND.unpack_from(data, pos)
+        pos += _KIND.size
+        try:
+            if kind == NAME:
+                name_id, length = _NAME.unpack_from(data, pos)
+                pos += _NAME.size
+                names[name_id] = data[pos:pos + length].decode('utf-8')
+                pos += length
+                continue
+            timestamp, name_id, length = _EVENT.unpack_from(data, pos)
+        except struct.error:
+            return
+        pos += _EVENT.size
+        if pos + length > len(data):
+            return
+        yield kind, timestamp, names.get(name_id, '?'), data[pos:pos + length]
+        pos += length
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(paths, top=20):
+    """Returns markdown describing the events in `paths`: counts per kind and name, and the
+    distribution of the time between consecutive events.
+    """
+    counts = collections.Counter()
+    gaps = []
+    previous = None
+    first = last = None
+    for path in paths:
+        try:
+            events = list(read_events(path))
+        except (OSError, ValueError) as e:
+            _l.debug('cannot read %s: %s', path, e)
+            continue
+        for kind, timestamp, name, _ in events:
+            counts[(kind, name)] += 1
+            if previous is not None:
+                gaps.append(timestamp - previous)
+            previous = timestamp
+            first = timestamp if first is None else first
+            last = timestamp
+
+    buf = ['### Command recording summary\n\n']
+    total = sum(counts.values())
+    if not total:
+        buf.append('No events recorded.\n')
+        return ''.join(buf)
+
+    buf.append('> **events:** {}  \n'.format(total))
+    buf.append('> **time span:** {:.1f} s  \n'.format(last - first))
+    if gaps:
+        gaps.sort()
+        buf.append('> **time between events:** median {:.1f} ms, p95 {:.1f} ms, '
+                   'max {:.1f} ms  \n'.format(_percentile(gaps, 0.5) * 1000,
+                                              _percentile(gaps, 0.95) * 1000, gaps[-1] * 1000))
+
+    buf.append('\n##### Most frequent\n\n')
+    buf.append('| count | kind | name |\n|---:|---|---|\n')
+    for (kind, name), count in counts.most_common(top):
+        buf.append('| {} | {} | {} |\n'.format(count, KIND_NAMES.get(kind, kind), name))
+    return ''.join(buf)
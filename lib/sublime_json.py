@@ -0,0 +1,35 @@
+import json
+import re
+
+
+__all__ = (
+    'decode_value',
+    'load_file',
+    )
+
+
+# Strings are matched too so comment markers inside them are left alone.
+_COMMENT = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+_TRAILING_COMMA = re.compile(r'("(?:\\.|[^"\\])*")|,(\s*[\]}])')
+
+
+def decode_value(text):
+    """Decodes JSON the way `sublime.decode_value()` does, allowing comments and trailing commas,
+    for when the editor's API isn't available.
+
+    Raises `ValueError` if `text` isn't valid.
+    """
+    text = _COMMENT.sub(lambda m: m.group(0) if m.group(0).startswith('"') else '', text)
+    text = _TRAILING_COMMA.sub(lambda m: m.group(1) or m.group(2), text)
+    return json.loads(text)
+
+
+def load_file(path, default=None):
+    """Returns the decoded contents of the file at `path`, or `default` if it can't be read or
+    decoded.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return decode_value(f.read())
+    except (OSError, ValueError):
+        return default
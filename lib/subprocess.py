@@ -1,14 +1,25 @@
 import sys
+import time
 import subprocess as sp
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import Popen
 from subprocess import PIPE
+from subprocess import TimeoutExpired
 
 from .logging import Logger
+from .logging import truncated
 
 
 __all__ = (
     'check_output',
+    'check_output_batch',
+    'CommandResult',
+    'OK',
+    'TIMEOUT',
+    'NOT_FOUND',
+    'ERROR',
 )
 
 
@@ -16,7 +27,6 @@ _l = Logger.from_module(__name__)
 
 
 if sys.platform == 'win32':
-    import ctypes
     from subprocess import STARTUPINFO
     from subprocess import STARTF_USESHOWWINDOW
     from subprocess import SW_HIDE
@@ -26,27 +36,35 @@ if sys.platform == 'win32':
     startup_info.dwFlags = STARTF_USESHOWWINDOW | SW_HIDE
 
 
+    def _popen(args, shell=False):
+        # universal_newlines causes the output to be interpreted as `locale.getpreferredencoding()`,
+        # which doesn't work at times because console (OEM?) applications usually use a different
+        # encoding instead. For example, 850 for Western Europe, 437 for English and 936 for Chinese.
+        return Popen(args, stdout=PIPE, stderr=PIPE, shell=shell, universal_newlines=False,
+                     startupinfo=startup_info)
+
+
     def _check_output(args, shell=False, universal_newlines=False, timeout=None):
         """Conveniently read a process's output on Windows.
 
         Supresses the console window and decodes the binary stream using the
         console's codepage.
         """
-        # universal_newlines causes the output to be interpreted as `locale.getpreferredencoding()`,
-        # which doesn't work at times because console (OEM?) applications usually use a different
-        # encoding instead. For example, 850 for Western Europe, 437 for English and 936 for Chinese.
-        proc = Popen(args, stdout=PIPE, stderr=PIPE, shell=shell, universal_newlines=False,
-                     startupinfo=startup_info)
+        proc = _popen(args, shell=shell)
         data, err = proc.communicate(timeout=timeout)
 
         binary_output = data or err
         if not universal_newlines:
             return binary_output
+        return _decode(binary_output)
+
 
+    def _decode(binary_output):
         # Determine encoding.
         # Normally we would be able to get the encoding with `sys.stdout.encoding`,
         # but sublime.py overrides `sys.stdout` with a custom writer.
         # Do some "guessing" instead and replace chars we cannot decode.
+        import ctypes
         num_encoding = ctypes.windll.kernel32.GetOEMCP()
         if num_encoding:
             encoding = 'cp{}'.format(num_encoding)
@@ -74,8 +92,167 @@ else:
     _check_output = sp.check_output
 
 
+    def _popen(args, shell=False):
+        return Popen(args, stdout=PIPE, stderr=PIPE, shell=shell)
+
+
+    def _decode(binary_output):
+        import locale
+        encoding = locale.getpreferredencoding(False)
+        output = binary_output.decode(encoding, 'replace')
+        return output.replace('\r\n', '\n').strip()
+
+
 def check_output(args, shell=False, universal_newlines=False, timeout=None):
     _l.debug("running %s; shell=%s; universal_newlines=%s;", args, shell, universal_newlines)
     output = _check_output(args, shell=shell, universal_newlines=universal_newlines, timeout=timeout)
-    _l.debug("check_output result: %r", output)
+    _l.debug("check_output result: %s", truncated(output))
     return output
+
+
+# Statuses of a CommandResult.
+OK = 'ok'
+TIMEOUT = 'timeout'
+NOT_FOUND = 'not found'
+ERROR = 'error'
+
+
+class CommandResult(object):
+    """Outcome of one command run by `check_output_batch`.
+
+    `output` is the command's decoded output, or `None` if the command didn't run to completion.
+    `error` holds the exception or a message describing why the status isn't `OK`.
+    """
+
+    def __init__(self, args, status, output=None, error=None):
+        self.args = args
+        self.status = status
+        self.output = output
+        self.error = error
+
+    def __repr__(self):
+        return 'CommandResult({!r}, {!r})'.format(self.args, self.status)
+
+
+def _run(args, shell, deadline):
+    remaining = None if deadline is None else deadline - time.monotonic()
+    if remaining is not None and remaining <= 0:
+        return CommandResult(args, TIMEOUT, error='deadline expired before the command started')
+
+    try:
+        proc = _popen(args, shell=shell)
+    except FileNotFoundError as e:
+        return CommandResult(args, NOT_FOUND, error=e)
+    except Exception as e:
+        return CommandResult(args, ERROR, error=e)
+
+    try:
+        data, err = proc.communicate(timeout=remaining)
+    except TimeoutExpired as e:
+        proc.kill()
+        try:
+            # Grandchildren may keep the pipes open after we kill the process; don't wait for them.
+            proc.communicate(timeout=0.5)
+        except TimeoutExpired:
+            pass
+        return CommandResult(args, TIMEOUT, error=e)
+    except Exception as e:
+        proc.kill()
+        return CommandResult(args, ERROR, error=e)
+
+    output = _decode(data or err)
+    if proc.returncode != 0:
+        return CommandResult(args, ERROR, output=output,
+                             error='exit status {}'.format(proc.returncode))
+    return CommandResult(args, OK, output=output)
+
+
+class _WmicMerger(object):
+    """Merges `wmic <alias> get <property> /value` commands for the same alias.
+
+    `wmic os get a,b /value` prints the same `Name=value` lines `wmic os get a /value` and
+    `wmic os get b /value` would print separately, so we can run one process per alias and split
+    its output afterwards.
+    """
+
+    @staticmethod
+    def key(args):
+        if isinstance(args, str):
+            return None
+        lowered = [arg.lower() for arg in args]
+        if (len(lowered) == 5 and lowered[0] in ('wmic', 'wmic.exe') and lowered[2] == 'get' and
+                lowered[4] == '/value' and ',' not in lowered[3]):
+            return ('wmic', lowered[1])
+        return None
+
+    @staticmethod
+    def merge(commands):
+        first = commands[0]
+        return [first[0], first[1], 'get', ','.join(cmd[3] for cmd in commands), '/value']
+
+    @staticmethod
+    def split(args, output):
+        prefix = args[3].lower() + '='
+        return '\n'.join(line for line in output.splitlines() if line.lower().startswith(prefix))
+
+
+_MERGERS = (_WmicMerger,)
+
+
+def _group(commands):
+    """Groups commands that can run as a single invocation.
+
+    Returns a list of `(merger, indices)` pairs; `merger` is `None` for commands that run alone.
+    """
+    groups = OrderedDict()
+    for i, args in enumerate(commands):
+        for merger in _MERGERS:
+            key = merger.key(args)
+            if key is not None:
+                groups.setdefault((merger, key), []).append(i)
+                break
+        else:
+            groups[(None, i)] = [i]
+    return [(merger if len(indices) > 1 else None, indices)
+            for (merger, _), indices in groups.items()]
+
+
+def check_output_batch(commands, timeout=None, max_workers=4, shell=False, merge=True):
+    """Runs `commands` concurrently and returns a `CommandResult` for each, in the same order.
+
+    `timeout` is a deadline for the whole batch, in seconds: commands still running when it
+    expires are killed and reported as `TIMEOUT`, while the results of commands that finished are
+    kept. Output is always decoded and stripped.
+
+    If `merge` is true, commands that query the same source are run as a single process where
+    possible; each still gets its own result.
+    """
+    commands = list(commands)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    groups = _group(commands) if merge else [(None, [i]) for i in range(len(commands))]
+    _l.debug("running batch of %d commands as %d processes", len(commands), len(groups))
+
+    def run_group(group):
+        merger, indices = group
+        if merger is None:
+            return [_run(commands[indices[0]], shell, deadline)]
+        merged = merger.merge([commands[i] for i in indices])
+        result = _run(merged, shell, deadline)
+        return [CommandResult(commands[i], result.status,
+                              output=None if result.output is None else merger.split(
+                                  commands[i], result.output),
+                              error=result.error)
+                for i in indices]
+
+    results = [None] * len(commands)
+    if not groups:
+        return results
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups))))
+    try:
+        for (_, indices), group_results in zip(groups, executor.map(run_group, groups)):
+            for i, result in zip(indices, group_results):
+                results[i] = result
+    finally:
+        executor.shutdown(wait=False)
+    _l.debug("batch statuses: %s", [r.status for r in results])
+    return results
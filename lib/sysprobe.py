@@ -0,0 +1,166 @@
+# Collects system data in-process, without spawning any commands.
+#
+# Everything here reads from `os.uname()` and, on Linux, from `/proc` and `/etc`, or, on OS X, from
+# sysctl. Functions return `None` for data they cannot read so callers can decide whether to fall
+# back to other means.
+
+import os
+import sys
+
+
+__all__ = (
+    'collect',
+    'uname_data',
+    'cpu_data',
+    'memory_data',
+    'load_average',
+    'os_release',
+)
+
+
+def _read(path):
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _parse_colon_pairs(text):
+    """Parses `key: value` lines like the ones in `/proc/cpuinfo` and `/proc/meminfo`.
+
+    Only the first occurrence of each key is kept.
+    """
+    data = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key = key.strip()
+        if key and key not in data:
+            data[key] = value.strip()
+    return data
+
+
+def uname_data():
+    """Returns the same fields `uname -s`, `uname -m` and `uname -r` would.
+    """
+    try:
+        uname = os.uname()
+    except AttributeError:
+        return None
+    # `uname -p` has no os.uname() equivalent; cpu_data() reports the CPU model instead.
+    return [
+        ('system name', uname.sysname),
+        ('system architecture', uname.machine),
+        ('system version', uname.release),
+    ]
+
+
+def _sysctl_string(name):
+    """Returns the string value of the sysctl `name`, or `None` where there's no sysctlbyname().
+    """
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'))
+        sysctlbyname = libc.sysctlbyname
+    except (OSError, AttributeError, TypeError):
+        return None
+    size = ctypes.c_size_t(0)
+    if sysctlbyname(name.encode('ascii'), None, ctypes.byref(size), None, 0) != 0:
+        return None
+    buf = ctypes.create_string_buffer(size.value)
+    if sysctlbyname(name.encode('ascii'), buf, ctypes.byref(size), None, 0) != 0:
+        return None
+    return buf.value.decode('utf-8', 'replace').strip() or None
+
+
+def cpu_data():
+    count = _cpu_count()
+    text = _read('/proc/cpuinfo')
+    if text is not None:
+        info = _parse_colon_pairs(text)
+        # x86 calls it "model name"; ARM kernels use "Hardware" or "Processor".
+        model = info.get('model name') or info.get('Hardware') or info.get('Processor')
+    elif sys.platform == 'darwin':
+        model = _sysctl_string('machdep.cpu.brand_string')
+    else:
+        model = None
+    data = []
+    if model:
+        data.append(('cpu model', model))
+    if count:
+        data.append(('cpu cores', count))
+    return data or None
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        pass
+    try:
+        return os.cpu_count()
+    except AttributeError:
+        return None
+
+
+def memory_data():
+    text = _read('/proc/meminfo')
+    if text is None:
+        return None
+    info = _parse_colon_pairs(text)
+    data = []
+    for desc, key in (('total memory', 'MemTotal'), ('free memory', 'MemAvailable')):
+        if key in info:
+            data.append((desc, info[key]))
+    if 'MemAvailable' not in info and 'MemFree' in info:
+        # Kernels older than 3.14 don't report MemAvailable.
+        data.append(('free memory', info['MemFree']))
+    return data or None
+
+
+def load_average():
+    text = _read('/proc/loadavg')
+    if text is None:
+        return None
+    fields = text.split()
+    if len(fields) < 3:
+        return None
+    return [('load average', ' '.join(fields[:3]))]
+
+
+def os_release():
+    for path in ('/etc/os-release', '/usr/lib/os-release'):
+        text = _read(path)
+        if text is not None:
+            break
+    else:
+        return None
+    info = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition('=')
+        if sep:
+            info[key.strip()] = value.strip().strip('"\'')
+    name = info.get('PRETTY_NAME') or info.get('NAME')
+    if not name:
+        return None
+    return [('distribution', name)]
+
+
+def collect(volatile=True):
+    """Returns all the data this module can read as a list of `(description, value)` pairs.
+
+    Memory and load data is left out unless `volatile` is true.
+
+    Returns `None` if the basic `uname` fields are not available, in which case callers should
+    fall back to running commands.
+    """
+    data = uname_data()
+    if not data:
+        return None
+    probes = (cpu_data, os_release) + ((memory_data, load_average) if volatile else ())
+    for probe in probes:
+        data.extend(probe() or [])
+    return data
@@ -1,9 +1,24 @@
+import sys
+import time
+
+_startup_started = time.perf_counter()
+_startup_modules = set(sys.modules)
+
+# Start timing other plugins before anything else so we miss as few of them as possible.
+from .plugin import load_times
+load_times.install()
+
+from .lib import console
+console.install()
+
 from logging import DEBUG
 from logging import INFO
 from logging import StreamHandler
 from logging import Formatter
 
 from .lib.logging import Logger
+from .lib.logging import start_queue_logging
+from .lib.logging import stop_queue_logging
 
 
 # Configure this manually if you are a developer
@@ -21,7 +36,27 @@ _console_handler = StreamHandler()
 _formatter = Formatter('[%(asctime)s|%(name)s|%(levelname)s] %(message)s')
 _console_handler.setFormatter(_formatter)
 
-top_level_logger.logger.addHandler(_console_handler)
+# Console writes happen on a background thread; the most recent records are also kept in memory
+# so they can be attached to reports.
+start_queue_logging(top_level_logger.logger, [_console_handler])
 # /////////////////////////////////////////////////////////////////////////////
 
+# Commands only import what they need when they run; keep it that way; see
+# bench/check_startup.py.
 from .commands import *
+
+from .lib import import_times
+import_times.record_startup(time.perf_counter() - _startup_started,
+                            set(sys.modules) - _startup_modules)
+
+
+def plugin_unloaded():
+    from .plugin import package_index
+    from .commands.command_recorder import set_recording
+    from .lib import procstat
+    package_index.shutdown()
+    set_recording(False)
+    procstat.stop()
+    load_times.uninstall()
+    console.uninstall()
+    stop_queue_logging(top_level_logger.logger)
@@ -0,0 +1,138 @@
+import json
+import sys
+
+from collections import Counter
+from collections import OrderedDict
+
+from .data import DataBlock
+from .data import DataItem
+
+
+__all__ = (
+    'FleetSummary',
+    )
+
+
+# Table name -> title. Tables are rendered in this order.
+TABLES = OrderedDict([
+    ('packages', 'Package popularity'),
+    ('ignored', 'Ignored packages'),
+    ('version', 'Sublime Text builds'),
+    ('channel', 'Channels'),
+    ('architecture', 'Architectures'),
+    ('os', 'Operating systems'),
+    ('kernel', 'Kernels'),
+    ])
+
+
+def _blocks(sections):
+    """Yields `(section title, block)` for every block in `sections`.
+    """
+    for section in sections:
+        for element in section.elements:
+            if isinstance(element, DataBlock):
+                yield section.title, element
+
+
+def _items(block):
+    return {item.name: item.value for item in block.items if isinstance(item, DataItem)}
+
+
+def _json_list(value):
+    try:
+        value = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return [v for v in value if isinstance(v, str)] if isinstance(value, list) else []
+
+
+def _most_common(counter, top=None):
+    # Ties are broken by value so merged summaries render the same regardless of merge order.
+    rows = sorted(counter.items(), key=lambda row: (-row[1], row[0]))
+    return rows if top is None else rows[:top]
+
+
+class FleetSummary(object):
+    """Counts of packages, editor builds and platforms over many reports.
+
+    Every value is counted at most once per report, so counts read as "number of reports with".
+    Summaries of different sets of reports can be merged.
+    """
+
+    def __init__(self):
+        self.reports = 0
+        self.unreadable = 0
+        self.counters = {name: Counter() for name in TABLES}
+
+    def add(self, sections):
+        """Counts the values found in the sections of one report.
+        """
+        found = {name: set() for name in TABLES}
+        inventory = []
+        for section_title, block in _blocks(sections):
+            items = _items(block)
+            if block.title == 'Package data':
+                for key in ('installed packages', 'packages'):
+                    found['packages'].update(_json_list(items.get(key)))
+                found['ignored'].update(_json_list(items.get('ignored packages')))
+            elif block.title == 'Package inventory':
+                inventory.extend(items)
+            elif block.title == 'Version and architecture':
+                for name in ('version', 'channel', 'architecture'):
+                    if items.get(name) is not None:
+                        found[name].add(str(items[name]))
+            elif block.title == 'System information':
+                system = items.get('system name')
+                if system is not None:
+                    found['os'].add(str(items.get('distribution') or system))
+                    found['kernel'].add('{} {}'.format(system, items.get('system version', '')))
+            elif block.title == 'Operating System Information':
+                if items.get('Caption'):
+                    found['os'].add(str(items['Caption']))
+                if items.get('Version'):
+                    found['kernel'].add('Windows {}'.format(items['Version']))
+
+        # Saved reports always have the package data block; the inventory also lists the
+        # editor's default packages, so it's only a fallback.
+        if not found['packages']:
+            found['packages'].update(inventory)
+        found['packages'].discard('User')
+
+        self.reports += 1
+        for name, values in found.items():
+            counter = self.counters[name]
+            for value in values:
+                # The same few hundred names repeat across thousands of reports; interning them
+                # makes counter lookups identity hits.
+                counter[sys.intern(value)] += 1
+
+    def merge(self, other):
+        self.reports += other.reports
+        self.unreadable += other.unreadable
+        for name, counter in other.counters.items():
+            self.counters[name].update(counter)
+        return self
+
+    def to_data(self, top=None):
+        return {
+            'reports': self.reports,
+            'unreadable': self.unreadable,
+            'tables': {name: _most_common(self.counters[name], top) for name in TABLES},
+            }
+
+    def to_markdown(self, top=20):
+        buf = ['### Fleet summary\n\n']
+        buf.append('> **reports:** {}  \n'.format(self.reports))
+        buf.append('> **unreadable files:** {}  \n'.format(self.unreadable))
+        for name, title in TABLES.items():
+            counter = self.counters[name]
+            if not counter:
+                continue
+            buf.append('\n##### {}\n\n'.format(title))
+            if len(counter) > top:
+                buf.append('*Top {} of {}*\n\n'.format(top, len(counter)))
+            buf.append('| reports | share | value |\n|---:|---:|---|\n')
+            for value, count in _most_common(counter, top):
+                buf.append('| {} | {:.1f}% | {} |\n'.format(
+                    count, 100.0 * count / max(self.reports, 1), value))
+        return ''.join(buf)
@@ -0,0 +1,39 @@
+import time
+
+from ..lib import console
+
+from .data import DataSection
+from .data import DataProvider
+from .data import PreItem
+
+
+# Recent output printed to the Sublime Text console.
+class ConsoleInfo(DataProvider, DataSection):
+
+    def __init__(self, max_lines=200, max_chars=20000):
+        super().__init__('Recent console output',
+                         description='Last lines printed to the console; stderr lines are '
+                                     'marked with !')
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+
+    @classmethod
+    def from_current(cls):
+        return cls()
+
+    @property
+    def provider(self):
+        return 'sys.stdout and sys.stderr'
+
+    def collect(self):
+        self.elements.clear()
+        buffer = console.shared_buffer()
+        if buffer is None:
+            return
+        lines = buffer.tail(self.max_lines, self.max_chars)
+        if not lines:
+            return
+        self.elements.append(PreItem('\n'.join(
+            '{} {} {}'.format(time.strftime('%H:%M:%S', time.localtime(timestamp)),
+                              '!' if stream == console.STDERR else ' ', line)
+            for timestamp, stream, line in lines)))
@@ -1,8 +1,20 @@
 import abc
 
+from collections import namedtuple
+
 
 class DataProvider(metaclass=abc.ABCMeta):
 
+    # Set by the scheduler when the provider doesn't finish collecting in time.
+    timed_out = False
+
+    # A lib.cache.DiskCache set by the report; None disables caching.
+    cache = None
+
+    # Names of attributes that are saved to the cache along with the elements because they
+    # depend on how the data was collected.
+    cached_attributes = ()
+
     @classmethod
     @abc.abstractmethod
     def from_current(cls):
@@ -22,14 +34,40 @@ class DataProvider(metaclass=abc.ABCMeta):
     def collect(self):
         pass
 
+    def collect_cached(self, namespace, key, collect):
+        """Calls `collect`, which must append elements to `self.elements`, unless the cache has
+        the elements it appended last time under the same `key`.
 
-# TODO: make this a named tuple?
-class DataItem(object):
+        A `key` of `None` means the data cannot be cached. `collect` returns `False` when what it
+        collected is incomplete, e.g. because a command failed or timed out; that isn't cached
+        either, so the next report tries again.
+        """
+        if self.cache is None or key is None:
+            collect()
+            return
 
-    def __init__(self, name, value, description=''):
-        self.name = name
-        self.value = value
-        self.description = description
+        value = self.cache.get(namespace, key)
+        if value is not None:
+            for name, attr in value['attributes'].items():
+                setattr(self, name, attr)
+            self.elements.extend(elements_from_data(value['elements']))
+            return
+
+        start = len(self.elements)
+        if collect() is False:
+            return
+        self.cache.put(namespace, key, {
+            'attributes': {name: getattr(self, name) for name in self.cached_attributes},
+            'elements': elements_to_data(self.elements[start:]),
+            })
+
+
+class DataItem(namedtuple('DataItem', 'name value description')):
+
+    __slots__ = ()
+
+    def __new__(cls, name, value, description=''):
+        return super().__new__(cls, name, value, description)
 
     def __str__(self):
         return '{0}={1}'.format(self.name, self.value)
@@ -37,11 +75,23 @@ class DataItem(object):
 
 class DataBlock(object):
 
+    __slots__ = ('title', 'description', 'items')
+
     def __init__(self, title, description='', items=None):
         self.title = title
         self.description = description
         self.items = items or []
 
+    # Blocks are equal if they hold the same data, so unchanged blocks of two reports compare
+    # equal. They're mutable, and so not hashable.
+    def __eq__(self, other):
+        if not isinstance(other, DataBlock):
+            return NotImplemented
+        return ((self.title, self.description, self.items) ==
+                (other.title, other.description, other.items))
+
+    __hash__ = None
+
     def __str__(self):
         title = [self.title] if not self.items else [self.title + '\n']
         return '\n'.join(title + [str(item) for item in self.items])
@@ -49,15 +99,26 @@ class DataBlock(object):
 
 class PreItem(object):
 
+    __slots__ = ('content',)
+
     def __init__(self, content):
         self.content = content
 
+    def __eq__(self, other):
+        if not isinstance(other, PreItem):
+            return NotImplemented
+        return self.content == other.content
+
+    __hash__ = None
+
     def __str__(self):
         return self.content
 
 
 class DataSection(object):
 
+    __slots__ = ('title', 'description', 'elements')
+
     def __init__(self, title, description='', elements=None):
         self.title = title
         self.description = description
@@ -69,8 +130,22 @@ class DataSection(object):
         return '\n'.join(title + [str(block) for block in self.elements])
 
 
+class LoadedSection(DataSection):
+    """A section read back from a saved report rather than collected from a provider.
+    """
+
+    __slots__ = ('provider', 'timed_out')
+
+    def __init__(self, title, description='', elements=None, provider='', timed_out=False):
+        super().__init__(title, description, elements)
+        self.provider = provider
+        self.timed_out = timed_out
+
+
 class UserDataSection(DataSection):
 
+    __slots__ = ()
+
     def __init__(self, title, description):
         super().__init__(title, description)
 
@@ -81,3 +156,34 @@ class UserDataSection(DataSection):
     @items.setter
     def items(self, value):
         raise TypeError('cannot have items')
+
+
+def elements_to_data(elements):
+    """Converts section elements to JSON-serializable data.
+    """
+    data = []
+    for element in elements:
+        if isinstance(element, DataBlock):
+            data.append({'block': element.title, 'description': element.description,
+                         'items': elements_to_data(element.items)})
+        elif isinstance(element, PreItem):
+            data.append({'pre': element.content})
+        else:
+            data.append({'item': element.name, 'value': element.value,
+                         'description': element.description})
+    return data
+
+
+def elements_from_data(data):
+    """Inverse of `elements_to_data`.
+    """
+    elements = []
+    for obj in data:
+        if 'block' in obj:
+            elements.append(DataBlock(obj['block'], obj['description'],
+                                      elements_from_data(obj['items'])))
+        elif 'pre' in obj:
+            elements.append(PreItem(obj['pre']))
+        else:
+            elements.append(DataItem(obj['item'], obj['value'], obj['description']))
+    return elements
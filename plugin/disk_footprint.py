@@ -0,0 +1,242 @@
+import heapq
+import os
+import stat
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ..lib.logging import Logger
+
+
+__all__ = (
+    'Footprint',
+    'FootprintAnalyzer',
+    'shared_analyzer',
+    )
+
+
+_l = Logger.from_module(__name__)
+
+
+try:
+    _scandir = os.scandir
+except AttributeError:
+    # Python 3.3, as in Sublime Text 3.
+    _scandir = None
+
+
+def _list_directory(path):
+    """Returns the files directly in `path` as `(size, name)` tuples and the names of its
+    subdirectories. Symlinks are not followed.
+    """
+    files = []
+    dirs = []
+    if _scandir is not None:
+        for entry in _scandir(path):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append((entry.stat(follow_symlinks=False).st_size, entry.name))
+            except OSError:
+                continue
+        return files, dirs
+
+    for name in os.listdir(path):
+        try:
+            st = os.lstat(os.path.join(path, name))
+        except OSError:
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            dirs.append(name)
+        elif stat.S_ISREG(st.st_mode):
+            files.append((st.st_size, name))
+    return files, dirs
+
+
+def _stat_files(path, names):
+    """Returns the files of `names` in `path` that are still regular files as `(size, name)`
+    tuples.
+    """
+    files = []
+    for name in names:
+        try:
+            st = os.lstat(os.path.join(path, name))
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            files.append((st.st_size, name))
+    return files
+
+
+class _Directory(object):
+    """The listing of one directory, remembered between runs while its mtime is the same.
+    """
+
+    __slots__ = ('mtime', 'files', 'subdirs')
+
+    def __init__(self, mtime, files, subdirs):
+        self.mtime = mtime
+        # Names of the files directly in the directory.
+        self.files = files
+        self.subdirs = subdirs
+
+
+class _Total(object):
+
+    __slots__ = ('size', 'files', 'partial', 'largest', 'directories')
+
+    def __init__(self):
+        self.size = 0
+        self.files = 0
+        # Whether some subdirectory was left out because of the depth or time limits.
+        self.partial = False
+        # Largest files as `(size, path)`.
+        self.largest = []
+        # Subtree totals of the directories near the root as `(size, path)`.
+        self.directories = []
+
+    def add(self, other, top):
+        self.size += other.size
+        self.files += other.files
+        self.partial = self.partial or other.partial
+        self.largest = heapq.nlargest(top, self.largest + other.largest)
+        self.directories.extend(other.directories)
+
+
+class Footprint(object):
+    """Disk usage of a directory tree, as found by `FootprintAnalyzer.analyze()`.
+    """
+
+    def __init__(self, root, total, elapsed, listed, reused, top):
+        self.root = root
+        self.size = total.size
+        self.files = total.files
+        self.partial = total.partial
+        self.largest_files = total.largest
+        self.largest_directories = heapq.nlargest(top, total.directories)
+        self.elapsed = elapsed
+        # Directories that had to be listed and directories whose listing was reused.
+        self.listed = listed
+        self.reused = reused
+
+
+class FootprintAnalyzer(object):
+    """Adds up the size of directory trees, in parallel across the root's subdirectories.
+
+    Listings are remembered by directory mtime, so later runs only list directories that had
+    entries added, removed or renamed. Files are stat'ed on every run, since rewriting a file in
+    place doesn't change the mtime of its directory. Listings of directories a run doesn't reach
+    are forgotten.
+    """
+
+    def __init__(self, max_workers=4, top=10, report_depth=2):
+        self.max_workers = max_workers
+        self.top = top
+        # Directories up to this depth below the root are candidates for the largest ones.
+        self.report_depth = report_depth
+        self.known = {}
+        self.lock = threading.Lock()
+
+    def analyze(self, root, max_depth=8, time_budget=2.0):
+        """Returns the `Footprint` of `root`, not descending further than `max_depth` levels and
+        not starting on new directories after `time_budget` seconds.
+        """
+        start = time.perf_counter()
+        deadline = start + time_budget
+        # Directories listed and directories whose listing was reused.
+        counts = [0, 0]
+        visited = set()
+
+        total = _Total()
+        node, files = self._directory(root, counts, visited)
+        if node is not None:
+            self._add_files(total, root, files)
+            subdirs = [os.path.join(root, name) for name in node.subdirs]
+            if max_depth < 1:
+                total.partial = bool(subdirs)
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    for subtotal in executor.map(
+                            lambda path: self._walk(path, 1, max_depth, deadline, counts,
+                                                    visited), subdirs):
+                        total.add(subtotal, self.top)
+        self._forget_unvisited(root, visited)
+
+        listed, reused = counts
+        return Footprint(root, total, time.perf_counter() - start, listed, reused, self.top)
+
+    def _directory(self, path, counts, visited):
+        """Returns the listing of `path` and its files as `(size, name)` tuples, or `None` twice
+        if it can't be read.
+        """
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError as e:
+            _l.debug('cannot stat %s: %s', path, e)
+            return None, None
+
+        with self.lock:
+            visited.add(path)
+            node = self.known.get(path)
+            if node is not None and node.mtime == mtime:
+                counts[1] += 1
+                return node, _stat_files(path, node.files)
+
+        try:
+            files, subdirs = _list_directory(path)
+        except OSError as e:
+            _l.debug('cannot list %s: %s', path, e)
+            return None, None
+        node = _Directory(mtime, [name for _, name in files], subdirs)
+        with self.lock:
+            self.known[path] = node
+            counts[0] += 1
+        return node, files
+
+    def _forget_unvisited(self, root, visited):
+        prefix = os.path.join(root, '')
+        with self.lock:
+            for path in [p for p in self.known if p == root or p.startswith(prefix)]:
+                if path not in visited:
+                    del self.known[path]
+
+    def _add_files(self, total, path, files):
+        total.size += sum(size for size, _ in files)
+        total.files += len(files)
+        total.largest = heapq.nlargest(
+            self.top, total.largest + [(size, os.path.join(path, name))
+                                       for size, name in heapq.nlargest(self.top, files)])
+
+    def _walk(self, path, depth, max_depth, deadline, counts, visited):
+        total = _Total()
+        node, files = self._directory(path, counts, visited)
+        if node is None:
+            return total
+
+        self._add_files(total, path, files)
+        if node.subdirs and (depth >= max_depth or time.perf_counter() > deadline):
+            total.partial = True
+        else:
+            for name in node.subdirs:
+                total.add(self._walk(os.path.join(path, name), depth + 1, max_depth, deadline,
+                                     counts, visited), self.top)
+
+        if depth <= self.report_depth:
+            total.directories.append((total.size, path))
+        return total
+
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+
+def shared_analyzer():
+    """Returns the analyzer kept for the lifetime of the plugin host, creating it on first use.
+    """
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = FootprintAnalyzer()
+        return _analyzer
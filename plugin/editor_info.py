@@ -1,6 +1,6 @@
 import abc
-import os
 import json
+import os
 
 import sublime
 
@@ -9,6 +9,28 @@ from .data import DataItem
 from .data import DataBlock
 from .data import DataProvider
 from .data import PreItem
+from .package_data import package_data_block
+from .package_data import package_integrity_block
+from .package_data import package_inventory_block
+from .package_index import shared_index
+from .resource_index import duplicate_syntaxes
+from .resource_index import shared_resource_index
+from . import handler_stats
+from . import keymap_conflicts
+from . import load_times
+from . import memory_profile
+from .disk_footprint import shared_analyzer
+from .settings_resolver import EXPENSIVE_SETTINGS
+from .settings_resolver import preferences_group
+from .settings_resolver import shared_resolver
+from ..lib import procstat
+from ..lib.format import format_size
+
+
+def package_index():
+    default_packages_path = os.path.join(os.path.dirname(sublime.executable_path()), 'Packages')
+    return shared_index(sublime.packages_path(), sublime.installed_packages_path(),
+                        default_packages_path)
 
 
 # Information about a text editor.
@@ -18,10 +40,10 @@ class EditorInfo(DataProvider, DataSection):
         super().__init__('Editor info', *args, **kwargs)
 
     # Returns information about the currently running editor. This is the
-    # only public API.
+    # only public API. `view` is the view the report is about; it defaults to the active one.
     @classmethod
-    def from_current(cls):
-        info = SublimeTextInfo()
+    def from_current(cls, view=None):
+        info = SublimeTextInfo.from_current(view)
         return info
 
     # Indicates where the information was extracted from.
@@ -42,12 +64,13 @@ class EditorInfo(DataProvider, DataSection):
 # Information about Sublime Text.
 class SublimeTextInfo(EditorInfo):
 
-    def __init__(self):
+    def __init__(self, view=None):
         super().__init__(description='General details about Sublime Text')
+        self.view = view
 
     @classmethod
-    def from_current(cls):
-        return cls()
+    def from_current(cls, view=None):
+        return cls(view)
 
     @property
     def provider(self):
@@ -56,14 +79,8 @@ class SublimeTextInfo(EditorInfo):
     def collect(self):
         self.elements.clear()
 
-        db0 = DataBlock('Version and architecture')
-        db0.items.append(DataItem('name', 'Sublime Text'))
-        db0.items.append(DataItem('version', sublime.version()))
-        db0.items.append(DataItem('architecture', sublime.arch()))
-        db0.items.append(DataItem('channel', sublime.channel()))
-        db0.items.append(DataItem('platform', sublime.platform()))
-
-        view = sublime.active_window().active_view()
+        # Views opened to show the report itself aren't what the report is about.
+        view = self.view or sublime.active_window().active_view()
         view_settings = view.settings()
 
         db1 = DataBlock('View settings')
@@ -78,36 +95,49 @@ class SublimeTextInfo(EditorInfo):
         db1.items.append(DataItem('selection count', len(view.sel())))
         db1.items.append(DataItem('has non empty selections', view.has_non_empty_selection_region()))
 
-        self.elements.append(db0)
-
         # TODO: Split the rest up into methods.
+        self.collect_cached('SublimeTextInfo', self.cache_key(), self.collect_version_data)
         self.collect_package_data()
 
         self.elements.append(db1)
         self.elements.append(db2)
 
         self.collect_profiling_data()
+        self.collect_plugin_load_data()
+        self.collect_handler_latency_data()
 
-    def collect_package_data(self):
-        block = DataBlock('Package data')
+    def cache_key(self):
+        return [sublime.version(), sublime.channel(), sublime.arch()]
 
-        _, packages, _ = next(os.walk(sublime.packages_path()))
-        packages = list(packages)
+    def collect_version_data(self):
+        db0 = DataBlock('Version and architecture')
+        db0.items.append(DataItem('name', 'Sublime Text'))
+        db0.items.append(DataItem('version', sublime.version()))
+        db0.items.append(DataItem('architecture', sublime.arch()))
+        db0.items.append(DataItem('channel', sublime.channel()))
+        db0.items.append(DataItem('platform', sublime.platform()))
+        self.elements.append(db0)
 
-        _, _, files = next(os.walk(sublime.installed_packages_path()))
-        suffix = '.sublime-package'
-        files = [f[:-len(suffix)] for f in files if f.endswith(suffix)]
+    def collect_package_data(self):
+        entries = package_index().refresh()
 
         ignored_packages = sublime.load_settings('Preferences.sublime-settings').get('ignored_packages', [])
-
-        block.items.append(DataItem('installed packages', json.dumps(files)))
-        block.items.append(DataItem('packages', json.dumps(packages)))
-        block.items.append(DataItem('ignored packages', json.dumps(ignored_packages)))
+        pc_packages = None
         if sublime.find_resources('Package Control.sublime-settings'):
             pc_packages = sublime.load_settings('Package Control.sublime-settings').get('installed_packages', [])
-            block.items.append(DataItem('packages managed by Package Control', json.dumps(pc_packages)))
 
-        self.elements.append(block)
+        self.elements.append(package_data_block(entries, sublime.installed_packages_path(),
+                                                ignored_packages, pc_packages))
+        self.collect_package_inventory(entries)
+        self.collect_package_integrity(entries)
+
+    def collect_package_inventory(self, entries):
+        self.elements.append(package_inventory_block(entries))
+
+    def collect_package_integrity(self, entries):
+        block = package_integrity_block(entries, self.cache)
+        if block is not None:
+            self.elements.append(block)
 
     def collect_profiling_data(self):
         if sublime.version() < '3102':
@@ -117,3 +147,264 @@ class SublimeTextInfo(EditorInfo):
         block = DataBlock('Profiling data (as reported by Default/profile.py)')
         block.items.append(PreItem(profile_text().strip()))
         self.elements.append(block)
+
+    def collect_plugin_load_data(self):
+        totals = load_times.package_totals()
+        if not totals:
+            return
+
+        block = DataBlock('Plugin load times',
+                          description='Packages loaded before Troubleshooting are only timed '
+                                      'from plugin_loaded() on')
+        for package, modules, imported, loaded in totals:
+            value = '{:.1f} ms (import {:.1f} ms, plugin_loaded {:.1f} ms, {} modules)'.format(
+                (imported + loaded) * 1000, imported * 1000, loaded * 1000, modules)
+            block.items.append(DataItem(package, value))
+        self.elements.append(block)
+
+    def collect_handler_latency_data(self):
+        stats = handler_stats.slowest()
+        if not stats:
+            return
+
+        block = DataBlock('Slowest event handlers',
+                          description='Measured while event handler latency logging was on')
+        for s in stats:
+            value = ('{:.1f} ms total, {} calls, mean {:.2f} ms, p95 <= {:.2f} ms, '
+                     'max {:.2f} ms').format(s.total * 1000, s.count, s.total / s.count * 1000,
+                                             s.percentile(0.95) * 1000, s.max * 1000)
+            block.items.append(DataItem(s.name, value))
+        self.elements.append(block)
+
+
+# Settings that slow down the editor, as they apply to a view.
+class SettingsAuditInfo(DataProvider, DataSection):
+
+    def __init__(self, view=None):
+        super().__init__('Settings audit',
+                         description='Settings known to slow down the editor, where they are set')
+        self.view = view
+
+    @classmethod
+    def from_current(cls, view=None):
+        return cls(view)
+
+    @property
+    def provider(self):
+        return 'settings files'
+
+    def collect(self):
+        self.elements.clear()
+
+        view = self.view or sublime.active_window().active_view()
+        groups = [preferences_group(sublime.platform())]
+        # Syntax-specific settings apply on top of the preferences.
+        syntax = (view.settings().get('syntax') if view else None) or ''
+        syntax_name = os.path.splitext(syntax.rsplit('/', 1)[-1])[0]
+        if syntax_name:
+            groups.append([syntax_name + '.sublime-settings'])
+        resolved = shared_resolver().resolve(groups)
+
+        block = DataBlock('Expensive settings',
+                          description='Effective values for {} views and the file that sets '
+                                      'them, out of {} settings files'.format(
+                                          syntax_name or 'plain', len(resolved.layers)))
+        for name, reason in EXPENSIVE_SETTINGS:
+            value, layer = resolved.effective(name)
+            if layer is None:
+                continue
+            text = json.dumps(value)
+            if len(text) > 120:
+                text = text[:117] + '...'
+            count = len(resolved.defined_in(name))
+            block.items.append(DataItem(name, '{} (from {}; set in {} file{})'.format(
+                text, layer.resource, count, '' if count == 1 else 's'), reason))
+        self.elements.append(block)
+
+
+# Package files that override others, and syntaxes defined more than once.
+class ResourceOverrideInfo(DataProvider, DataSection):
+
+    def __init__(self, limit=50):
+        super().__init__('Overridden resources',
+                         description='Package files that replace files of other packages')
+        self.limit = limit
+
+    @classmethod
+    def from_current(cls):
+        return cls()
+
+    @property
+    def provider(self):
+        return 'package index'
+
+    def collect(self):
+        self.elements.clear()
+
+        index = package_index()
+        overrides = shared_resource_index().update(index.refresh(), index.shadowed_entries())
+        if overrides:
+            loose = [o for o in overrides if o.loose]
+            stale = sum(1 for o in loose if o.stale)
+            # An archive in Installed Packages replaces a shipped one as a whole; list it once.
+            replaced = {}
+            for o in overrides:
+                if not o.loose:
+                    replaced.setdefault((o.path, o.overridden_path, o.stale), []).append(o)
+            block = DataBlock('Overridden package files',
+                              description='{} loose files override files in archives, {} of '
+                                          'them older than the archive; {} archives replace '
+                                          'archives shipped with Sublime Text'.format(
+                                              len(loose), stale, len(replaced)))
+            for (path, overridden_path, is_stale), found in sorted(replaced.items()):
+                block.items.append(DataItem(os.path.basename(path), 'replaces {} ({} files in '
+                                            'both){}'.format(overridden_path, len(found),
+                                                             ' (stale: the shipped archive is '
+                                                             'newer)' if is_stale else '')))
+            # Stale overrides are the likely culprits; list them first.
+            for o in sorted(loose, key=lambda o: not o.stale)[:self.limit]:
+                block.items.append(DataItem(o.resource, 'overrides {}{}'.format(
+                    os.path.basename(o.overridden_path),
+                    ' (stale: the archive is newer)' if o.stale else '')))
+            self.elements.append(block)
+
+        syntaxes = sublime.find_resources('*.sublime-syntax') + sublime.find_resources('*.tmLanguage')
+        duplicates = duplicate_syntaxes(syntaxes)
+        if duplicates:
+            block = DataBlock('Duplicate syntaxes')
+            for name, resources in duplicates[:self.limit]:
+                block.items.append(DataItem(name, ', '.join(resources)))
+            self.elements.append(block)
+
+        if not self.elements:
+            self.elements.append(DataItem('overrides', 'none'))
+
+
+# Where the data and cache directories use the most disk space.
+class DiskUsageInfo(DataProvider, DataSection):
+
+    def __init__(self, max_depth=8, time_budget=2.0):
+        super().__init__('Disk usage',
+                         description='The largest directories and files in the data and cache '
+                                     'directories')
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+
+    @classmethod
+    def from_current(cls):
+        settings = sublime.load_settings('Troubleshooting.sublime-settings')
+        return cls(max_depth=settings.get('disk_footprint_max_depth', 8),
+                   time_budget=settings.get('disk_footprint_time_budget', 2.0))
+
+    @property
+    def provider(self):
+        return 'file system'
+
+    def collect(self):
+        self.elements.clear()
+
+        data_dir = os.path.dirname(sublime.packages_path())
+        roots = [data_dir]
+        # On Linux, caches and indexes live outside the data directory.
+        cache_dir = os.path.dirname(sublime.cache_path())
+        if not (cache_dir + os.sep).startswith(data_dir + os.sep):
+            roots.append(cache_dir)
+
+        footprints = [shared_analyzer().analyze(root, self.max_depth, self.time_budget)
+                      for root in roots]
+        block = DataBlock('Largest directories and files', description='; '.join(
+            '{} holds {} in {} files{}'.format(f.root, format_size(f.size), f.files,
+                                               ' (incomplete)' if f.partial else '')
+            for f in footprints))
+        directories = sorted((d for f in footprints for d in f.largest_directories),
+                             reverse=True)[:10]
+        for size, path in directories:
+            block.items.append(DataItem(path + os.sep, format_size(size)))
+        files = sorted((d for f in footprints for d in f.largest_files), reverse=True)[:10]
+        for size, path in files:
+            block.items.append(DataItem(path, format_size(size)))
+        self.elements.append(block)
+
+
+# CPU, memory and I/O of the editor's processes, while resource usage sampling is on.
+class ResourceUsageInfo(DataProvider, DataSection):
+
+    def __init__(self, sampler):
+        super().__init__('Resource usage')
+        self.sampler = sampler
+
+    # Returns `None` unless resource usage is being sampled.
+    @classmethod
+    def from_current(cls):
+        sampler = procstat.shared_sampler()
+        return cls(sampler) if sampler is not None else None
+
+    @property
+    def provider(self):
+        return '/proc'
+
+    def collect(self):
+        self.elements.clear()
+
+        block = DataBlock('Processes')
+        for label, series in self.sampler.series():
+            if not len(series):
+                continue
+            timestamps = series.timestamps()
+            block.description = 'Sampled every {:g} s for the last {:.0f} s'.format(
+                self.sampler.interval, timestamps[-1] - timestamps[0])
+            for name, description, unit in procstat.METRICS:
+                values = series.values(name)
+                if not values:
+                    continue
+                value = 'min {:.1f}{unit}, avg {:.1f}{unit}, max {:.1f}{unit} {}'.format(
+                    min(values), sum(values) / len(values), max(values),
+                    procstat.sparkline(values), unit=unit)
+                block.items.append(DataItem('{} {}'.format(label, description), value))
+        if block.items:
+            self.elements.append(block)
+        else:
+            self.elements.append(DataItem('samples', 'none yet'))
+
+
+# Memory by package in the last snapshots of the memory profiler.
+class MemoryProfileInfo(DataProvider, DataSection):
+
+    def __init__(self):
+        super().__init__('Memory profile')
+
+    # Returns `None` unless the memory profiler has taken a snapshot.
+    @classmethod
+    def from_current(cls):
+        return cls() if memory_profile.snapshots() else None
+
+    @property
+    def provider(self):
+        return 'tracemalloc'
+
+    def collect(self):
+        self.elements.clear()
+        self.elements.extend(memory_profile.summary_blocks())
+
+
+# Summary of the last key binding conflict detection.
+class KeyBindingInfo(DataProvider, DataSection):
+
+    def __init__(self, report):
+        super().__init__('Key bindings')
+        self.report = report
+
+    # Returns `None` unless conflicts have been detected since the plugin host started. Parsing
+    # every keymap is too slow to do for every report.
+    @classmethod
+    def from_current(cls):
+        report = keymap_conflicts.last_report()
+        return cls(report) if report is not None else None
+
+    @property
+    def provider(self):
+        return 'keymaps'
+
+    def collect(self):
+        self.elements.clear()
+        self.elements.append(self.report.summary_block())
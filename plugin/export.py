@@ -0,0 +1,338 @@
+import json
+import struct
+import time
+
+from .data import DataBlock
+from .data import DataItem
+from .data import LoadedSection
+from .data import PreItem
+from .data import elements_from_data
+
+
+__all__ = (
+    'SCHEMA_VERSION',
+    'dump_json',
+    'dump_binary',
+    'load',
+    'load_json',
+    'load_binary',
+    )
+
+
+# Bump this whenever the layout of saved reports changes. Readers reject newer versions.
+#
+# A report is a mapping with `schema`, `created` (a Unix timestamp) and `sections`. Each section
+# has `title`, `description`, `provider`, `timed_out` and `elements`, which is empty for sections
+# that timed out, since whatever they hold was still being collected. An element is one of
+#   {"item": name, "value": value, "description": text}
+#   {"block": title, "description": text, "items": [element, ...]}
+#   {"pre": text}
+# which is the same layout the provider cache uses.
+SCHEMA_VERSION = 1
+
+BINARY_MAGIC = b'TSRP'
+
+# Binary record tags.
+_END = 0
+_SECTION = 1
+_BLOCK = 2
+_ITEM = 3
+_PRE = 4
+
+# Binary value tags.
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_STR_REF = 6
+
+_DOUBLE = struct.Struct('<d')
+
+
+def _sections_meta(sections):
+    for section in sections:
+        timed_out = bool(getattr(section, 'timed_out', False))
+        # A provider that timed out may still be adding to its elements from another thread.
+        elements = () if timed_out else section.elements
+        yield section, getattr(section, 'provider', ''), timed_out, elements
+
+
+def _json_scalar(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return json.dumps(value)
+    return json.dumps(str(value))
+
+
+# JSON ////////////////////////////////////////////////////////////////////////
+
+def _write_json_elements(write, elements):
+    write('[')
+    for i, element in enumerate(elements):
+        if i:
+            write(',')
+        if isinstance(element, DataBlock):
+            write('{"block":')
+            write(_json_scalar(element.title))
+            write(',"description":')
+            write(_json_scalar(element.description))
+            write(',"items":')
+            _write_json_elements(write, element.items)
+            write('}')
+        elif isinstance(element, PreItem):
+            write('{"pre":')
+            write(_json_scalar(element.content))
+            write('}')
+        else:
+            write('{"item":')
+            write(_json_scalar(element.name))
+            write(',"value":')
+            write(_json_scalar(element.value))
+            write(',"description":')
+            write(_json_scalar(element.description))
+            write('}')
+    write(']')
+
+
+def dump_json(sections, fp, created=None):
+    """Writes `sections` to the text file `fp` as JSON, one small piece at a time.
+    """
+    write = fp.write
+    write('{"schema":%d,"created":%s,"sections":[' % (
+        SCHEMA_VERSION, json.dumps(time.time() if created is None else created)))
+    for i, (section, provider, timed_out, elements) in enumerate(_sections_meta(sections)):
+        if i:
+            write(',')
+        write('{"title":')
+        write(_json_scalar(section.title))
+        write(',"description":')
+        write(_json_scalar(section.description))
+        write(',"provider":')
+        write(_json_scalar(provider))
+        write(',"timed_out":')
+        write('true' if timed_out else 'false')
+        write(',"elements":')
+        _write_json_elements(write, elements)
+        write('}')
+    write(']}\n')
+
+
+def _check_schema(version):
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        raise ValueError('unsupported report schema: {}'.format(version))
+
+
+def report_from_data(data):
+    """Returns `(created, sections)` for a report already decoded from JSON.
+    """
+    _check_schema(data.get('schema'))
+    sections = [LoadedSection(s['title'], s['description'], elements_from_data(s['elements']),
+                              provider=s['provider'], timed_out=s['timed_out'])
+                for s in data['sections']]
+    return data.get('created'), sections
+
+
+def load_json(fp):
+    return report_from_data(json.load(fp))
+
+
+# Binary //////////////////////////////////////////////////////////////////////
+#
+# Records are a tag byte followed by their fields. Integers are unsigned LEB128 varints (signed
+# ones are zigzag-encoded first) and strings are interned: the first occurrence is written in
+# full and later ones refer back to it by index.
+
+def _varint(n):
+    out = bytearray()
+    while True:
+        byte = n & 0x7f
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+class _BinaryWriter(object):
+
+    def __init__(self, fp):
+        self.write = fp.write
+        self.strings = {}
+
+    def tag(self, tag):
+        self.write(bytes((tag,)))
+
+    def uint(self, n):
+        self.write(_varint(n))
+
+    def string(self, text):
+        index = self.strings.get(text)
+        if index is not None:
+            self.tag(_STR_REF)
+            self.uint(index)
+            return
+        self.strings[text] = len(self.strings)
+        data = text.encode('utf-8')
+        self.tag(_STR)
+        self.uint(len(data))
+        self.write(data)
+
+    def value(self, value):
+        if value is None:
+            self.tag(_NONE)
+        elif value is True:
+            self.tag(_TRUE)
+        elif value is False:
+            self.tag(_FALSE)
+        elif isinstance(value, int):
+            self.tag(_INT)
+            self.uint(value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            self.tag(_FLOAT)
+            self.write(_DOUBLE.pack(value))
+        else:
+            self.string(str(value))
+
+    def elements(self, elements):
+        for element in elements:
+            if isinstance(element, DataBlock):
+                self.tag(_BLOCK)
+                self.string(element.title)
+                self.string(element.description)
+                self.elements(element.items)
+                self.tag(_END)
+            elif isinstance(element, PreItem):
+                self.tag(_PRE)
+                self.string(element.content)
+            else:
+                self.tag(_ITEM)
+                self.string(element.name)
+                self.value(element.value)
+                self.string(element.description)
+
+
+def dump_binary(sections, fp, created=None):
+    """Writes `sections` to the binary file `fp` in the compact binary encoding.
+    """
+    w = _BinaryWriter(fp)
+    fp.write(BINARY_MAGIC)
+    w.uint(SCHEMA_VERSION)
+    w.value(time.time() if created is None else float(created))
+    for section, provider, timed_out, elements in _sections_meta(sections):
+        w.tag(_SECTION)
+        w.string(section.title)
+        w.string(section.description)
+        w.string(provider)
+        w.value(timed_out)
+        w.elements(elements)
+        w.tag(_END)
+    w.tag(_END)
+
+
+class _BinaryReader(object):
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.strings = []
+
+    def tag(self):
+        try:
+            tag = self.data[self.pos]
+        except IndexError:
+            raise ValueError('truncated report')
+        self.pos += 1
+        return tag
+
+    def uint(self):
+        n = shift = 0
+        while True:
+            byte = self.tag()
+            n |= (byte & 0x7f) << shift
+            if not byte & 0x80:
+                return n
+            shift += 7
+
+    def string(self):
+        return self._string(self.tag())
+
+    def _string(self, tag):
+        if tag == _STR_REF:
+            return self.strings[self.uint()]
+        if tag != _STR:
+            raise ValueError('expected a string at offset {}'.format(self.pos - 1))
+        length = self.uint()
+        text = bytes(self.data[self.pos:self.pos + length]).decode('utf-8')
+        self.pos += length
+        self.strings.append(text)
+        return text
+
+    def value(self):
+        tag = self.tag()
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            n = self.uint()
+            return n >> 1 if not n & 1 else -((n + 1) >> 1)
+        if tag == _FLOAT:
+            value, = _DOUBLE.unpack_from(self.data, self.pos)
+            self.pos += _DOUBLE.size
+            return value
+        return self._string(tag)
+
+    def elements(self):
+        elements = []
+        while True:
+            tag = self.tag()
+            if tag == _END:
+                return elements
+            if tag == _BLOCK:
+                title = self.string()
+                description = self.string()
+                elements.append(DataBlock(title, description, self.elements()))
+            elif tag == _PRE:
+                elements.append(PreItem(self.string()))
+            elif tag == _ITEM:
+                name = self.string()
+                value = self.value()
+                elements.append(DataItem(name, value, self.string()))
+            else:
+                raise ValueError('unknown record {} at offset {}'.format(tag, self.pos - 1))
+
+
+def load_binary(fp):
+    data = memoryview(fp.read())
+    if bytes(data[:len(BINARY_MAGIC)]) != BINARY_MAGIC:
+        raise ValueError('not a binary report')
+    r = _BinaryReader(data[len(BINARY_MAGIC):])
+    _check_schema(r.uint())
+    created = r.value()
+    sections = []
+    while r.tag() == _SECTION:
+        title = r.string()
+        description = r.string()
+        provider = r.string()
+        timed_out = r.value()
+        sections.append(LoadedSection(title, description, r.elements(), provider=provider,
+                                      timed_out=timed_out))
+    return created, sections
+
+
+def load(path):
+    """Loads a report saved in either format, telling them apart by their first bytes.
+
+    Returns `(created, sections)`.
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(len(BINARY_MAGIC))
+        f.seek(0)
+        if magic == BINARY_MAGIC:
+            return load_binary(f)
+    with open(path, encoding='utf-8') as f:
+        return load_json(f)
@@ -0,0 +1,163 @@
+import bisect
+import functools
+import threading
+import time
+
+
+__all__ = (
+    'enable',
+    'disable',
+    'is_enabled',
+    'reset',
+    'slowest',
+    'BUCKET_BOUNDS',
+    )
+
+
+# Upper bounds of the latency histogram buckets, in seconds. The last bucket is open-ended.
+BUCKET_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                 0.5, 1.0)
+
+
+class HandlerStats(object):
+    """Call count and latency histogram of one handler.
+    """
+
+    __slots__ = ('name', 'count', 'total', 'max', 'buckets')
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, seconds):
+        # Not locked: callbacks run on the main and async threads, and losing the odd update to
+        # a race is cheaper than taking a lock on every keystroke.
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def percentile(self, fraction):
+        """Returns the upper bound of the bucket the given fraction of calls falls under.
+        """
+        wanted = self.count * fraction
+        seen = 0
+        for bound, n in zip(BUCKET_BOUNDS, self.buckets):
+            seen += n
+            if seen >= wanted:
+                return bound
+        return self.max
+
+
+_stats = {}
+# (object, attribute name, original value or None if it was not set on the object itself).
+_patches = []
+_lock = threading.Lock()
+
+
+def _stats_for(name):
+    stats = _stats.get(name)
+    if stats is None:
+        with _lock:
+            stats = _stats.setdefault(name, HandlerStats(name))
+    return stats
+
+
+def _timed(fn, stats):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stats.add(time.perf_counter() - start)
+    wrapper._ts_original = fn
+    return wrapper
+
+
+def _owner(obj):
+    cls = obj if isinstance(obj, type) else type(obj)
+    return '{}.{}'.format(cls.__module__, cls.__name__)
+
+
+def _patch(obj, attr, name):
+    current = getattr(obj, attr, None)
+    if current is None or hasattr(current, '_ts_original'):
+        return
+    own = getattr(obj, '__dict__', {}).get(attr)
+    try:
+        setattr(obj, attr, _timed(current, _stats_for(name)))
+    except AttributeError:
+        # Instances with __slots__ can't be patched.
+        return
+    _patches.append((obj, attr, own))
+
+
+def _skip(obj):
+    # Don't measure ourselves.
+    return _owner(obj).startswith(__name__.split('.', 1)[0] + '.')
+
+
+def enable(sublime_plugin=None):
+    """Starts timing the callbacks of every event listener and the `run` method of every text
+    command currently registered with `sublime_plugin`.
+
+    Plugins loaded after this is called are not measured until instrumentation is enabled again.
+    """
+    if sublime_plugin is None:
+        import sublime_plugin
+    with _lock:
+        if _patches:
+            return
+
+    listeners = []
+    for callback_name, objs in getattr(sublime_plugin, 'all_callbacks', {}).items():
+        listeners.extend((callback_name, obj) for obj in objs)
+    for objs in getattr(sublime_plugin, 'view_event_listeners', {}).values():
+        for obj in objs:
+            listeners.extend((name, obj) for name in dir(type(obj)) if name.startswith('on_'))
+
+    for callback_name, obj in listeners:
+        if not _skip(obj):
+            _patch(obj, callback_name, '{}.{}'.format(_owner(obj), callback_name))
+
+    for cls in getattr(sublime_plugin, 'text_command_classes', []):
+        if not _skip(cls):
+            _patch(cls, 'run', '{}.run'.format(_owner(cls)))
+
+
+def disable():
+    """Removes all timing wrappers. Collected statistics are kept.
+    """
+    with _lock:
+        patches = list(_patches)
+        del _patches[:]
+    for obj, attr, own in reversed(patches):
+        if own is None:
+            try:
+                delattr(obj, attr)
+            except AttributeError:
+                pass
+        else:
+            setattr(obj, attr, own)
+
+
+def is_enabled():
+    return bool(_patches)
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def slowest(count=10):
+    """Returns the `HandlerStats` with the most time spent, most expensive first.
+    """
+    with _lock:
+        stats = [s for s in _stats.values() if s.count]
+    return sorted(stats, key=lambda s: s.total, reverse=True)[:count]
@@ -0,0 +1,265 @@
+import json
+import threading
+import time
+
+from ..lib.logging import Logger
+from ..lib.sublime_json import decode_value
+
+from .data import DataBlock
+from .data import DataItem
+from .settings_resolver import PLATFORM_NAMES
+from .settings_resolver import package_order
+
+
+__all__ = (
+    'Binding',
+    'KeymapReport',
+    'detect',
+    'last_report',
+    'normalize_keys',
+    'parse_keymap',
+    )
+
+
+_l = Logger.from_module(__name__)
+
+
+# Modifiers in the order normalized chords list them.
+MODIFIERS = ('ctrl', 'alt', 'shift', 'super')
+
+class Binding(object):
+    """One key binding. `order` is its position among all bindings; later ones win.
+    """
+
+    __slots__ = ('keys', 'command', 'args', 'context', 'package', 'resource', 'order')
+
+    def __init__(self, keys, command, args, context, package, resource, order=0):
+        self.keys = keys
+        self.command = command
+        self.args = args
+        self.context = context
+        self.package = package
+        self.resource = resource
+        self.order = order
+
+    def describe(self):
+        text = '{} ({})'.format(self.command, self.package)
+        if self.context:
+            text += ' when ' + ', '.join(_describe_clause(c) for c in self.context)
+        return text
+
+
+def _describe_clause(clause):
+    if not isinstance(clause, dict):
+        return str(clause)
+    text = str(clause.get('key'))
+    if 'operator' in clause or 'operand' in clause:
+        text += ' {} {}'.format(clause.get('operator', 'equal'),
+                                json.dumps(clause.get('operand', True)))
+    return text
+
+
+def _normalize_chord(chord, platform):
+    parts = chord.split('+')
+    # "ctrl++" binds the plus key.
+    if chord.endswith('++'):
+        parts = parts[:-2] + ['+']
+    modifiers = set()
+    for part in parts[:-1]:
+        part = part.lower()
+        if part == 'primary':
+            part = 'super' if platform == 'osx' else 'ctrl'
+        elif part == 'option':
+            part = 'alt'
+        elif part in ('command', 'cmd'):
+            part = 'super'
+        modifiers.add(part)
+    key = parts[-1]
+    # Named keys are case-insensitive, and so are letters pressed with modifiers other than shift.
+    if len(key) > 1 or modifiers - {'shift'}:
+        key = key.lower()
+    ordered = [m for m in MODIFIERS if m in modifiers] + sorted(modifiers - set(MODIFIERS))
+    return '+'.join(ordered + [key])
+
+
+def normalize_keys(keys, platform):
+    """Returns the key sequence `keys` as a string that's the same for every way of writing it,
+    e.g. `["Shift+Ctrl+K", "ctrl+u"]` -> `"ctrl+shift+k, ctrl+u"`.
+    """
+    return ', '.join(_normalize_chord(str(chord), platform) for chord in keys)
+
+
+def parse_keymap(resource, text, platform):
+    """Returns the bindings in the keymap `resource`, whose contents are `text`, as tuples of
+    `(keys, command, args, context)` with the keys normalized for `platform`.
+    """
+    try:
+        data = decode_value(text)
+    except ValueError as e:
+        _l.debug('cannot parse %s: %s', resource, e)
+        return []
+    bindings = []
+    for binding in data if isinstance(data, list) else []:
+        if not isinstance(binding, dict) or not isinstance(binding.get('keys'), list):
+            continue
+        context = binding.get('context') or []
+        bindings.append((normalize_keys(binding['keys'], platform), binding.get('command', ''),
+                         binding.get('args'), context if isinstance(context, list) else []))
+    return bindings
+
+
+def _context_key(context):
+    return json.dumps(context, sort_keys=True)
+
+
+def _is_typing_key(keys):
+    # A single character without modifiers other than shift, which is what typing text sends.
+    if ', ' in keys:
+        return False
+    parts = keys.split('+')
+    if keys.endswith('++'):
+        parts = parts[:-2] + ['+']
+    return len(parts[-1]) == 1 and all(m == 'shift' for m in parts[:-1])
+
+
+def _describe_found(kind, bindings):
+    text = bindings[-1].describe()
+    others = bindings[:-1]
+    if kind == 'prefix':
+        return text + ' gets in the way of ' + '; '.join(
+            '{}: {}'.format(b.keys, b.describe()) for b in others)
+    if kind == 'typing key':
+        return '; '.join(b.describe() for b in bindings)
+    return text + ' wins over ' + '; '.join(b.describe() for b in others)
+
+
+class KeymapReport(object):
+    """Conflicts among the key bindings of all keymaps for one platform.
+
+    - `conflicts`: bindings from different packages with the same keys and context; only the last
+      one ever runs.
+    - `shadowed`: bindings with a context that are overridden by a later binding of the same keys
+      with no context at all.
+    - `prefixes`: bindings of keys that also start longer sequences, which they may get in the
+      way of.
+    - `broad`: bindings of keys used for typing that apply everywhere.
+
+    Each is a list of `(keys, bindings)`, ordered so that the binding that wins, or for prefixes
+    the one of the keys themselves, is last.
+    """
+
+    def __init__(self, platform, files, bindings, elapsed):
+        self.platform = platform
+        self.files = files
+        self.bindings = bindings
+        self.elapsed = elapsed
+        self.created = time.time()
+        self.conflicts = []
+        self.shadowed = []
+        self.prefixes = []
+        self.broad = []
+        self._analyze()
+
+    def _analyze(self):
+        by_keys = {}
+        for binding in self.bindings:
+            by_keys.setdefault(binding.keys, []).append(binding)
+
+        sequences = {}
+        for keys, bindings in by_keys.items():
+            if ', ' in keys:
+                sequences.setdefault(keys.split(', ', 1)[0], []).extend(bindings)
+
+        for keys, bindings in sorted(by_keys.items()):
+            by_context = {}
+            for binding in bindings:
+                by_context.setdefault(_context_key(binding.context), []).append(binding)
+            for same in by_context.values():
+                if len(set(b.package for b in same)) > 1:
+                    self.conflicts.append((keys, same))
+
+            last_global = [b for b in bindings if not b.context]
+            if last_global:
+                winner = last_global[-1]
+                hidden = [b for b in bindings if b.context and b.order < winner.order]
+                if hidden:
+                    self.shadowed.append((keys, hidden + [winner]))
+
+            if keys in sequences:
+                self.prefixes.append((keys, sorted(sequences[keys], key=lambda b: b.order) +
+                                      bindings))
+
+            broad = [b for b in bindings
+                     if not b.context and _is_typing_key(keys) and b.package != 'Default']
+            if broad:
+                self.broad.append((keys, broad))
+
+    def summary_block(self, limit=20):
+        block = DataBlock('Key binding conflicts', description=(
+            '{} bindings in {} keymaps for {}, parsed in {:.0f} ms: {} conflicts, {} shadowed, '
+            '{} prefixes, {} on typing keys').format(len(self.bindings), self.files,
+                                                     self.platform, self.elapsed * 1000,
+                                                     len(self.conflicts), len(self.shadowed),
+                                                     len(self.prefixes), len(self.broad)))
+        for kind, found in (('conflict', self.conflicts), ('shadowed', self.shadowed),
+                            ('prefix', self.prefixes), ('typing key', self.broad)):
+            for keys, bindings in found[:limit]:
+                block.items.append(DataItem('{} ({})'.format(keys, kind),
+                                            _describe_found(kind, bindings)))
+        return block
+
+
+def _keymap_resources(api, platform):
+    """Returns every keymap for `platform` in the order the editor applies them: by package, and
+    within a package those for all platforms before those for this one.
+    """
+    own = '({})'.format(PLATFORM_NAMES.get(platform, platform))
+    others = ['({})'.format(name) for key, name in PLATFORM_NAMES.items() if key != platform]
+    resources = []
+    for resource in api.find_resources('*.sublime-keymap'):
+        base = resource.rsplit('/', 1)[-1][:-len('.sublime-keymap')]
+        if any(base.endswith(' ' + other) for other in others):
+            continue
+        package = resource.split('/', 2)[1]
+        resources.append((package_order(package), base.endswith(' ' + own), base, resource))
+    return [resource for _, _, _, resource in sorted(resources)]
+
+
+_last_report = None
+_lock = threading.Lock()
+
+
+def last_report():
+    """Returns the `KeymapReport` of the last `detect()` call, or `None`.
+    """
+    with _lock:
+        return _last_report
+
+
+def detect(api=None):
+    """Parses every keymap for the current platform and returns a `KeymapReport`.
+    """
+    global _last_report
+    if api is None:
+        import sublime as api
+    # Keymaps are small and few; decoding them here is cheaper than handing them to workers.
+    start = time.perf_counter()
+    platform = api.platform()
+    files = 0
+    bindings = []
+    for resource in _keymap_resources(api, platform):
+        try:
+            text = api.load_resource(resource)
+        except (IOError, OSError) as e:
+            _l.debug('cannot load %s: %s', resource, e)
+            continue
+        files += 1
+        package = resource.split('/', 2)[1]
+        for keys, command, args, context in parse_keymap(resource, text, platform):
+            bindings.append(Binding(keys, command, args, context, package, resource,
+                                    len(bindings)))
+
+    report = KeymapReport(platform, files, bindings, time.perf_counter() - start)
+    with _lock:
+        _last_report = report
+    return report
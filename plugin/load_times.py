@@ -0,0 +1,105 @@
+import sys
+import threading
+import time
+
+
+__all__ = (
+    'install',
+    'uninstall',
+    'package_totals',
+    )
+
+
+# Module name -> [import seconds, plugin_loaded seconds or None].
+_records = {}
+_lock = threading.Lock()
+
+_sublime_plugin = None
+_original_reload_plugin = None
+
+
+def _record(module_name, index, seconds):
+    with _lock:
+        record = _records.setdefault(module_name, [None, None])
+        record[index] = seconds
+
+
+def _wrap_plugin_loaded(module):
+    """Times the module's next plugin_loaded() call, then puts the original function back.
+    """
+    original = module.__dict__.get('plugin_loaded')
+    if original is None or getattr(original, '_ts_timed', False):
+        return
+
+    def plugin_loaded():
+        start = time.perf_counter()
+        try:
+            return original()
+        finally:
+            _record(module.__name__, 1, time.perf_counter() - start)
+            if module.__dict__.get('plugin_loaded') is plugin_loaded:
+                module.plugin_loaded = original
+
+    plugin_loaded._ts_timed = True
+    module.plugin_loaded = plugin_loaded
+
+
+def _reload_plugin(modulename):
+    # When the API is ready, reload_plugin calls plugin_loaded itself, so its time is included
+    # in the import time and we can't tell them apart.
+    api_ready = getattr(_sublime_plugin, 'api_ready', False)
+    start = time.perf_counter()
+    try:
+        return _original_reload_plugin(modulename)
+    finally:
+        _record(modulename, 0, time.perf_counter() - start)
+        module = sys.modules.get(modulename)
+        if module is not None and not api_ready:
+            _wrap_plugin_loaded(module)
+
+
+def install(sublime_plugin=None):
+    """Starts timing plugin imports and plugin_loaded() calls.
+
+    Plugins imported before this is called cannot be timed, but their pending plugin_loaded()
+    calls still are. Install as early as possible.
+    """
+    global _sublime_plugin, _original_reload_plugin
+    if sublime_plugin is None:
+        import sublime_plugin
+    if _original_reload_plugin is not None:
+        return
+    _sublime_plugin = sublime_plugin
+    _original_reload_plugin = sublime_plugin.reload_plugin
+    sublime_plugin.reload_plugin = _reload_plugin
+
+    if not getattr(sublime_plugin, 'api_ready', False):
+        for module in list(sys.modules.values()):
+            if module is not None and 'plugin_loaded' in getattr(module, '__dict__', {}):
+                _wrap_plugin_loaded(module)
+
+
+def uninstall():
+    global _sublime_plugin, _original_reload_plugin
+    if _original_reload_plugin is None:
+        return
+    if _sublime_plugin.reload_plugin is _reload_plugin:
+        _sublime_plugin.reload_plugin = _original_reload_plugin
+    _sublime_plugin = None
+    _original_reload_plugin = None
+
+
+def package_totals():
+    """Returns `(package, modules, import seconds, plugin_loaded seconds)` tuples, most expensive
+    package first.
+    """
+    totals = {}
+    with _lock:
+        records = list(_records.items())
+    for module_name, (imported, loaded) in records:
+        package = module_name.split('.', 1)[0]
+        total = totals.setdefault(package, [package, 0, 0.0, 0.0])
+        total[1] += 1
+        total[2] += imported or 0.0
+        total[3] += loaded or 0.0
+    return sorted((tuple(t) for t in totals.values()), key=lambda t: t[2] + t[3], reverse=True)
@@ -0,0 +1,34 @@
+from logging import Formatter
+
+from ..lib.logging import recent_records
+
+from .data import DataSection
+from .data import DataProvider
+from .data import PreItem
+
+
+_formatter = Formatter('[%(asctime)s|%(name)s|%(levelname)s] %(message)s')
+
+
+# Messages logged by this package.
+class LogInfo(DataProvider, DataSection):
+
+    def __init__(self):
+        super().__init__('Troubleshooting log',
+                         description='Most recent messages logged by this package')
+
+    @classmethod
+    def from_current(cls):
+        return cls()
+
+    @property
+    def provider(self):
+        return 'Troubleshooting'
+
+    def collect(self):
+        self.elements.clear()
+        records = recent_records()
+        if not records:
+            return
+        # Records are formatted only now, when somebody actually reads them.
+        self.elements.append(PreItem('\n'.join(_formatter.format(r) for r in records)))
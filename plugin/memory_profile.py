@@ -0,0 +1,244 @@
+import os
+import sys
+import threading
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # Sublime Text 3 runs Python 3.3, which doesn't have tracemalloc.
+    tracemalloc = None
+
+from .data import DataBlock
+from .data import DataItem
+from ..lib.format import format_size
+
+
+__all__ = (
+    'PackageUsage',
+    'is_supported',
+    'is_tracing',
+    'start',
+    'stop',
+    'take_snapshot',
+    'snapshots',
+    'growth',
+    'package_of',
+    'summary_blocks',
+    )
+
+
+# Allocations not made by a file in any package.
+STDLIB = '(Python standard library)'
+OTHER = '(other)'
+
+ARCHIVE_SUFFIX = '.sublime-package'
+
+# Frames kept per allocation. Packages often allocate through the standard library or other
+# packages, so the innermost frame alone rarely names the package responsible.
+TRACEBACK_LIMIT = 25
+
+_stdlib_prefix = os.path.normcase(os.path.dirname(os.__file__))
+
+
+class PackageUsage(object):
+    """Memory allocated by one package at the time of a snapshot, or the change between two.
+    """
+
+    __slots__ = ('package', 'size', 'count')
+
+    def __init__(self, package, size=0, count=0):
+        self.package = package
+        self.size = size
+        self.count = count
+
+
+class Snapshot(object):
+    """What's kept of a tracemalloc snapshot: totals per package, not the traces themselves.
+    """
+
+    def __init__(self, label, created, usage, traces):
+        self.label = label
+        self.created = created
+        # Package name -> PackageUsage.
+        self.usage = usage
+        self.traces = traces
+
+    @property
+    def total(self):
+        return sum(u.size for u in self.usage.values())
+
+
+def is_supported():
+    return tracemalloc is not None
+
+
+def is_tracing():
+    return tracemalloc is not None and tracemalloc.is_tracing()
+
+
+_snapshots = []
+_lock = threading.Lock()
+# Filename -> package; files are looked up once per profiling session.
+_packages_by_file = {}
+_roots = ()
+# Allocations whose innermost frame is in one of these aren't counted: they're tracemalloc's own
+# or can't be attributed to any file.
+_ignored_files = frozenset(filter(None, (getattr(tracemalloc, '__file__', None),
+                                         '<frozen importlib._bootstrap>', '<unknown>')))
+
+
+def _default_roots():
+    import sublime
+    return (sublime.packages_path(),
+            sublime.installed_packages_path(),
+            os.path.join(os.path.dirname(sublime.executable_path()), 'Packages'))
+
+
+def start(roots=None):
+    """Starts tracing allocations. Previous snapshots are discarded.
+
+    `roots` are the directories packages live in; they default to the editor's.
+    """
+    global _roots
+    if tracemalloc is None:
+        raise RuntimeError('tracemalloc is not available in this version of Python')
+    with _lock:
+        del _snapshots[:]
+        _packages_by_file.clear()
+        _roots = tuple(os.path.normcase(os.path.abspath(r)) + os.sep
+                       for r in (roots if roots is not None else _default_roots()))
+    tracemalloc.start(TRACEBACK_LIMIT)
+
+
+def stop():
+    """Stops tracing. Snapshots taken so far are kept.
+    """
+    if is_tracing():
+        tracemalloc.stop()
+
+
+def package_of(filename, roots):
+    """Returns the name of the package `filename` belongs to, given the directories packages live
+    in, or `STDLIB` or `OTHER`.
+    """
+    path = os.path.normcase(filename)
+    for root in roots:
+        if path.startswith(root):
+            name = path[len(root):].split(os.sep, 1)[0]
+            if name.endswith(ARCHIVE_SUFFIX):
+                name = name[:-len(ARCHIVE_SUFFIX)]
+            # Keep the original case of the name.
+            return filename[len(root):len(root) + len(name)]
+    if path.startswith(_stdlib_prefix):
+        return STDLIB
+    return OTHER
+
+
+def _package_of_file(filename):
+    package = _packages_by_file.get(filename)
+    if package is None:
+        package = _packages_by_file[filename] = package_of(filename, _roots)
+    return package
+
+
+def _package_of_traceback(traceback):
+    """Returns the package of the innermost frame in `traceback` that belongs to one, or else
+    what the innermost frame belongs to, or `None` if the allocation shouldn't be counted.
+    """
+    # Since Python 3.7, tracebacks list the oldest frame first.
+    frames = reversed(traceback) if sys.version_info >= (3, 7) else iter(traceback)
+    innermost = None
+    for frame in frames:
+        if innermost is None and frame.filename in _ignored_files:
+            return None
+        package = _package_of_file(frame.filename)
+        if package not in (STDLIB, OTHER):
+            return package
+        if innermost is None:
+            innermost = package
+    return innermost or OTHER
+
+
+def take_snapshot(label=None):
+    """Takes a snapshot of the traced allocations and returns a `Snapshot`.
+    """
+    if not is_tracing():
+        raise RuntimeError('memory profiling is not started')
+    raw = tracemalloc.take_snapshot()
+
+    # Grouping by traceback happens in tracemalloc, so each distinct call path is attributed
+    # once, and each file in it is mapped to a package once per session. Allocations are left
+    # out here rather than with Snapshot.filter_traces(), which checks every trace in Python.
+    usage = {}
+    traces = 0
+    for stat in raw.statistics('traceback'):
+        package = _package_of_traceback(stat.traceback)
+        if package is None:
+            continue
+        traces += stat.count
+        entry = usage.get(package)
+        if entry is None:
+            entry = usage[package] = PackageUsage(package)
+        entry.size += stat.size
+        entry.count += stat.count
+    del raw
+
+    with _lock:
+        snapshot = Snapshot(label or 'snapshot {}'.format(len(_snapshots) + 1), time.time(),
+                            usage, traces)
+        _snapshots.append(snapshot)
+    return snapshot
+
+
+def snapshots():
+    with _lock:
+        return list(_snapshots)
+
+
+def growth(old, new, count=20):
+    """Returns the `count` packages whose memory grew the most from snapshot `old` to `new` as
+    `PackageUsage`s holding the differences, largest first.
+    """
+    changes = []
+    for package in set(old.usage) | set(new.usage):
+        before = old.usage.get(package) or PackageUsage(package)
+        after = new.usage.get(package) or PackageUsage(package)
+        changes.append(PackageUsage(package, after.size - before.size,
+                                    after.count - before.count))
+    changes.sort(key=lambda u: u.size, reverse=True)
+    return changes[:count]
+
+
+def _format_change(usage):
+    sign = '+' if usage.size >= 0 else '-'
+    return '{}{} ({:+d} blocks)'.format(sign, format_size(abs(usage.size)), usage.count)
+
+
+def summary_blocks(count=20):
+    """Returns report blocks with the memory of each package in the last snapshot and how it
+    changed since the one before.
+    """
+    taken = snapshots()
+    if not taken:
+        return []
+    last = taken[-1]
+
+    usage = sorted(last.usage.values(), key=lambda u: u.size, reverse=True)[:count]
+    block = DataBlock('Memory by package',
+                      description='Traced allocations at "{}": {} in {} traces'.format(
+                          last.label, format_size(last.total), last.traces))
+    for u in usage:
+        block.items.append(DataItem(u.package, '{} ({} blocks)'.format(format_size(u.size),
+                                                                      u.count)))
+    blocks = [block]
+
+    if len(taken) > 1:
+        previous = taken[-2]
+        block = DataBlock('Memory growth by package',
+                          description='From "{}" to "{}", {:.0f} s apart'.format(
+                              previous.label, last.label, last.created - previous.created))
+        for u in growth(previous, last, count):
+            block.items.append(DataItem(u.package, _format_change(u)))
+        blocks.append(block)
+    return blocks
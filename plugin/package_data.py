@@ -0,0 +1,72 @@
+import json
+import os
+import time
+
+from .data import DataBlock
+from .data import DataItem
+from .package_index import ZIPPED
+from .package_integrity import shared_scanner
+from ..lib.format import format_size
+
+
+__all__ = (
+    'package_data_block',
+    'package_inventory_block',
+    'package_integrity_block',
+    )
+
+
+# These don't depend on the editor's API, so the same blocks can be built from a data directory
+# on disk.
+
+def package_data_block(entries, installed_packages_path, ignored_packages, managed_packages=None):
+    """Returns the block listing installed, loose and ignored packages.
+
+    `managed_packages` are the packages Package Control installed, or `None` if Package Control
+    isn't installed.
+    """
+    block = DataBlock('Package data')
+    packages = [e.name for e in entries if e.kind != ZIPPED]
+    files = [e.name for e in entries
+             if e.kind == ZIPPED and os.path.dirname(e.path) == installed_packages_path]
+
+    block.items.append(DataItem('installed packages', json.dumps(files)))
+    block.items.append(DataItem('packages', json.dumps(packages)))
+    block.items.append(DataItem('ignored packages', json.dumps(ignored_packages)))
+    if managed_packages is not None:
+        block.items.append(DataItem('packages managed by Package Control',
+                                    json.dumps(managed_packages)))
+    return block
+
+
+def package_inventory_block(entries):
+    block = DataBlock('Package inventory',
+                      description='kind, version, file count, size and last modification')
+    for entry in entries:
+        block.items.append(DataItem(entry.name, '{}, {}, {} files, {}, {}'.format(
+            entry.kind,
+            entry.version or 'no version',
+            entry.file_count,
+            format_size(entry.size),
+            time.strftime('%Y-%m-%d', time.localtime(entry.mtime)) if entry.mtime else 'n/a')))
+    return block
+
+
+def package_integrity_block(entries, cache=None):
+    """Returns the block with the digests of every zipped package, or `None` if there are none.
+    """
+    archives = [entry for entry in entries if entry.kind == ZIPPED]
+    if not archives:
+        return None
+    digests = {d.path: d for d in shared_scanner(cache).scan([e.path for e in archives])}
+
+    block = DataBlock('Package integrity',
+                      description='SHA-256 of the archive and of its member list with CRCs')
+    for entry in archives:
+        digest = digests.get(entry.path)
+        if digest is None:
+            block.items.append(DataItem(entry.name, 'unreadable'))
+            continue
+        block.items.append(DataItem(entry.name, 'archive {}, {} members {}'.format(
+            digest.sha256[:16], len(digest.members), digest.manifest[:16])))
+    return block
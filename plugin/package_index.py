@@ -0,0 +1,288 @@
+import json
+import os
+import stat
+import threading
+import zipfile
+
+from ..lib.logging import Logger
+
+
+__all__ = (
+    'PackageEntry',
+    'PackageIndex',
+    'LOOSE',
+    'ZIPPED',
+    'OVERRIDING',
+    )
+
+
+_l = Logger.from_module(__name__)
+
+
+# Kinds of packages.
+LOOSE = 'loose'
+ZIPPED = 'zipped'
+# A loose package with the same name as a .sublime-package it overrides files of.
+OVERRIDING = 'overriding'
+
+ARCHIVE_SUFFIX = '.sublime-package'
+
+
+class PackageEntry(object):
+    """What the index knows about one package.
+
+    `signature` is whatever `PackageIndex` uses to tell whether the package changed since it was
+    last scanned.
+    """
+
+    def __init__(self, name, kind, path, version, file_count, size, mtime, signature):
+        self.name = name
+        self.kind = kind
+        self.path = path
+        self.version = version
+        self.file_count = file_count
+        self.size = size
+        self.mtime = mtime
+        self.signature = signature
+        # Whether inotify reports changes to this package.
+        self.watched = False
+
+
+def _read_version(data):
+    try:
+        return json.loads(data).get('version', '')
+    except (ValueError, AttributeError):
+        return ''
+
+
+def _scan_archive(name, path, st):
+    try:
+        with zipfile.ZipFile(path) as zf:
+            infos = zf.infolist()
+            version = ''
+            if 'package-metadata.json' in zf.namelist():
+                version = _read_version(zf.read('package-metadata.json').decode('utf-8'))
+    except (OSError, zipfile.BadZipfile) as e:
+        _l.debug('cannot read %s: %s', path, e)
+        infos, version = [], ''
+    return PackageEntry(name, ZIPPED, path, version,
+                        file_count=sum(1 for info in infos if not info.filename.endswith('/')),
+                        size=sum(info.file_size for info in infos),
+                        mtime=st.st_mtime,
+                        signature=(st.st_ino, st.st_size, st.st_mtime))
+
+
+def _scan_directory(name, path, watch=None):
+    """Scans the loose package `name` at `path`.
+
+    `watch`, if given, is called with every directory before it's listed and returns whether the
+    directory is now watched, so that no change made while scanning goes unnoticed. The entry is
+    marked as watched only if every directory is.
+    """
+    file_count = 0
+    size = 0
+    mtime = 0
+    watched = watch is not None
+    # The mtime of every directory, so later refreshes can tell whether files were added or
+    # removed without listing directories again.
+    dir_mtimes = {}
+    pending = [path]
+    while pending:
+        root = pending.pop()
+        if watched:
+            watched = watch(root)
+        try:
+            dir_mtimes[root] = os.stat(root).st_mtime
+            names = os.listdir(root)
+        except OSError:
+            continue
+        for f in names:
+            child = os.path.join(root, f)
+            try:
+                st = os.stat(child)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                # Like os.walk(), don't descend into symlinked directories.
+                if not os.path.islink(child):
+                    pending.append(child)
+                continue
+            file_count += 1
+            size += st.st_size
+            mtime = max(mtime, st.st_mtime)
+
+    version = ''
+    try:
+        with open(os.path.join(path, 'package-metadata.json'), encoding='utf-8') as f:
+            version = _read_version(f.read())
+    except OSError:
+        pass
+    entry = PackageEntry(name, LOOSE, path, version, file_count, size, mtime, dir_mtimes)
+    entry.watched = watched
+    return entry
+
+
+def _directory_changed(dir_mtimes):
+    for path, mtime in dir_mtimes.items():
+        try:
+            if os.stat(path).st_mtime != mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+class PackageIndex(object):
+    """Inventory of installed packages that is updated incrementally.
+
+    Archives are rescanned only when their inode, size or mtime change. Loose packages are
+    rescanned when inotify reports a change in them or, where inotify isn't available, when the
+    mtime of any of their directories changes. Directories are watched before they're scanned, so
+    changes made during a scan mark the package for another one. The latter misses files modified in place, which
+    only affects the reported sizes. Pass `watch=False` for one-off scans that don't need
+    inotify.
+    """
+
+    def __init__(self, packages_path, installed_packages_path, default_packages_path=None,
+                 watch=True):
+        self.packages_path = packages_path
+        self.archive_paths = [p for p in (default_packages_path, installed_packages_path) if p]
+        self.loose = {}
+        self.archives = {}
+        # Archives shipped with the editor that an archive in Installed Packages replaces.
+        self.shadowed = {}
+        self.dirty = set()
+        self.lock = threading.Lock()
+        self.watcher = None
+        if watch:
+            self._start_watcher()
+
+    def _start_watcher(self):
+        from ..lib import inotify
+        if not inotify.is_supported():
+            return
+        try:
+            self.watcher = inotify.Watcher(self._on_change)
+        except OSError as e:
+            _l.debug('inotify unavailable: %s', e)
+
+    def _on_change(self, name):
+        with self.lock:
+            self.dirty.add(name)
+
+    def _scan(self, name):
+        """Scans a loose package, watching its directories first where inotify is available.
+        """
+        path = os.path.join(self.packages_path, name)
+        if self.watcher is None:
+            return _scan_directory(name, path)
+        self.watcher.unwatch_tag(name)
+        entry = _scan_directory(name, path, lambda directory: self.watcher.watch(directory, name))
+        if not entry.watched:
+            self.watcher.unwatch_tag(name)
+        return entry
+
+    def refresh(self):
+        """Brings the index up to date and returns all entries sorted by name.
+        """
+        with self.lock:
+            self._refresh_archives()
+            self._refresh_loose()
+            archived = {entry.name for entry in self.archives.values()}
+            for entry in self.loose.values():
+                entry.kind = OVERRIDING if entry.name in archived else LOOSE
+            return self.entries()
+
+    def entries(self):
+        entries = list(self.archives.values()) + list(self.loose.values())
+        return sorted(entries, key=lambda entry: (entry.name.lower(), entry.kind))
+
+    def shadowed_entries(self):
+        """Returns the entries of archives that another archive of the same name replaces, as of
+        the last refresh, sorted by name. They aren't included in `entries()`.
+        """
+        with self.lock:
+            return sorted(self.shadowed.values(), key=lambda entry: entry.name.lower())
+
+    def _refresh_archives(self):
+        seen = {}
+        shadowed = {}
+        # Later directories override earlier ones, like Installed Packages overrides the
+        # default packages shipped with the editor.
+        for directory in self.archive_paths:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for filename in names:
+                if not filename.endswith(ARCHIVE_SUFFIX):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                name = filename[:-len(ARCHIVE_SUFFIX)]
+                entry = self.archives.get(name)
+                if entry is None or entry.path != path:
+                    entry = self.shadowed.get(name)
+                if (entry is None or entry.path != path or
+                        entry.signature != (st.st_ino, st.st_size, st.st_mtime)):
+                    entry = _scan_archive(name, path, st)
+                if name in seen:
+                    shadowed[name] = seen[name]
+                seen[name] = entry
+        self.archives = seen
+        self.shadowed = shadowed
+
+    def _refresh_loose(self):
+        try:
+            names = [name for name in os.listdir(self.packages_path)
+                     if os.path.isdir(os.path.join(self.packages_path, name))]
+        except OSError:
+            names = []
+
+        current = {}
+        for name in names:
+            entry = self.loose.get(name)
+            if entry is not None:
+                if entry.watched and name not in self.dirty:
+                    current[name] = entry
+                    continue
+                if not entry.watched and not _directory_changed(entry.signature):
+                    current[name] = entry
+                    continue
+            self.dirty.discard(name)
+            current[name] = self._scan(name)
+
+        if self.watcher is not None:
+            for name in set(self.loose) - set(current):
+                self.watcher.unwatch_tag(name)
+        self.loose = current
+
+    def close(self):
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def shared_index(packages_path, installed_packages_path, default_packages_path=None):
+    """Returns the index kept for the lifetime of the plugin host, creating it on first use.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PackageIndex(packages_path, installed_packages_path, default_packages_path)
+        return _index
+
+
+def shutdown():
+    global _index
+    with _index_lock:
+        if _index is not None:
+            _index.close()
+            _index = None
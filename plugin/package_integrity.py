@@ -0,0 +1,170 @@
+import hashlib
+import mmap
+import os
+import threading
+import zipfile
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ..lib.logging import Logger
+
+
+__all__ = (
+    'ArchiveDigest',
+    'IntegrityScanner',
+    )
+
+
+_l = Logger.from_module(__name__)
+
+
+CHUNK_SIZE = 1024 * 1024
+
+# Where digests are kept in the provider cache. Member lists make them large, so they get a cache
+# directory and a size limit of their own.
+DISK_CACHE_NAMESPACE = 'integrity'
+DISK_CACHE_FORMAT = 1
+DISK_CACHE_BYTES = 32 * 1024 * 1024
+
+
+class ArchiveDigest(object):
+    """Digests of one .sublime-package.
+
+    `sha256` covers the whole file. `members` maps each member's name to the CRC-32 stored for
+    it in the zip central directory, and `manifest` is a digest of those, so two archives with
+    the same contents but different timestamps or compression have the same manifest.
+    """
+
+    def __init__(self, path, size, mtime, sha256, manifest, members):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.sha256 = sha256
+        self.manifest = manifest
+        self.members = members
+
+
+def file_digest(path, size):
+    h = hashlib.sha256()
+    if size == 0:
+        # Empty files cannot be memory-mapped.
+        return h.hexdigest()
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                # hashlib releases the GIL for large buffers, so several archives can be hashed
+                # at the same time from different threads.
+                for offset in range(0, len(view), CHUNK_SIZE):
+                    h.update(view[offset:offset + CHUNK_SIZE])
+            finally:
+                view.release()
+    return h.hexdigest()
+
+
+def member_digests(path):
+    with zipfile.ZipFile(path) as zf:
+        members = {info.filename: '{:08x}'.format(info.CRC)
+                   for info in zf.infolist() if not info.filename.endswith('/')}
+    h = hashlib.sha256()
+    for name in sorted(members):
+        h.update(name.encode('utf-8'))
+        h.update(b'\0')
+        h.update(members[name].encode('ascii'))
+        h.update(b'\n')
+    return h.hexdigest(), members
+
+
+class IntegrityScanner(object):
+    """Computes `ArchiveDigest`s for many archives in parallel.
+
+    Digests are remembered by `(path, size, mtime)` in memory and, if given a
+    `lib.cache.DiskCache`, on disk, so unchanged archives are never read twice. On disk, all
+    digests live in a single entry of a cache of their own, which is read once and written at
+    most once per scan.
+    """
+
+    def __init__(self, cache=None, max_workers=None):
+        self.cache = cache
+        self.max_workers = max_workers or _cpu_count()
+        self.known = {}
+        self.lock = threading.Lock()
+
+    def _disk_cache(self):
+        if self.cache is None:
+            return None
+        return self.cache.subcache('integrity', max_bytes=DISK_CACHE_BYTES)
+
+    def scan(self, paths):
+        """Returns a list of `ArchiveDigest`s for `paths`, leaving out unreadable archives.
+        """
+        disk_cache = self._disk_cache()
+        stored = {}
+        if disk_cache is not None:
+            stored = disk_cache.get(DISK_CACHE_NAMESPACE, DISK_CACHE_FORMAT) or {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            digests = [digest for digest in executor.map(lambda p: self.digest(p, stored), paths)
+                       if digest is not None]
+
+        if disk_cache is not None:
+            # Only archives that were just scanned are kept, so removed packages drop out.
+            data = {d.path: {'size': d.size, 'mtime': d.mtime, 'sha256': d.sha256,
+                             'manifest': d.manifest, 'members': d.members} for d in digests}
+            if data != stored:
+                disk_cache.put(DISK_CACHE_NAMESPACE, DISK_CACHE_FORMAT, data)
+        return digests
+
+    def digest(self, path, stored=None):
+        """Returns the `ArchiveDigest` of `path`, or `None` if it's unreadable.
+
+        `stored` maps paths to digests loaded from disk, as saved by `scan()`.
+        """
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            _l.debug('cannot stat %s: %s', path, e)
+            return None
+
+        with self.lock:
+            digest = self.known.get(path)
+        if digest is not None and (digest.size, digest.mtime) == (st.st_size, st.st_mtime):
+            return digest
+
+        data = (stored or {}).get(path)
+        if data is None or (data['size'], data['mtime']) != (st.st_size, st.st_mtime):
+            try:
+                manifest, members = member_digests(path)
+                data = {'sha256': file_digest(path, st.st_size), 'manifest': manifest,
+                        'members': members}
+            except (OSError, ValueError, zipfile.BadZipfile) as e:
+                _l.debug('cannot hash %s: %s', path, e)
+                return None
+
+        digest = ArchiveDigest(path, st.st_size, st.st_mtime, data['sha256'], data['manifest'],
+                               data['members'])
+        with self.lock:
+            self.known[path] = digest
+        return digest
+
+
+def _cpu_count():
+    try:
+        return os.cpu_count() or 2
+    except AttributeError:
+        return 2
+
+
+_scanner = None
+_scanner_lock = threading.Lock()
+
+
+def shared_scanner(cache=None):
+    """Returns the scanner kept for the lifetime of the plugin host, creating it on first use.
+    """
+    global _scanner
+    with _scanner_lock:
+        if _scanner is None:
+            _scanner = IntegrityScanner()
+        _scanner.cache = cache
+        return _scanner
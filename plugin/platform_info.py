@@ -1,8 +1,13 @@
+import os
 import sys
 import abc
-from subprocess import TimeoutExpired
+import time
 
+from ..lib import sysprobe
 from ..lib.subprocess import check_output
+from ..lib.subprocess import check_output_batch
+from ..lib.subprocess import OK
+from ..lib.subprocess import NOT_FOUND
 from ..lib.logging import Logger
 
 from .data import DataSection
@@ -14,6 +19,11 @@ from .data import DataProvider
 _l = Logger.from_module(__name__)
 
 
+# Seconds a batch of commands may run. Keep it below the report deadline so stragglers don't keep
+# worker threads busy long after the report has been shown.
+COMMAND_TIMEOUT = 10
+
+
 # Information about an OS.
 class PlatformInfo(DataProvider, DataSection):
 
@@ -37,7 +47,7 @@ class PlatformInfo(DataProvider, DataSection):
 
     @abc.abstractmethod
     def collect_system_data(self):
-        """ Collects system data.
+        """ Collects system data. Returns `False` if some of it couldn't be collected.
 
         Subclasses must override this method.
         """
@@ -45,19 +55,40 @@ class PlatformInfo(DataProvider, DataSection):
 
     @abc.abstractmethod
     def collect_display_data(self):
-        """ Collects display data.
+        """ Collects display data. Returns `False` if some of it couldn't be collected.
 
         Subclasses must override this method.
         """
         pass
 
+    def collect_volatile_data(self):
+        """ Collects data that changes too often to be cached, like free memory.
+
+        Subclasses need not but can override this method.
+        """
+        pass
+
+    def cache_key(self):
+        """ Returns a key that changes whenever the cached platform data may have changed, or
+        `None` if the data must not be cached.
+
+        Subclasses need not but can override this method.
+        """
+        return None
+
     def collect(self):
         """ Collects all the platform data.
 
         Subclasses need not but can override this method.
         """
-        self.collect_system_data()
-        self.collect_display_data()
+        def collect_static_data():
+            # Failures are often transient, e.g. a command that timed out; only cache complete data.
+            system = self.collect_system_data()
+            display = self.collect_display_data()
+            return system is not False and display is not False
+
+        self.collect_cached(type(self).__name__, self.cache_key(), collect_static_data)
+        self.collect_volatile_data()
 
     @property
     @abc.abstractmethod
@@ -83,37 +114,41 @@ class WindowsInfo(PlatformInfo):
     def provider(self):
         return 'wmic.exe'
 
-    def call(self, cmd, shell=False):
-        try:
-            return check_output(cmd, universal_newlines=True, timeout=30, shell=shell)
-        except TimeoutExpired:
-            _l.debug('timeout expired while gathering data')
-        except FileNotFoundError:
-            raise
-        except Exception:
-            _l.exception('unexpected exception while gathering data')
-            raise
+    def cache_key(self):
+        import ctypes
+        import platform
+        get_tick_count = ctypes.windll.kernel32.GetTickCount64
+        get_tick_count.restype = ctypes.c_ulonglong
+        # Round the boot time so the jitter between the two clocks doesn't change the key.
+        uptime = get_tick_count() / 1000
+        return [platform.version(), round((time.time() - uptime) / 60)]
 
     def collect_wmic_data(self, cmds, block_title):
+        """Returns `False` if any of `cmds` failed.
+        """
+        # Queries for the same wmic alias are merged into a single process by the batch runner.
+        results = check_output_batch([cmd.split() for cmd in cmds], timeout=COMMAND_TIMEOUT)
+
+        if results and all(result.status == NOT_FOUND for result in results):
+            self.elements.append(DataBlock('Could not find wmic.exe'))
+            _l.error('wmic.exe does not appear to be present on the system')
+            return False
+
+        complete = True
         buf = []
-        for cmd in cmds:
-            try:
-                output = self.call(cmd.split())
-            except FileNotFoundError:
-                self.elements.append(DataBlock('Could not find wmic.exe'))
-                _l.error('wmic.exe does not appear to be present on the system')
-                return
-            except Exception:
-                self.elements.append(DataBlock('Error while calling wmic.exe'))
-                return
-            if not output.strip():
+        for cmd, result in zip(cmds, results):
+            if result.status != OK:
+                _l.debug('%s failed (%s): %s', cmd, result.status, result.error)
+                complete = False
                 continue
-            buf.append(output.strip())
+            if not result.output.strip():
+                continue
+            buf.append(result.output.strip())
 
         if not buf:
             self.elements.append(DataBlock('No data retrieved from wmic.exe'))
             _l.debug('no data retrieved from wmic.exe')
-            return
+            return False
 
         db0 = DataBlock(block_title)
         for item in buf:
@@ -121,6 +156,7 @@ class WindowsInfo(PlatformInfo):
                 db0.items.append(DataItem(*line.split('=')))
 
         self.elements.append(db0)
+        return complete
 
     def collect_display_data(self):
         buf = []
@@ -130,7 +166,7 @@ class WindowsInfo(PlatformInfo):
             'wmic desktopmonitor get pixelsperylogicalinch /value',
         ]
 
-        self.collect_wmic_data(cmds, 'Display Information')
+        return self.collect_wmic_data(cmds, 'Display Information')
 
     def collect_system_data(self):
         buf = []
@@ -142,18 +178,30 @@ class WindowsInfo(PlatformInfo):
             'wmic os get buildnumber /value',
             'wmic os get buildtype /value',
             'wmic os get caption /value',
+        ]
+
+        return self.collect_wmic_data(cmds, 'Operating System Information')
+
+    def collect_volatile_data(self):
+        cmds = [
             'wmic os get freephysicalmemory /value',
             'wmic os get freespaceinpagingfiles /value',
             'wmic os get freevirtualmemory /value',
         ]
 
-        self.collect_wmic_data(cmds, 'Operating System Information')
+        self.collect_wmic_data(cmds, 'Memory Information')
 
 # Information about Sublime Text.
 class UnixInfo(PlatformInfo):
 
+    cached_attributes = ('native',)
+
+    # Where data comes from when it's collected without running commands.
+    native_sources = 'os.uname'
+
     def __init__(self):
         super().__init__(description='Details about the current platform')
+        self.native = False
 
     @classmethod
     def from_current(cls):
@@ -161,20 +209,59 @@ class UnixInfo(PlatformInfo):
 
     @property
     def provider(self):
-        return 'command line tools'
+        return self.native_sources if self.native else 'command line tools'
 
-    def call(self, cmd, shell=False):
+    def cache_key(self):
+        uname = os.uname()
         try:
-            return check_output(cmd, universal_newlines=True, timeout=30, shell=shell)
-        except TimeoutExpired:
-            _l.debug('timeout expired while gathering data')
-        except Exception as e:
-            _l.debug('unexpected error while gathering data: %s', e)
+            with open('/proc/sys/kernel/random/boot_id') as f:
+                boot_id = f.read().strip()
+        except OSError:
+            boot_id = None
+        return [uname.sysname, uname.release, uname.version, boot_id]
 
     def collect_display_data(self):
         pass
 
     def collect_system_data(self):
+        if self.collect_native_system_data():
+            return True
+        return self.collect_command_system_data()
+
+    def collect_native_system_data(self):
+        """Collects system data without spawning processes.
+
+        Returns `False` if the data isn't available this way.
+        """
+        try:
+            data = sysprobe.collect(volatile=False)
+        except Exception as e:
+            _l.debug('native system probe failed: %s', e)
+            return False
+        if not data:
+            return False
+
+        self.native = True
+        db0 = DataBlock('System information')
+        for desc, value in data:
+            db0.items.append(DataItem(desc, value))
+        self.elements.append(db0)
+        return True
+
+    def collect_volatile_data(self):
+        if not self.native:
+            return
+        data = (sysprobe.memory_data() or []) + (sysprobe.load_average() or [])
+        if not data:
+            return
+        db0 = DataBlock('System load')
+        for desc, value in data:
+            db0.items.append(DataItem(desc, value))
+        self.elements.append(db0)
+
+    def collect_command_system_data(self):
+        """Returns `False` if any of the commands failed.
+        """
         buf = []
 
         # TODO: Check if user can repeat keys fast (OS X)
@@ -188,18 +275,20 @@ class UnixInfo(PlatformInfo):
             ('processor', 'uname -p'),
         ]
 
-        for desc, cmd in cmds:
-            try:
-                output = '{}={}'.format(desc, self.call(cmd.split()))
-            except FileNotFoundError:
+        results = check_output_batch([cmd.split() for _, cmd in cmds], timeout=COMMAND_TIMEOUT)
+
+        complete = True
+        for (desc, cmd), result in zip(cmds, results):
+            if result.status == NOT_FOUND:
                 _l.error('could not find command %s', cmd)
                 self.elements.append(DataBlock('Could not find command'))
-                return
-            except Exception as e:
-                _l.error('error running command %s: %s', cmd, e)
-                self.elements.append(DataBlock('Error running command: %s' % e))
-                return
+                return False
+            if result.status != OK:
+                _l.debug('%s failed (%s): %s', cmd, result.status, result.error)
+                complete = False
+                continue
 
+            output = '{}={}'.format(desc, result.output)
             if not output.strip():
                 continue
             buf.append(output.strip())
@@ -207,26 +296,30 @@ class UnixInfo(PlatformInfo):
         if not buf:
             self.elements.append(DataBlock('No data retrieved'))
             _l.debug('no data')
-            return
+            return False
 
         db0 = DataBlock('System information')
         for item in buf:
             db0.items.append(DataItem(*item.split('=')))
 
         self.elements.append(db0)
+        return complete
 
 
 class LinuxInfo(UnixInfo):
-    pass
+
+    native_sources = 'os.uname and /proc'
 
 
 class OsxInfo(UnixInfo):
 
+    native_sources = 'os.uname and sysctl'
+
     def collect_display_data(self):
         output = check_output(["system_profiler", "-detailLevel", "mini", "SPDisplaysDataType"], universal_newlines=True)
 
         if not output:
-            return
+            return False
 
         lines = output.split('\n')
         data = [line.split(':', 1) for line in lines if ':' in line]
@@ -1,16 +1,26 @@
 import contextlib
+import os
 import textwrap
+import threading
+import traceback
 
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError
 
-import sublime
+from ..lib.cache import DiskCache
+from ..lib.logging import Logger
 
 from .data import DataBlock
 from .data import DataItem
 from .data import PreItem
 from .data import UserDataSection
-from .editor_info import EditorInfo
+from .console_info import ConsoleInfo
+from .log_info import LogInfo
 from .platform_info import PlatformInfo
+from .scheduler import ProviderScheduler
+from .scheduler import REPORT_TIMEOUT
+
+
+_l = Logger.from_module(__name__)
 
 
 class MarkDownWriterMixin(object):
@@ -52,31 +62,84 @@ class MarkDownWriterMixin(object):
         self.buf = old_buf
 
 
+# Bump this whenever providers change the shape of the data they cache.
+CACHE_VERSION = 2
+
+
+def open_cache(refresh=False):
+    """Returns the cache for provider data, which lives in the package's cache directory.
+    """
+    import sublime
+    return DiskCache(os.path.join(sublime.cache_path(), 'Troubleshooting'), CACHE_VERSION,
+                     refresh=refresh)
+
+
+def default_providers(view=None):
+    """Returns the providers of a report about the running editor and `view`, which defaults to
+    the active view when data is collected.
+    """
+    # The editor providers need the editor's API; everything else in a report doesn't.
+    from . import editor_info
+    from .view_census import ViewCensus
+    providers = [
+        editor_info.EditorInfo.from_current(view),
+        editor_info.SettingsAuditInfo.from_current(view),
+        ViewCensus.from_current(),
+        editor_info.ResourceOverrideInfo.from_current(),
+        editor_info.DiskUsageInfo.from_current(),
+        # These are None until the tools they report on have been used.
+        editor_info.ResourceUsageInfo.from_current(),
+        editor_info.MemoryProfileInfo.from_current(),
+        editor_info.KeyBindingInfo.from_current(),
+        PlatformInfo.from_current(),
+        LogInfo.from_current(),
+        ConsoleInfo.from_current(),
+        ]
+    return [provider for provider in providers if provider is not None]
+
+
 class Report(MarkDownWriterMixin):
+    """A report made of the sections of `infos`, which default to `default_providers()`.
 
-    def __init__(self):
-        super().__init__()
-        self.infos = []
+    Given `infos` are used as they are; default providers share the cache from `open_cache()`
+    and report on `view`, or on the active view if it isn't given.
+    """
 
-        self.infos.append(EditorInfo.from_current())
-        self.infos.append(PlatformInfo.from_current())
+    def __init__(self, refresh=False, infos=None, view=None):
+        super().__init__()
+        if infos is not None:
+            self.infos = list(infos)
+            return
 
-    def collect(self, callback=bool):
-        executor = ThreadPoolExecutor(max_workers=1)
-        futures = []
+        self.infos = default_providers(view)
+        cache = open_cache(refresh=refresh)
         for info in self.infos:
-            future = executor.submit(info.collect)
-            future.add_done_callback(callback)
-            futures.append(future)
-        return futures
+            info.cache = cache
+
+    def collect(self, callback=bool, timeout=REPORT_TIMEOUT):
+        """Collects data from all providers concurrently.
+
+        `callback` is called once per provider with its future, whose `provider` attribute is the
+        provider it belongs to. Providers that haven't finished
+        after `timeout` seconds are marked as timed out and their future fails with
+        `concurrent.futures.TimeoutError`.
+        """
+        return ProviderScheduler(timeout=timeout).schedule(self.infos, callback)
 
     def generate(self):
-        footer = textwrap.dedent('''\
-            ---
-            This report was generated by the [Troubleshooting][self] package.
+        return ''.join(self.generate_chunks())
 
-            [self]: https://github.com/guillermooo/sublime-troubleshooting
-            ''')
+    def generate_chunks(self):
+        """Yields the report's markdown one section at a time.
+        """
+        yield self.generate_header()
+        for info in self.infos:
+            yield self.generate_section(info)
+        yield self.generate_footer()
+
+    def generate_header(self):
+        """Returns the markdown for the sections users fill in, followed by a separator.
+        """
         description = UserDataSection("Problem description",
                                       "Please add as many details as you can, "
                                       "including steps to replicate the problem.")
@@ -84,25 +147,44 @@ class Report(MarkDownWriterMixin):
                                    "What did you expect to happen instead?")
 
         buf = []
-        for i, info in enumerate([description, expected] + self.infos):
-            if isinstance(info, UserDataSection):
-                with self.collect_markup(buf):
-                    self.h3(info.title)
-                    self.write_line()
-                    self.crossout(info.description)
-                    self.write_line()
-                    self.write_line()
-            else:
-                if i == 2:  # print a separator after the user input sections
-                    with self.collect_markup(buf):
-                        self.write_line('---')
+        with self.collect_markup(buf):
+            for info in (description, expected):
+                self.h3(info.title)
+                self.write_line()
+                self.crossout(info.description)
+                self.write_line()
+                self.write_line()
+            self.write_line('---')
+        return ''.join(buf)
 
-                with self.collect_markup(buf):
-                    self.write_line()
-                    self._collect_info_markup(info)
-        buf.append('\n' + footer)
+    def generate_section(self, info):
+        buf = []
+        with self.collect_markup(buf):
+            self.write_line()
+            self._collect_info_markup(info)
+        return ''.join(buf)
+
+    def generate_placeholder(self, info):
+        """Returns the markdown shown in place of a section while its data is being collected.
+        """
+        buf = []
+        with self.collect_markup(buf):
+            self.write_line()
+            self.h3(info.title)
+            self.write_line()
+            self.italics('Collecting data...')
+            self.write_line()
         return ''.join(buf)
 
+    def generate_footer(self):
+        footer = textwrap.dedent('''\
+            ---
+            This report was generated by the [Troubleshooting][self] package.
+
+            [self]: https://github.com/guillermooo/sublime-troubleshooting
+            ''')
+        return '\n' + footer
+
     def _collect_info_markup(self, info):
         self.h3(info.title + ' (as provided by ' + info.provider + ')')
         if info.description:
@@ -111,6 +193,10 @@ class Report(MarkDownWriterMixin):
             self.write_line()
             self.write_line()
 
+        if info.timed_out:
+            self.quote('**timed out:** no data was collected in time')
+            return
+
         for i, element in enumerate(info.elements):
             if isinstance(element, DataItem):
                 self.quote('**' + element.name + ':** ' + str(element.value))
@@ -138,6 +224,7 @@ class Report(MarkDownWriterMixin):
 
 
 def show_progress(message, status_key, view=None):
+    import sublime
     view = view if view else sublime.active_window().active_view()
     counter = 0
 
@@ -161,3 +248,37 @@ def show_progress(message, status_key, view=None):
         counter = -1
 
     return dispose
+
+
+def collect_with_progress(report, message, view=None, on_each_done=bool, on_all_done=bool):
+    """Collects the data of `report` while showing `message` in the status bar of `view`.
+
+    `on_each_done` is called with the future of each provider as soon as it's done, and
+    `on_all_done` once all of them are. Errors in providers are printed to the console; providers
+    that time out are only logged, since the report itself says so.
+    """
+    lock = threading.Lock()
+    countdown = len(report.infos)
+
+    def on_done(f):
+        nonlocal countdown
+        e = f.exception()
+        if isinstance(e, TimeoutError):
+            _l.debug('%s timed out', f.provider.title)
+        elif e:
+            _l.debug(e)
+            traceback.print_exception(type(e), e, e.__traceback__)
+        on_each_done(f)
+        with lock:
+            countdown -= 1
+            if countdown != 0:
+                return
+        dispose_progress()
+        on_all_done()
+
+    dispose_progress = show_progress(message, 'ts.progress', view)
+    if not report.infos:
+        dispose_progress()
+        on_all_done()
+        return []
+    return report.collect(on_done)
@@ -0,0 +1,182 @@
+import difflib
+import json
+
+from .data import DataBlock
+from .data import PreItem
+
+
+__all__ = (
+    'Change',
+    'diff_reports',
+    'render_markdown',
+    )
+
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+# Keep the summary readable when a big PreItem changes completely.
+MAX_DIFF_LINES = 40
+
+
+class Change(object):
+    """One difference between two reports.
+
+    `path` is a tuple that starts with the section title, followed by the block title and the
+    item name as far as they apply. For list-valued items, `old` and `new` hold the elements that were
+    removed and added; for PreItems, `new` holds the diff lines.
+    """
+
+    __slots__ = ('kind', 'path', 'old', 'new')
+
+    def __init__(self, kind, path, old=None, new=None):
+        self.kind = kind
+        self.path = path
+        self.old = old
+        self.new = new
+
+
+def _keyed(elements):
+    """Maps each element to a stable key, numbering elements that share a name.
+    """
+    keyed = {}
+    seen = {}
+    for element in elements:
+        if isinstance(element, DataBlock):
+            name = ('block', element.title)
+        elif isinstance(element, PreItem):
+            name = ('pre', 'text')
+        else:
+            name = ('item', element.name)
+        n = seen.get(name, 0)
+        seen[name] = n + 1
+        keyed[name + (n,)] = element
+    return keyed
+
+
+def _as_list(value):
+    # List-valued items, like the installed packages, are stored as JSON arrays.
+    if isinstance(value, str) and value.startswith('['):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return None
+        if isinstance(parsed, list):
+            return parsed
+    return None
+
+
+def _label(key):
+    kind, name, n = key
+    return name if n == 0 else '{} ({})'.format(name, n + 1)
+
+
+def _diff_text(old, new):
+    return list(difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm='', n=0))[2:]
+
+
+def _diff_item(path, old, new, changes):
+    if old.value == new.value:
+        return
+    old_list, new_list = _as_list(old.value), _as_list(new.value)
+    if old_list is not None and new_list is not None:
+        try:
+            old_set, new_set = set(old_list), set(new_list)
+        except TypeError:
+            pass
+        else:
+            if old_set != new_set:
+                changes.append(Change(CHANGED, path, sorted(old_set - new_set, key=str),
+                                      sorted(new_set - old_set, key=str)))
+            return
+    changes.append(Change(CHANGED, path, old.value, new.value))
+
+
+def _diff_elements(path, old_elements, new_elements, changes):
+    # Elements compare by value, so unchanged blocks are skipped without keying their items.
+    if old_elements == new_elements:
+        return
+    old, new = _keyed(old_elements), _keyed(new_elements)
+    for key, old_element in old.items():
+        element_path = path + (_label(key),)
+        new_element = new.get(key)
+        if new_element is None:
+            changes.append(Change(REMOVED, element_path, old=old_element))
+        elif key[0] == 'block':
+            _diff_elements(element_path, old_element.items, new_element.items, changes)
+        elif key[0] == 'pre':
+            if old_element.content != new_element.content:
+                changes.append(Change(CHANGED, element_path, new=_diff_text(old_element.content,
+                                                                            new_element.content)))
+        else:
+            _diff_item(element_path, old_element, new_element, changes)
+    for key, new_element in new.items():
+        if key not in old:
+            changes.append(Change(ADDED, path + (_label(key),), new=new_element))
+
+
+def diff_reports(old_sections, new_sections):
+    """Compares two lists of sections and returns a list of `Change`s.
+
+    Sections, blocks and items are matched by title or name through dictionaries, so the cost
+    grows linearly with the size of the reports.
+    """
+    changes = []
+    old = {section.title: section for section in old_sections}
+    new = {section.title: section for section in new_sections}
+    for title, old_section in old.items():
+        new_section = new.get(title)
+        if new_section is None:
+            changes.append(Change(REMOVED, (title,), old=old_section))
+            continue
+        _diff_elements((title,), old_section.elements, new_section.elements, changes)
+    for title, new_section in new.items():
+        if title not in old:
+            changes.append(Change(ADDED, (title,), new=new_section))
+    return changes
+
+
+def _describe(element):
+    if isinstance(element, DataBlock):
+        return 'block with {} items'.format(len(element.items))
+    if isinstance(element, PreItem):
+        return 'text'
+    if hasattr(element, 'value'):
+        return str(element.value)
+    return 'section'
+
+
+def render_markdown(changes, old_name='old report', new_name='new report'):
+    """Summarizes `changes` as markdown, grouped by section and block.
+    """
+    buf = ['### Report diff\n\n', '*{} → {}*\n'.format(old_name, new_name)]
+    if not changes:
+        buf.append('No differences.\n')
+        return ''.join(buf)
+
+    heading = None
+    for change in changes:
+        group = change.path[:2] if len(change.path) > 2 else change.path[:1]
+        if group != heading:
+            heading = group
+            buf.append('\n##### {}\n\n'.format(' / '.join(group)))
+        name = change.path[-1] if len(change.path) > len(group) else '(all)'
+        if change.kind == ADDED:
+            buf.append('> **{}:** added ({})  \n'.format(name, _describe(change.new)))
+        elif change.kind == REMOVED:
+            buf.append('> **{}:** removed ({})  \n'.format(name, _describe(change.old)))
+        elif isinstance(change.new, list) and isinstance(change.old, list):
+            parts = ['+' + str(v) for v in change.new] + ['-' + str(v) for v in change.old]
+            buf.append('> **{}:** {}  \n'.format(name, ', '.join(parts)))
+        elif isinstance(change.new, list):
+            lines = change.new
+            changed = sum(1 for line in lines if line[:1] in ('+', '-'))
+            buf.append('> **{}:** {} lines changed\n\n```diff\n'.format(name, changed))
+            buf.append('\n'.join(lines[:MAX_DIFF_LINES]))
+            if len(lines) > MAX_DIFF_LINES:
+                buf.append('\n... {} more'.format(len(lines) - MAX_DIFF_LINES))
+            buf.append('\n```\n\n')
+        else:
+            buf.append('> **{}:** {} → {}  \n'.format(name, change.old, change.new))
+    return ''.join(buf)
@@ -0,0 +1,213 @@
+import os
+import threading
+import zipfile
+
+from ..lib.logging import Logger
+
+from .package_index import ARCHIVE_SUFFIX
+from .package_index import OVERRIDING
+from .package_index import ZIPPED
+
+
+__all__ = (
+    'Override',
+    'ResourceIndex',
+    'duplicate_syntaxes',
+    'shared_resource_index',
+    )
+
+
+_l = Logger.from_module(__name__)
+
+
+SYNTAX_EXTENSIONS = ('.sublime-syntax', '.tmLanguage')
+
+
+class Override(object):
+    """A copy of a resource that hides another copy of it in the same package.
+
+    `path` is the copy that wins: a loose file in `Packages/<name>/` or an archive in
+    `Installed Packages`. `overridden_path` is the copy right below it: an archive in
+    `Installed Packages` or one shipped with the editor.
+    """
+
+    __slots__ = ('resource', 'path', 'overridden_path', 'mtime', 'overridden_mtime')
+
+    def __init__(self, resource, path, overridden_path, mtime, overridden_mtime):
+        self.resource = resource
+        self.path = path
+        self.overridden_path = overridden_path
+        self.mtime = mtime
+        self.overridden_mtime = overridden_mtime
+
+    @property
+    def loose(self):
+        """Whether the winning copy is a loose file rather than an archive.
+        """
+        return not self.path.endswith(ARCHIVE_SUFFIX)
+
+    @property
+    def stale(self):
+        """Whether the overridden copy changed after the override was last edited, so the
+        override may be hiding fixes.
+        """
+        return self.mtime < self.overridden_mtime
+
+
+def _archive_members(path):
+    with zipfile.ZipFile(path) as zf:
+        return frozenset(name for name in zf.namelist() if not name.endswith('/'))
+
+
+def _loose_files(path):
+    """Returns the files under `path`, as paths relative to it with forward slashes.
+    """
+    files = set()
+    for root, dirs, names in os.walk(path):
+        prefix = os.path.relpath(root, path).replace(os.sep, '/')
+        prefix = '' if prefix == '.' else prefix + '/'
+        files.update(prefix + name for name in names)
+    return frozenset(files)
+
+
+class ResourceIndex(object):
+    """Which copies of each resource packages provide, and which of them wins.
+
+    A package can have up to three copies: an archive shipped with the editor, an archive in
+    `Installed Packages`, which replaces the shipped one as a whole, and loose files in `Packages`,
+    which override single files of either. `providers` maps the resources of packages with more
+    than one copy to the paths that provide them, the winning one last; resources of every other
+    package have a single provider.
+
+    Built from `PackageIndex` entries. Archive member lists and loose file lists are reused as
+    long as the entry's signature is unchanged, so rebuilding after a package changes only reads
+    that package. Signatures of loose packages don't change when a file is edited in place, so
+    the overriding files themselves, which are few, are stat'ed on every update.
+    """
+
+    def __init__(self):
+        # Archive path -> (signature, member names).
+        self.members = {}
+        # Loose package path -> (signature, relative paths of its files).
+        self.files = {}
+        self.providers = {}
+        # Shipped archives that are ignored because Installed Packages has one of the same name.
+        self.replaced = frozenset()
+        self.overrides = []
+        self.lock = threading.Lock()
+
+    def _cached(self, cache, key, signature, read):
+        cached = cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        try:
+            value = read(key)
+        except (OSError, zipfile.BadZipfile) as e:
+            _l.debug('cannot read %s: %s', key, e)
+            value = frozenset()
+        cache[key] = (signature, value)
+        return value
+
+    def _copies(self, name, shipped, archive, loose):
+        """Returns `(path, names, mtime)` for each copy of package `name`, in the order the editor
+        loads them. `mtime` is `None` for loose files, whose mtimes differ from file to file.
+        """
+        copies = []
+        for entry in (shipped, archive):
+            if entry is not None:
+                copies.append((entry.path, self._cached(self.members, entry.path,
+                                                        entry.signature, _archive_members),
+                               entry.mtime))
+        if loose is not None:
+            copies.append((loose.path, self._cached(self.files, loose.path, loose.signature,
+                                                    _loose_files), None))
+        return copies
+
+    def update(self, entries, shadowed=()):
+        """Brings the index up to date with `entries`, as returned by `PackageIndex.refresh()`,
+        and `shadowed`, as returned by `PackageIndex.shadowed_entries()`. Returns the overrides
+        sorted by resource name.
+        """
+        archives = {entry.name: entry for entry in entries if entry.kind == ZIPPED}
+        shadowed = {entry.name: entry for entry in shadowed}
+        loose = {entry.name: entry for entry in entries if entry.kind == OVERRIDING}
+        providers = {}
+        overrides = []
+        with self.lock:
+            for name in set(shadowed) | set(loose):
+                copies = self._copies(name, shadowed.get(name), archives.get(name),
+                                      loose.get(name))
+                for resource_name in set().union(*(names for _, names, _ in copies)):
+                    resource = 'Packages/{}/{}'.format(name, resource_name)
+                    found = []
+                    for path, names, mtime in copies:
+                        if resource_name not in names:
+                            continue
+                        if mtime is None:
+                            path = os.path.join(path, *resource_name.split('/'))
+                        found.append((path, mtime))
+                    providers[resource] = tuple(path for path, _ in found)
+                    if len(found) < 2:
+                        continue
+                    (path, mtime), (overridden_path, overridden_mtime) = found[-1], found[-2]
+                    if mtime is None:
+                        try:
+                            mtime = os.stat(path).st_mtime
+                        except OSError:
+                            continue
+                    overrides.append(Override(resource, path, overridden_path, mtime,
+                                              overridden_mtime))
+
+            seen = {entry.path for entry in list(shadowed.values()) + list(loose.values())}
+            seen.update(archives[name].path for name in set(shadowed) | set(loose)
+                        if name in archives)
+            for cache in (self.members, self.files):
+                for key in set(cache) - seen:
+                    del cache[key]
+            overrides.sort(key=lambda o: o.resource)
+            self.providers = providers
+            self.replaced = frozenset(entry.path for entry in shadowed.values())
+            self.overrides = overrides
+        return overrides
+
+    def winner(self, resource):
+        """Returns the path of the copy of `resource` the editor loads, or `None` if it loads none.
+
+        Raises `KeyError` if `resource` isn't in `providers`.
+        """
+        with self.lock:
+            path = self.providers[resource][-1]
+            return None if path in self.replaced else path
+
+
+def duplicate_syntaxes(resources):
+    """Returns `(name, resources)` for syntax names defined by more than one package, as found by
+    `sublime.find_resources()`.
+
+    Syntaxes are matched by file name, which is what the editor shows in menus and settings use.
+    Copies of one resource, like an override and the file it overrides, count once, and so do a
+    .tmLanguage and a .sublime-syntax of the same name in one package.
+    """
+    by_name = {}
+    for resource in set(resources):
+        base = resource.rsplit('/', 1)[-1]
+        for extension in SYNTAX_EXTENSIONS:
+            if base.endswith(extension):
+                by_name.setdefault(base[:-len(extension)], []).append(resource)
+                break
+    return sorted((name, sorted(found)) for name, found in by_name.items()
+                  if len(set(resource.split('/', 2)[1] for resource in found)) > 1)
+
+
+_resource_index = None
+_resource_index_lock = threading.Lock()
+
+
+def shared_resource_index():
+    """Returns the index kept for the lifetime of the plugin host, creating it on first use.
+    """
+    global _resource_index
+    with _resource_index_lock:
+        if _resource_index is None:
+            _resource_index = ResourceIndex()
+        return _resource_index
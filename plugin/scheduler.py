@@ -0,0 +1,109 @@
+import threading
+
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError
+
+from ..lib.logging import Logger
+
+
+__all__ = (
+    'ProviderScheduler',
+    'REPORT_TIMEOUT',
+    )
+
+
+_l = Logger.from_module(__name__)
+
+
+# Seconds the whole report may take before unfinished providers are given up on.
+REPORT_TIMEOUT = 20
+
+# Providers are mostly waiting on subprocesses or disk, so a few threads are enough to run all of
+# them at the same time.
+MAX_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def shared_executor():
+    """Returns the executor shared by all reports, creating it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        return _executor
+
+
+class ProviderScheduler(object):
+    """Runs data providers concurrently under a single deadline.
+
+    Each provider gets a future that resolves either when its `collect()` returns or when the
+    deadline expires, whatever happens first. Providers still running at the deadline are
+    marked as timed out and their futures fail with `TimeoutError`; their worker threads are left
+    to finish in the background, but nobody waits for them anymore.
+
+    Callbacks run while the scheduler's lock is held, so they must not call back into it.
+    """
+
+    def __init__(self, timeout=REPORT_TIMEOUT, executor=None):
+        self.timeout = timeout
+        self.executor = executor or shared_executor()
+        self.lock = threading.Lock()
+
+    def schedule(self, providers, callback=bool):
+        """Starts collecting data from `providers`.
+
+        `callback` is called once per provider with its future; the future's `provider`
+        attribute is the provider it belongs to.
+
+        Returns the list of futures, in the same order as `providers`.
+        """
+        pending = []
+        for provider in providers:
+            provider.timed_out = False
+            outer = Future()
+            outer.provider = provider
+            outer.add_done_callback(callback)
+            inner = self.executor.submit(provider.collect)
+            inner.add_done_callback(self._relay(outer))
+            pending.append((provider, inner, outer))
+
+        if self.timeout is not None:
+            timer = threading.Timer(self.timeout, self._expire, args=(pending,))
+            timer.daemon = True
+            timer.start()
+            for _, _, outer in pending:
+                outer.add_done_callback(lambda f, pending=pending, timer=timer:
+                                        self._cancel_timer(pending, timer))
+
+        return [outer for _, _, outer in pending]
+
+    def _relay(self, outer):
+        def relay(inner):
+            with self.lock:
+                if outer.done():
+                    return
+                if inner.cancelled():
+                    outer.set_exception(TimeoutError())
+                elif inner.exception() is not None:
+                    outer.set_exception(inner.exception())
+                else:
+                    outer.set_result(inner.result())
+        return relay
+
+    def _expire(self, pending):
+        with self.lock:
+            for provider, inner, outer in pending:
+                if outer.done():
+                    continue
+                _l.debug('provider %s did not finish in %ss', type(provider).__name__, self.timeout)
+                inner.cancel()
+                provider.timed_out = True
+                outer.set_exception(TimeoutError())
+
+    def _cancel_timer(self, pending, timer):
+        if all(outer.done() for _, _, outer in pending):
+            timer.cancel()
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import threading
+
+from ..lib.logging import Logger
+
+
+__all__ = (
+    'SettingsLayer',
+    'SettingsResolver',
+    'ResolvedSettings',
+    'EXPENSIVE_SETTINGS',
+    'package_order',
+    'preferences_group',
+    'shared_resolver',
+    )
+
+
+_l = Logger.from_module(__name__)
+
+
+ARCHIVE_SUFFIX = '.sublime-package'
+
+
+# Settings known to make the editor slow, with why. Audited in reports.
+EXPENSIVE_SETTINGS = (
+    ('index_files', 'indexing every file of every open folder keeps the CPU busy'),
+    ('index_workers', 'more indexing processes means more CPU and memory while indexing'),
+    ('index_exclude_patterns', 'files matched here are skipped by the indexer'),
+    ('folder_exclude_patterns', 'large folders not excluded here are scanned and indexed'),
+    ('file_exclude_patterns', 'files not excluded here are scanned and indexed'),
+    ('binary_file_patterns', 'binary files not listed here are indexed and searched'),
+    ('word_wrap', 'wrapping very long lines is slow'),
+    ('wrap_width', 'affects how much text is wrapped when word_wrap is on'),
+    ('auto_complete', 'the completion popup queries every plugin on each keystroke'),
+    ('auto_complete_triggers', 'broad triggers open the completion popup more often'),
+    ('auto_complete_delay', 'a short delay queries completions more often while typing'),
+    ('spell_check', 'spell checking large documents is slow'),
+    ('draw_white_space', 'drawing all white space is slow on large files'),
+    ('match_brackets', 'bracket matching scans the buffer after every caret move'),
+    ('match_tags', 'tag matching scans the buffer after every caret move'),
+    ('show_git_status', 'git status is computed for every open folder'),
+    ('mini_diff', 'diffs every open file against the saved or committed version'),
+    )
+
+
+class SettingsLayer(object):
+    """The values of one settings resource.
+    """
+
+    __slots__ = ('resource', 'package', 'values')
+
+    def __init__(self, resource, package, values):
+        self.resource = resource
+        self.package = package
+        self.values = values
+
+
+def _package_of(resource):
+    # Resource names look like "Packages/<package>/<path>".
+    parts = resource.split('/', 2)
+    return parts[1] if len(parts) > 2 else ''
+
+
+def package_order(package):
+    """Returns a sort key that puts packages in the order the editor applies their resources.
+    """
+    # Default loads first and User last; everything else is in alphabetical order.
+    if package == 'Default':
+        return (0, '')
+    if package == 'User':
+        return (2, '')
+    return (1, package.lower())
+
+
+class ResolvedSettings(object):
+    """Settings layers in the order they apply, and an index from setting name to the layers that
+    define it.
+    """
+
+    def __init__(self, layers):
+        self.layers = layers
+        self.index = {}
+        for layer in layers:
+            for name in layer.values:
+                self.index.setdefault(name, []).append(layer)
+
+    def defined_in(self, name):
+        """Returns the layers that define `name`, in the order they apply.
+        """
+        return self.index.get(name, [])
+
+    def effective(self, name, default=None):
+        """Returns `(value, layer)` for the value of `name` that wins, or `(default, None)`.
+        """
+        layers = self.index.get(name)
+        if not layers:
+            return default, None
+        return layers[-1].values[name], layers[-1]
+
+
+class SettingsResolver(object):
+    """Finds and parses settings resources, parsing each one only once while it doesn't change.
+
+    Parsed resources are remembered by the size and mtime of the file or archive that holds
+    them; resources that can't be mapped to a file are remembered by a hash of their contents,
+    which saves parsing but not loading.
+    """
+
+    def __init__(self, api=None):
+        if api is None:
+            import sublime as api
+        self.api = api
+        # Resource name -> (key, values).
+        self.parsed = {}
+        self.lock = threading.Lock()
+
+    def _file_key(self, resource):
+        package = _package_of(resource)
+        rest = resource.split('/', 2)[-1]
+        loose = os.path.join(self.api.packages_path(), package, *rest.split('/'))
+        candidates = [loose]
+        for directory in (self.api.installed_packages_path(),
+                          os.path.join(os.path.dirname(self.api.executable_path()),
+                                       'Packages')):
+            candidates.append(os.path.join(directory, package + ARCHIVE_SUFFIX))
+        for path in candidates:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            return (path, st.st_size, st.st_mtime)
+        return None
+
+    def _values(self, resource):
+        key = self._file_key(resource)
+        text = None
+        if key is None:
+            try:
+                text = self.api.load_resource(resource)
+            except (IOError, OSError) as e:
+                _l.debug('cannot load %s: %s', resource, e)
+                return {}
+            key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+        with self.lock:
+            cached = self.parsed.get(resource)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        try:
+            if text is None:
+                text = self.api.load_resource(resource)
+            values = self.api.decode_value(text)
+        except (IOError, OSError, ValueError) as e:
+            _l.debug('cannot parse %s: %s', resource, e)
+            values = {}
+        if not isinstance(values, dict):
+            values = {}
+        with self.lock:
+            self.parsed[resource] = (key, values)
+        return values
+
+    def resolve(self, groups):
+        """Returns the `ResolvedSettings` made of every resource named like the base names in
+        `groups`.
+
+        `groups` is a list of lists of base names. Groups apply in order; within a group,
+        resources apply in package order and, within a package, in the order of the base names.
+        For example, `[['Preferences.sublime-settings', 'Preferences (Linux).sublime-settings'],
+        ['Python.sublime-settings']]`.
+        """
+        layers = []
+        for group in groups:
+            resources = []
+            for position, base_name in enumerate(group):
+                for resource in self.api.find_resources(base_name):
+                    # find_resources matches base names as patterns; make sure it's the name.
+                    if resource.rsplit('/', 1)[-1] != base_name:
+                        continue
+                    package = _package_of(resource)
+                    resources.append((package_order(package), position, resource, package))
+            for _, _, resource, package in sorted(resources):
+                layers.append(SettingsLayer(resource, package, self._values(resource)))
+        return ResolvedSettings(layers)
+
+
+PLATFORM_NAMES = {
+    'linux': 'Linux',
+    'osx': 'OSX',
+    'windows': 'Windows',
+    }
+
+
+def preferences_group(platform):
+    """Returns the base names of the preferences for `platform`, as `sublime.platform()` names it.
+    """
+    return ['Preferences.sublime-settings',
+            'Preferences ({}).sublime-settings'.format(PLATFORM_NAMES.get(platform, platform))]
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def shared_resolver():
+    """Returns the resolver kept for the lifetime of the plugin host, creating it on first use.
+    """
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = SettingsResolver()
+        return _resolver
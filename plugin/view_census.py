@@ -0,0 +1,181 @@
+import os
+import time
+
+import sublime
+
+from .data import DataBlock
+from .data import DataItem
+from .data import DataProvider
+from .data import DataSection
+
+
+__all__ = (
+    'ViewCensus',
+    'ViewStats',
+    'view_stats',
+    )
+
+
+# Longest lines are measured line by line; views with more lines than this are sampled instead.
+MAX_MEASURED_LINES = 20000
+
+# Characters whose lines are measured with a single API call, between checks of the deadline.
+MEASURE_CHUNK = 16 * 1024
+
+
+class ViewStats(object):
+    """What a view holds and how expensive it is likely to be for the editor.
+
+    `longest_line` is exact unless `sampled` is set, in which case it's the longest line found
+    before the time budget ran out, or the average line length if that's longer, and the real
+    longest line may be longer still.
+    """
+
+    __slots__ = ('window_id', 'view_id', 'name', 'size', 'lines', 'longest_line', 'sampled',
+                 'syntax', 'encoding', 'dirty', 'loading')
+
+    def __init__(self, window_id, view_id, name, size, lines, longest_line, sampled, syntax,
+                 encoding, dirty, loading):
+        self.window_id = window_id
+        self.view_id = view_id
+        self.name = name
+        self.size = size
+        self.lines = lines
+        self.longest_line = longest_line
+        self.sampled = sampled
+        self.syntax = syntax
+        self.encoding = encoding
+        self.dirty = dirty
+        self.loading = loading
+
+    def describe(self):
+        parts = ['{:,} characters'.format(self.size),
+                 '{:,} line{}'.format(self.lines, '' if self.lines == 1 else 's'),
+                 'longest line {}{:,}'.format('>= ' if self.sampled else '', self.longest_line),
+                 self.syntax, self.encoding]
+        if self.dirty:
+            parts.append('unsaved changes')
+        if self.loading:
+            parts.append('still loading')
+        return ', '.join(parts)
+
+
+def _view_name(view):
+    file_name = view.file_name()
+    if file_name:
+        return file_name
+    return view.name() or 'untitled (view {})'.format(view.id())
+
+
+def _longest_line(view, size, lines, deadline):
+    """Returns the length of the longest line in `view` and whether it was only sampled.
+    """
+    # The longest line is at least as long as the average one, not counting newlines; a minified
+    # file with a handful of lines is caught without looking at any of them.
+    longest = -(-(size - lines + 1) // lines)
+
+    if lines <= MAX_MEASURED_LINES:
+        point = 0
+        while time.perf_counter() < deadline:
+            found = view.lines(sublime.Region(point, min(size, point + MEASURE_CHUNK)))
+            longest = max([longest] + [r.size() for r in found])
+            if found[-1].end() >= size:
+                return longest, False
+            point = found[-1].end() + 1
+        # Out of time; whatever sampling can still do below is all we get.
+
+    # Visit lines at evenly spaced points in ever finer passes, so that the whole view is
+    # covered roughly, however little time there is.
+    step = size
+    while step > 1 and time.perf_counter() < deadline:
+        step //= 2
+        for point in range(step, size, step * 2):
+            longest = max(longest, view.line(point).size())
+            if time.perf_counter() >= deadline:
+                return longest, True
+    return longest, step > 1
+
+
+def view_stats(view, deadline):
+    """Returns the `ViewStats` of `view`, spending no more than until `deadline`, a
+    `time.perf_counter()` value, on finding its longest line.
+    """
+    # size() and rowcol() are answered from the buffer's indexes without reading the text.
+    size = view.size()
+    lines = view.rowcol(size)[0] + 1
+    longest, sampled = _longest_line(view, size, lines, deadline)
+    syntax = view.settings().get('syntax') or ''
+    return ViewStats(view.window().id() if view.window() else 0, view.id(), _view_name(view),
+                     size, lines, longest, sampled,
+                     os.path.splitext(syntax.rsplit('/', 1)[-1])[0] or 'unknown syntax',
+                     view.encoding(), view.is_dirty(), view.is_loading())
+
+
+# Every view in every window.
+class ViewCensus(DataProvider, DataSection):
+
+    def __init__(self, large_size=20 * 1024 * 1024, long_line=10000, time_budget=1.0, limit=50):
+        super().__init__('Open views',
+                         description='Every view in every window, largest first')
+        self.large_size = large_size
+        self.long_line = long_line
+        self.time_budget = time_budget
+        self.limit = limit
+
+    @classmethod
+    def from_current(cls):
+        settings = sublime.load_settings('Troubleshooting.sublime-settings')
+        return cls(large_size=settings.get('large_view_size', 20 * 1024 * 1024),
+                   long_line=settings.get('long_line_length', 10000),
+                   time_budget=settings.get('view_census_time_budget', 1.0))
+
+    @property
+    def provider(self):
+        return 'Sublime Text API'
+
+    def flags(self, stats):
+        flags = []
+        if stats.size >= self.large_size:
+            flags.append('large')
+        if stats.longest_line >= self.long_line:
+            flags.append('long lines')
+        return flags
+
+    def collect(self):
+        self.elements.clear()
+
+        views = [view for window in sublime.windows() for view in window.views()]
+        start = time.perf_counter()
+        census = []
+        for i, view in enumerate(views):
+            # Split what's left of the budget evenly among the views still to visit.
+            now = time.perf_counter()
+            remaining = max(0, start + self.time_budget - now)
+            census.append(view_stats(view, now + remaining / (len(views) - i)))
+        census.sort(key=lambda s: s.size, reverse=True)
+
+        windows = len(set(s.window_id for s in census))
+        self.elements.append(DataItem('views', '{} in {} window{}, {:,} characters in all, {} '
+                                               'with unsaved changes'.format(
+                                                   len(census), windows,
+                                                   '' if windows == 1 else 's',
+                                                   sum(s.size for s in census),
+                                                   sum(1 for s in census if s.dirty))))
+
+        flagged = [(s, self.flags(s)) for s in census]
+        flagged = [(s, f) for s, f in flagged if f]
+        if flagged:
+            block = DataBlock('Flagged views', description=(
+                'Views of {:,} characters or more, or with lines of {:,} characters or more; '
+                'either slows down editing, highlighting and indexing').format(self.large_size,
+                                                                                 self.long_line))
+            for s, f in flagged:
+                block.items.append(DataItem(s.name, '{} ({})'.format(', '.join(f),
+                                                                     s.describe())))
+            self.elements.append(block)
+
+        block = DataBlock('Views', description='The {} largest views'.format(self.limit)
+                          if len(census) > self.limit else '')
+        for s in census[:self.limit]:
+            block.items.append(DataItem(s.name, s.describe()))
+        self.elements.append(block)
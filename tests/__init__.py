@@ -0,0 +1,20 @@
+"""Tests for the package.
+
+UnitTesting runs them inside the editor, where the package is already loaded. Anywhere else they
+run against the stub editor modules in `bench/stubs`, with the package registered under its usual
+name. From the package root:
+
+    python -m pytest tests
+    python -m unittest discover -s tests -t .
+"""
+
+import os
+import sys
+
+
+if 'Troubleshooting' not in sys.modules:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'bench'))
+    import _support
+    _support.install_stubs()
+    _support.load_package()
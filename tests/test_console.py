@@ -0,0 +1,45 @@
+import unittest
+
+from Troubleshooting.lib.console import ConsoleBuffer
+from Troubleshooting.lib.console import STDERR
+from Troubleshooting.lib.console import STDOUT
+
+
+class ConsoleBufferTestCase(unittest.TestCase):
+
+    def texts(self, lines):
+        return [text for _, _, text in lines]
+
+    def test_tail_joins_writes_into_lines(self):
+        buffer = ConsoleBuffer()
+        buffer.write(STDOUT, 'one ')
+        buffer.write(STDOUT, 'line\ntwo\nthr')
+        buffer.write(STDERR, 'error\n')
+        lines = buffer.tail()
+        self.assertEqual(sorted(self.texts(lines)), ['error', 'one line', 'thr', 'two'])
+        self.assertEqual([stream for _, stream, text in lines if text == 'error'], [STDERR])
+
+    def test_tail_keeps_the_last_lines(self):
+        buffer = ConsoleBuffer()
+        for i in range(10):
+            buffer.write(STDOUT, 'line {}\n'.format(i))
+        self.assertEqual(self.texts(buffer.tail(max_lines=3)), ['line 7', 'line 8', 'line 9'])
+
+    def test_tail_cuts_the_line_that_crosses_the_limit(self):
+        buffer = ConsoleBuffer()
+        buffer.write(STDOUT, 'a' * 20 + '\n')
+        buffer.write(STDOUT, 'bbbb\n')
+        # 5 characters for the last line and its newline leave 5 for the one before.
+        self.assertEqual(self.texts(buffer.tail(max_chars=10)), ['aaaa', 'bbbb'])
+
+    def test_tail_keeps_the_end_of_an_overlong_last_line(self):
+        buffer = ConsoleBuffer()
+        buffer.write(STDOUT, 'older\n')
+        buffer.write(STDOUT, 'x' * 100 + 'end\n')
+        self.assertEqual(self.texts(buffer.tail(max_chars=10)), ['xxxxxxend'])
+
+    def test_tail_drops_lines_with_no_room_left(self):
+        buffer = ConsoleBuffer()
+        buffer.write(STDOUT, 'older\n')
+        buffer.write(STDOUT, 'abcd\n')
+        self.assertEqual(self.texts(buffer.tail(max_chars=5)), ['abcd'])
@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Troubleshooting.plugin.disk_footprint import FootprintAnalyzer
+
+
+class FootprintAnalyzerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(self.root, 'a', 'b'))
+        self.write(os.path.join('a', 'b', 'file'), 10)
+        self.analyzer = FootprintAnalyzer()
+
+    def write(self, name, size):
+        with open(os.path.join(self.root, name), 'w') as f:
+            f.write('x' * size)
+
+    def test_reuses_listings_but_not_sizes(self):
+        self.assertEqual(self.analyzer.analyze(self.root).size, 10)
+        # Rewriting a file in place leaves the mtime of its directory alone.
+        self.write(os.path.join('a', 'b', 'file'), 1000)
+        footprint = self.analyzer.analyze(self.root)
+        self.assertEqual((footprint.size, footprint.listed, footprint.reused), (1000, 0, 3))
+        self.assertEqual(footprint.largest_files,
+                         [(1000, os.path.join(self.root, 'a', 'b', 'file'))])
+
+    def test_forgets_directories_that_are_gone(self):
+        self.analyzer.analyze(self.root)
+        shutil.rmtree(os.path.join(self.root, 'a', 'b'))
+        footprint = self.analyzer.analyze(self.root)
+        self.assertEqual(footprint.size, 0)
+        self.assertEqual(sorted(self.analyzer.known), [self.root, os.path.join(self.root, 'a')])
@@ -0,0 +1,45 @@
+import io
+import unittest
+
+from Troubleshooting.plugin import export
+from Troubleshooting.plugin.data import DataBlock
+from Troubleshooting.plugin.data import DataItem
+from Troubleshooting.plugin.data import LoadedSection
+from Troubleshooting.plugin.data import PreItem
+
+
+class ExportTestCase(unittest.TestCase):
+
+    def sections(self):
+        done = LoadedSection('Done', 'Finished in time', [
+            DataItem('name', 'value', 'what it is'),
+            DataBlock('Block', 'A block', [DataItem('count', -3), PreItem('text')]),
+            ], provider='tests')
+        late = LoadedSection('Late', 'Still collecting', [DataItem('partial', 1.5)],
+                             provider='tests', timed_out=True)
+        return [done, late]
+
+    def round_trip_json(self, sections):
+        buf = io.StringIO()
+        export.dump_json(sections, buf, created=1)
+        buf.seek(0)
+        return export.load_json(buf)
+
+    def round_trip_binary(self, sections):
+        buf = io.BytesIO()
+        export.dump_binary(sections, buf, created=1)
+        buf.seek(0)
+        return export.load_binary(buf)
+
+    def check_round_trip(self, round_trip):
+        created, (done, late) = round_trip(self.sections())
+        self.assertEqual(created, 1)
+        self.assertEqual((done.title, done.provider, done.timed_out), ('Done', 'tests', False))
+        self.assertEqual(str(done), str(self.sections()[0]))
+        self.assertEqual((late.title, late.timed_out, late.elements), ('Late', True, []))
+
+    def test_json_round_trip_drops_elements_of_timed_out_sections(self):
+        self.check_round_trip(self.round_trip_json)
+
+    def test_binary_round_trip_drops_elements_of_timed_out_sections(self):
+        self.check_round_trip(self.round_trip_binary)
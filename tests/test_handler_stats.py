@@ -0,0 +1,128 @@
+import unittest
+
+from Troubleshooting.bench._support import fresh_stub
+from Troubleshooting.plugin import handler_stats
+from Troubleshooting.plugin.handler_stats import BUCKET_BOUNDS
+from Troubleshooting.plugin.handler_stats import HandlerStats
+
+
+class HandlerStatsTestCase(unittest.TestCase):
+
+    def test_buckets_include_their_upper_bound(self):
+        stats = HandlerStats('handler')
+        for seconds in (0.00005, 0.0001, 0.0003, 0.001, 0.0011, 2.0):
+            stats.add(seconds)
+        self.assertEqual(stats.count, 6)
+        self.assertEqual(stats.max, 2.0)
+        self.assertAlmostEqual(stats.total, 2.00255)
+        self.assertEqual(stats.buckets[0], 2)
+        self.assertEqual(stats.buckets[BUCKET_BOUNDS.index(0.0005)], 1)
+        self.assertEqual(stats.buckets[BUCKET_BOUNDS.index(0.001)], 1)
+        self.assertEqual(stats.buckets[BUCKET_BOUNDS.index(0.0025)], 1)
+        # Anything slower than the last bound goes into the open-ended bucket.
+        self.assertEqual(stats.buckets[-1], 1)
+        self.assertEqual(sum(stats.buckets), stats.count)
+
+    def test_percentile_is_the_bound_of_its_bucket(self):
+        stats = HandlerStats('handler')
+        for _ in range(95):
+            stats.add(0.0002)
+        for _ in range(5):
+            stats.add(3.0)
+        self.assertEqual(stats.percentile(0.5), 0.00025)
+        self.assertEqual(stats.percentile(0.95), 0.00025)
+        self.assertEqual(stats.percentile(0.99), 3.0)
+
+
+class Listener(object):
+
+    def on_modified(self, view):
+        return 'modified ' + view
+
+
+class ViewListener(object):
+
+    def __init__(self, view):
+        self.view = view
+
+    def on_selection_modified(self):
+        return 'selection of ' + self.view
+
+    def not_a_callback(self):
+        pass
+
+
+class UpperCaseCommand(object):
+
+    def run(self, edit):
+        return 'ran'
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sublime_plugin = fresh_stub('sublime_plugin')
+        self.listener = Listener()
+        self.view_listener = ViewListener('view')
+        self.sublime_plugin.all_callbacks['on_modified'].append(self.listener)
+        self.sublime_plugin.view_event_listeners[1] = [self.view_listener]
+        self.sublime_plugin.text_command_classes.append(UpperCaseCommand)
+        self.original_run = UpperCaseCommand.__dict__['run']
+        handler_stats.reset()
+        self.addCleanup(handler_stats.reset)
+        self.addCleanup(handler_stats.disable)
+
+    def stats(self):
+        return {s.name: s for s in handler_stats.slowest(count=100)}
+
+    def test_enable_times_callbacks_and_commands(self):
+        handler_stats.enable(self.sublime_plugin)
+        self.assertTrue(handler_stats.is_enabled())
+
+        self.assertEqual(self.listener.on_modified('v'), 'modified v')
+        self.assertEqual(self.view_listener.on_selection_modified(), 'selection of view')
+        self.assertEqual(UpperCaseCommand().run(None), 'ran')
+        UpperCaseCommand().run(None)
+
+        stats = self.stats()
+        owner = __name__
+        self.assertEqual(stats[owner + '.Listener.on_modified'].count, 1)
+        self.assertEqual(stats[owner + '.ViewListener.on_selection_modified'].count, 1)
+        self.assertEqual(stats[owner + '.UpperCaseCommand.run'].count, 2)
+        self.assertNotIn(owner + '.ViewListener.not_a_callback', stats)
+
+    def test_enable_twice_does_not_wrap_twice(self):
+        handler_stats.enable(self.sublime_plugin)
+        handler_stats.enable(self.sublime_plugin)
+        self.listener.on_modified('v')
+        self.assertEqual(self.stats()[__name__ + '.Listener.on_modified'].count, 1)
+
+    def test_disable_restores_the_original_callables(self):
+        handler_stats.enable(self.sublime_plugin)
+        self.assertIn('on_modified', vars(self.listener))
+        self.assertIsNot(UpperCaseCommand.__dict__['run'], self.original_run)
+
+        handler_stats.disable()
+        self.assertFalse(handler_stats.is_enabled())
+        # Callbacks that were only defined on the class are removed from the instance again.
+        self.assertNotIn('on_modified', vars(self.listener))
+        self.assertNotIn('on_selection_modified', vars(self.view_listener))
+        self.assertIs(UpperCaseCommand.__dict__['run'], self.original_run)
+
+        self.listener.on_modified('v')
+        UpperCaseCommand().run(None)
+        self.assertEqual(self.stats(), {})
+
+    def test_disable_keeps_statistics(self):
+        handler_stats.enable(self.sublime_plugin)
+        self.listener.on_modified('v')
+        handler_stats.disable()
+        self.assertEqual(self.stats()[__name__ + '.Listener.on_modified'].count, 1)
+
+    def test_instance_attributes_are_restored(self):
+        own = lambda view: 'own ' + view
+        self.listener.on_modified = own
+        handler_stats.enable(self.sublime_plugin)
+        self.assertIsNot(self.listener.on_modified, own)
+        handler_stats.disable()
+        self.assertIs(self.listener.on_modified, own)
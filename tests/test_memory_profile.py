@@ -0,0 +1,38 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from Troubleshooting.plugin import memory_profile
+
+
+@unittest.skipUnless(memory_profile.is_supported(), 'tracemalloc is not available')
+class MemoryProfileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        package = os.path.join(self.root, 'Allocating')
+        os.makedirs(package)
+        # Everything is allocated by the standard library on behalf of the package.
+        with open(os.path.join(package, 'allocating.py'), 'w') as f:
+            f.write('import json\n\n'
+                    'def allocate():\n'
+                    '    return json.loads("[" + ",".join(["\\"%d\\"" % i for i in '
+                    'range(5000)]) + "]")\n')
+        sys.path.insert(0, package)
+        self.addCleanup(sys.path.remove, package)
+        self.addCleanup(sys.modules.pop, 'allocating', None)
+
+    def tearDown(self):
+        memory_profile.stop()
+
+    def test_allocations_through_the_stdlib_count_for_the_package(self):
+        import allocating
+        memory_profile.start(roots=[self.root])
+        data = allocating.allocate()
+        usage = memory_profile.take_snapshot().usage
+        self.assertIn('Allocating', usage)
+        self.assertGreater(usage['Allocating'].size, 5000 * 40)
+        del data
@@ -0,0 +1,63 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+from Troubleshooting.lib import inotify
+from Troubleshooting.plugin import package_index
+
+
+class ScanDirectoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        os.makedirs(os.path.join(self.path, 'sub', 'deeper'))
+        for name in ('a.py', os.path.join('sub', 'b.py'), os.path.join('sub', 'deeper', 'c.py')):
+            with open(os.path.join(self.path, name), 'w') as f:
+                f.write('x' * 10)
+
+    def test_counts_every_file(self):
+        entry = package_index._scan_directory('Pkg', self.path)
+        self.assertEqual((entry.file_count, entry.size), (3, 30))
+        self.assertFalse(entry.watched)
+
+    def test_watches_each_directory_before_listing_it(self):
+        watched = []
+        listed = []
+        listdir = os.listdir
+
+        def record_listdir(path):
+            listed.append(path)
+            self.assertIn(path, watched)
+            return listdir(path)
+
+        def watch(path):
+            watched.append(path)
+            return True
+
+        with mock.patch('os.listdir', record_listdir):
+            entry = package_index._scan_directory('Pkg', self.path, watch)
+        self.assertTrue(entry.watched)
+        self.assertEqual(sorted(watched), sorted(listed))
+        self.assertEqual(len(watched), 3)
+
+    def test_not_watched_if_any_watch_fails(self):
+        entry = package_index._scan_directory('Pkg', self.path, lambda path: path == self.path)
+        self.assertFalse(entry.watched)
+        self.assertEqual(entry.file_count, 3)
+
+
+@unittest.skipUnless(inotify.is_supported(), 'inotify is not available')
+class WatcherTestCase(unittest.TestCase):
+
+    def test_overflow_reports_every_tag(self):
+        changed = []
+        watcher = inotify.Watcher(changed.append)
+        self.addCleanup(watcher.close)
+        with watcher.lock:
+            watcher.tags.update({1: 'One', 2: 'Two', 3: 'Two'})
+        watcher._dispatch(struct.pack('iIII', -1, inotify.IN_Q_OVERFLOW, 0, 0))
+        self.assertEqual(sorted(changed), ['One', 'Two'])
@@ -0,0 +1,43 @@
+import unittest
+
+from Troubleshooting.plugin import report_diff
+from Troubleshooting.plugin.data import DataBlock
+from Troubleshooting.plugin.data import DataItem
+from Troubleshooting.plugin.data import LoadedSection
+from Troubleshooting.plugin.data import PreItem
+
+
+def block(value='1.0', text='profile'):
+    return DataBlock('Packages', 'Installed packages', [DataItem('version', value),
+                                                         PreItem(text)])
+
+
+class ElementEqualityTestCase(unittest.TestCase):
+
+    def test_blocks_with_the_same_data_are_equal(self):
+        self.assertEqual(block(), block())
+        self.assertEqual([DataItem('a', 1), block()], [DataItem('a', 1), block()])
+
+    def test_blocks_with_different_data_differ(self):
+        self.assertNotEqual(block(), block(value='2.0'))
+        self.assertNotEqual(block(), block(text='other'))
+        self.assertNotEqual(block(), DataBlock('Packages', 'Other description', block().items))
+
+    def test_elements_of_different_types_differ(self):
+        self.assertNotEqual(PreItem('version'), DataItem('version', '', ''))
+        self.assertNotEqual(DataBlock('version'), PreItem('version'))
+
+
+class DiffReportsTestCase(unittest.TestCase):
+
+    def diff(self, old_block, new_block):
+        return report_diff.diff_reports([LoadedSection('Editor', elements=[old_block])],
+                                        [LoadedSection('Editor', elements=[new_block])])
+
+    def test_equal_reports_have_no_changes(self):
+        self.assertEqual(self.diff(block(), block()), [])
+
+    def test_changed_item(self):
+        changes = self.diff(block(), block(value='2.0'))
+        self.assertEqual([(c.kind, c.path, c.old, c.new) for c in changes],
+                         [(report_diff.CHANGED, ('Editor', 'Packages', 'version'), '1.0', '2.0')])
@@ -0,0 +1,24 @@
+import os
+import unittest
+
+import sublime
+
+from Troubleshooting.bench import _support
+from Troubleshooting.bench import check_startup
+
+
+# Startup is measured in fresh Python interpreters, which the editor can't start.
+@unittest.skipUnless(os.path.dirname(os.path.abspath(sublime.__file__)) == _support.STUBS_PATH,
+                     'needs a Python interpreter and the stub editor modules')
+class StartupTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.result = check_startup.check(repeat=5)
+
+    def test_report_machinery_is_not_loaded_at_startup(self):
+        self.assertEqual(self.result.deferred_loaded, [])
+
+    def test_startup_is_within_budget(self):
+        self.assertLessEqual(self.result.median, self.result.budget,
+                             'startup took {:.1f} ms'.format(self.result.median))
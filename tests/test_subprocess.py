@@ -0,0 +1,116 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import unittest
+
+from Troubleshooting.bench._support import prepended_path
+from Troubleshooting.lib.subprocess import check_output_batch
+from Troubleshooting.lib.subprocess import ERROR
+from Troubleshooting.lib.subprocess import NOT_FOUND
+from Troubleshooting.lib.subprocess import OK
+from Troubleshooting.lib.subprocess import TIMEOUT
+
+
+# Prints `Name=value` lines for the properties in `wmic <alias> get <a,b,...> /value`, like the
+# real thing, and logs every invocation so tests can count processes.
+FAKE_WMIC = '''#!/bin/sh
+echo "$*" >> "$(dirname "$0")/wmic.log"
+for name in $(echo "$3" | tr ',' ' '); do
+    echo "$name=$1 $name"
+done
+'''
+
+
+@unittest.skipIf(sys.platform == 'win32', 'fake executables are shell scripts')
+class CheckOutputBatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.bin_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.bin_dir)
+        path = prepended_path(self.bin_dir)
+        path.__enter__()
+        self.addCleanup(path.__exit__, None, None, None)
+
+    def executable(self, name, script):
+        path = os.path.join(self.bin_dir, name)
+        with open(path, 'w') as f:
+            f.write(script)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+    def test_ok(self):
+        self.executable('ts-echo', '#!/bin/sh\necho "  hello $1  "\n')
+        result, = check_output_batch([['ts-echo', 'world']], timeout=10)
+        self.assertEqual(result.status, OK)
+        self.assertEqual(result.output, 'hello world')
+        self.assertIsNone(result.error)
+
+    def test_timeout_keeps_results_of_commands_that_finished(self):
+        self.executable('ts-slow', '#!/bin/sh\nexec sleep 10\n')
+        self.executable('ts-fast', '#!/bin/sh\necho done\n')
+        start = time.monotonic()
+        slow, fast = check_output_batch([['ts-slow'], ['ts-fast']], timeout=0.5)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(slow.status, TIMEOUT)
+        self.assertIsNone(slow.output)
+        self.assertEqual(fast.status, OK)
+        self.assertEqual(fast.output, 'done')
+
+    def test_not_found(self):
+        result, = check_output_batch([['ts-no-such-command']], timeout=10)
+        self.assertEqual(result.status, NOT_FOUND)
+        self.assertIsNotNone(result.error)
+
+    def test_error_keeps_output(self):
+        self.executable('ts-fail', '#!/bin/sh\necho broken >&2\nexit 3\n')
+        result, = check_output_batch([['ts-fail']], timeout=10)
+        self.assertEqual(result.status, ERROR)
+        self.assertEqual(result.output, 'broken')
+        self.assertIn('3', result.error)
+
+    def test_results_are_in_command_order(self):
+        self.executable('ts-echo', '#!/bin/sh\necho "$1"\n')
+        commands = [['ts-echo', str(i)] for i in range(10)]
+        results = check_output_batch(commands, timeout=10)
+        self.assertEqual([r.output for r in results], [str(i) for i in range(10)])
+        self.assertEqual([r.args for r in results], commands)
+
+    def test_wmic_queries_for_one_alias_run_as_one_process(self):
+        self.executable('wmic', FAKE_WMIC)
+        commands = [
+            ['wmic', 'os', 'get', 'version', '/value'],
+            ['wmic', 'os', 'get', 'caption', '/value'],
+            ['wmic', 'desktopmonitor', 'get', 'pixelsperxlogicalinch', '/value'],
+            ]
+        results = check_output_batch(commands, timeout=10)
+
+        self.assertEqual([r.status for r in results], [OK, OK, OK])
+        self.assertEqual([r.args for r in results], commands)
+        self.assertEqual(results[0].output, 'version=os version')
+        self.assertEqual(results[1].output, 'caption=os caption')
+        self.assertEqual(results[2].output,
+                         'pixelsperxlogicalinch=desktopmonitor pixelsperxlogicalinch')
+        with open(os.path.join(self.bin_dir, 'wmic.log')) as f:
+            calls = sorted(f.read().splitlines())
+        self.assertEqual(calls, ['desktopmonitor get pixelsperxlogicalinch /value',
+                                 'os get version,caption /value'])
+
+    def test_merged_commands_share_the_status_of_their_process(self):
+        self.executable('wmic', '#!/bin/sh\necho "Invalid query" >&2\nexit 1\n')
+        commands = [['wmic', 'os', 'get', 'version', '/value'],
+                    ['wmic', 'os', 'get', 'caption', '/value']]
+        results = check_output_batch(commands, timeout=10)
+        self.assertEqual([r.status for r in results], [ERROR, ERROR])
+        # Lines for other properties are never attributed to a command.
+        self.assertEqual([r.output for r in results], ['', ''])
+
+    def test_no_merging(self):
+        self.executable('wmic', FAKE_WMIC)
+        commands = [['wmic', 'os', 'get', 'version', '/value'],
+                    ['wmic', 'os', 'get', 'caption', '/value']]
+        results = check_output_batch(commands, timeout=10, merge=False)
+        self.assertEqual([r.output for r in results], ['version=os version', 'caption=os caption'])
+        with open(os.path.join(self.bin_dir, 'wmic.log')) as f:
+            self.assertEqual(len(f.read().splitlines()), 2)